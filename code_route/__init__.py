@@ -9,7 +9,15 @@ __version__ = "0.1.0"
 __author__ = "Mihajlo Micic"
 __email__ = "mihajlo@example.com"
 
-from .assistant import Assistant
-from .config import Config
+__all__ = ["Assistant", "Config"]
 
-__all__ = ["Assistant", "Config"]
\ No newline at end of file
+
+def __getattr__(name):
+    # imported on first access so that `code_route.cli --version` does not load openai
+    if name == "Assistant":
+        from .assistant import Assistant
+        return Assistant
+    if name == "Config":
+        from .config import Config
+        return Config
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,83 +1,315 @@
 # Minimal comment added for commit
 import base64
+import hashlib
 import json  # Import json for parsing tool results
+import queue
+import threading
+import time
 
 import streamlit as st
 
 from .config import Config
 from .assistant import Assistant
+from .images import max_dimension_for_model, prepare_image
+
+
+# Render settings -----------------------------------------------------------
+RENDER_PAGE_SIZE = 30          # messages shown per page; older turns sit behind a pager
+LARGE_RESULT_CHARS = 4000      # tool results above this are collapsed until expanded
+LARGE_RESULT_PREVIEW_LINES = 20
+CODE_MARKERS = ('def ', 'import ', '{', '=>', 'const ')
+TURN_POLL_SECONDS = 0.1        # how often the page drains events from a running turn
 
 
 def init_state():
     if "assistant" not in st.session_state:
         st.session_state.assistant = Assistant()
+        # progress is shown through turn events; the terminal spinner would only clutter the server log
+        st.session_state.assistant.thinking_enabled = False
+        st.session_state.assistant.stream_responses = True
+        st.session_state.turn = None  # the assistant turn running in the background, if any
         st.session_state.messages = []  # Store full message dictionaries
+        st.session_state.message_keys = []  # content hash per message, parallel to messages
+        st.session_state.render_cache = {}  # message index -> (hash, prepared blocks)
+        st.session_state.visible_messages = RENDER_PAGE_SIZE
         st.session_state.image_data = None
         # st.session_state.last_tool = None # No longer needed
 
+def _message_key(message: dict) -> str:
+    """Hash a message once, when it is added, so reruns never rehash history"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(str(message.get("role")).encode())
+    content = message.get("content")
+    if isinstance(content, list):
+        for block in content:
+            if block.get("type") == "image":
+                digest.update(block["source"].get("data", "").encode())
+            elif block.get("type") == "image_ref":
+                digest.update(block["digest"].encode())
+            else:
+                digest.update(str(block.get("text", "")).encode())
+    else:
+        digest.update(str(content).encode())
+    for call in message.get("tool_calls") or []:
+        digest.update(call.function.name.encode())
+    return digest.hexdigest()
+
 def add_message(message: dict): # Accept the full message dict
     st.session_state.messages.append(message)
+    st.session_state.message_keys.append(_message_key(message))
+
+def reset_messages():
+    st.session_state.messages = []
+    st.session_state.message_keys = []
+    st.session_state.render_cache = {}
+    st.session_state.visible_messages = RENDER_PAGE_SIZE
+
+def _looks_like_code(text: str) -> bool:
+    return any(marker in text for marker in CODE_MARKERS)
+
+def _prepare_tool_result(content) -> list:
+    """Parse a tool result once into display blocks"""
+    try:
+        # Attempt to parse content as JSON
+        tool_result = json.loads(content)
+        # Check if the result is a dictionary or list (likely JSON data)
+        if isinstance(tool_result, (dict, list)):
+            return [("json", tool_result)]
+        # Check if it's a string that looks like code
+        if isinstance(tool_result, str) and _looks_like_code(tool_result):
+            return [("code", tool_result)]
+        return [("markdown", tool_result)]
+    except (json.JSONDecodeError, TypeError):
+        # If not JSON, treat as plain text/code
+        if isinstance(content, str) and _looks_like_code(content):
+            return [("code", content)]
+        return [("markdown", content)]
+
+def _prepare_message(message: dict) -> list:
+    """
+    Turn a message into a list of (kind, value) display blocks.
+    Expensive work (base64 decoding, JSON parsing, code detection) happens here,
+    once per message, and the result is cached across reruns.
+    """
+    role = message["role"]
+    content = message["content"]
+    blocks = []
+
+    # --- User Messages ---
+    if role == "user":
+        if isinstance(content, list):  # image + text sequence
+            for block in content:
+                if block.get("type") == "image":
+                    blocks.append(("image", base64.b64decode(block["source"]["data"])))
+                elif block.get("type") == "image_ref":
+                    # images in the assistant's history live in its image store
+                    image = st.session_state.assistant.image_store.get(block["digest"])
+                    if image is not None:
+                        blocks.append(("image", image.data))
+                    else:
+                        blocks.append(("caption", f"[image: {block.get('description', 'unavailable')}]"))
+                elif block.get("type") == "text":
+                    blocks.append(("markdown", block["text"]))
+        else:
+            blocks.append(("markdown", content)) # Simple text message
+
+    # --- Assistant Messages ---
+    elif role == "assistant":
+        # Display text content if available
+        if content:
+            blocks.append(("markdown", content))
+
+        # Display tool calls if present
+        if message.get("tool_calls"):
+            blocks.append(("markdown", "---")) # Separator
+            calls = message["tool_calls"]
+            if len(calls) == 1:
+                blocks.append(("markdown", f"🔧 Using tool: **{calls[0].function.name}**"))
+            else:
+                tool_names = ", ".join([f"**{call.function.name}**" for call in calls])
+                blocks.append(("markdown", f"🔧 Using tools: {tool_names}"))
+
+    # --- Tool Messages ---
+    elif role == "tool":
+        blocks.append(("markdown", f"--- Tool Result: **{message.get('name', 'Unknown Tool')}** ---"))
+        if isinstance(content, str) and len(content) > LARGE_RESULT_CHARS:
+            # Large results are parsed only when the user expands them
+            preview = "\n".join(content[:LARGE_RESULT_CHARS].splitlines()[:LARGE_RESULT_PREVIEW_LINES])
+            blocks.append(("large", (preview, len(content))))
+        else:
+            blocks.extend(_prepare_tool_result(content))
+
+    # --- System Notices ---
+    elif role == "system":
+        blocks.append(("caption", content))
+
+    return blocks
+
+def _cached_blocks(index: int, cache_key: str, build) -> list:
+    cache = st.session_state.render_cache
+    cached = cache.get(index)
+    if cached is None or cached[0] != cache_key:
+        cached = (cache_key, build())
+        cache[index] = cached
+    return cached[1]
+
+def _render_blocks(index: int, blocks: list):
+    for kind, value in blocks:
+        if kind == "image":
+            st.image(value)
+        elif kind == "json":
+            st.json(value)
+        elif kind == "code":
+            st.code(value, language='python') # Or detect language?
+        elif kind == "caption":
+            st.caption(value)
+        elif kind == "large":
+            preview, size = value
+            if st.toggle(f"Show full result ({size:,} characters)", key=f"expand_{index}"):
+                message = st.session_state.messages[index]
+                full_blocks = _cached_blocks(
+                    f"full_{index}", st.session_state.message_keys[index],
+                    lambda: _prepare_tool_result(message["content"]),
+                )
+                _render_blocks(index, full_blocks)
+            else:
+                st.code(preview + "\n…", language=None)
+        else:
+            st.markdown(value)
 
 def render_chat():
-    for message in st.session_state.messages:
-        role = message["role"]
-        content = message["content"]
-
-        with st.chat_message("user" if role == "user" else "assistant"):
-            # --- User Messages ---
-            if role == "user":
-                if isinstance(content, list):  # image + text sequence
-                    for block in content:
-                        if block.get("type") == "image":
-                            st.image(base64.b64decode(block["source"]["data"]))
-                        elif block.get("type") == "text":
-                            st.markdown(block["text"])
+    messages = st.session_state.messages
+    first_visible = max(0, len(messages) - st.session_state.visible_messages)
+
+    # Older turns stay collapsed behind a pager so rerun cost does not grow with history
+    if first_visible > 0:
+        if st.button(f"Show earlier messages ({first_visible} hidden)", key="show_earlier"):
+            st.session_state.visible_messages += RENDER_PAGE_SIZE
+            st.rerun()
+
+    for index in range(first_visible, len(messages)):
+        message = messages[index]
+        blocks = _cached_blocks(index, st.session_state.message_keys[index],
+                                lambda: _prepare_message(message))
+        with st.chat_message("user" if message["role"] == "user" else "assistant"):
+            _render_blocks(index, blocks)
+
+# Background turns ------------------------------------------------------------
+def start_turn(user_content):
+    """Run assistant.chat in a worker thread, queueing its events for the page"""
+    assistant = st.session_state.assistant
+    events = queue.Queue()
+    history_start = len(assistant.conversation_history)
+
+    def listener(event, data):
+        events.put((event, data))
+
+    def run():
+        assistant.add_listener(listener)
+        error = None
+        try:
+            assistant.chat(user_content)
+        except Exception as e:
+            error = str(e)
+        finally:
+            assistant.remove_listener(listener)
+            events.put(("done", {"error": error}))
+
+    st.session_state.turn = {
+        "user_content": user_content,
+        "history_start": history_start,
+        "events": events,
+        "text": "",
+        "tools": [],
+        "usage": None,
+        "done": False,
+        "error": None,
+        "reset": False,
+    }
+    assistant.clear_cancel()
+    threading.Thread(target=run, name="code-route-turn", daemon=True).start()
+
+def _apply_event(turn: dict, event: str, data: dict):
+    if event == "text_delta":
+        turn["text"] += data["text"]
+    elif event == "tool_start":
+        turn["tools"].append({"name": data["name"], "status": "running", "preview": ""})
+    elif event == "tool_end":
+        for tool in reversed(turn["tools"]):
+            if tool["name"] == data["name"] and tool["status"] == "running":
+                tool["status"] = "error" if data["is_error"] else f"{data['duration']:.2f}s"
+                tool["preview"] = data["preview"]
+                break
+    elif event == "usage":
+        turn["usage"] = data
+    elif event == "done":
+        turn["done"] = True
+        turn["error"] = data["error"]
+
+def _finish_turn(turn: dict):
+    """Move the messages produced by a finished turn into the chat history"""
+    assistant = st.session_state.assistant
+    new_messages = assistant.conversation_history[turn["history_start"]:]
+    # the user message is already in the chat; the assistant records its own copy (with images as references)
+    if new_messages and new_messages[0].get("role") == "user":
+        new_messages = new_messages[1:]
+    for msg in new_messages:
+        add_message(msg)
+    if turn["error"]:
+        # Add error message directly to Streamlit state if assistant fails
+        add_message({"role": "assistant", "content": f"**Error:** {turn['error']}"})
+    st.session_state.turn = None
+
+def render_turn():
+    """Stream the running turn into the page until it finishes, then rerun"""
+    turn = st.session_state.turn
+    with st.chat_message("assistant"):
+        if st.button("⏹ Cancel", key="cancel_turn"):
+            st.session_state.assistant.cancel()
+        tools_placeholder = st.empty()
+        text_placeholder = st.empty()
+        status_placeholder = st.empty()
+
+        while True:
+            changed = False
+            try:
+                while True:
+                    event, data = turn["events"].get_nowait()
+                    _apply_event(turn, event, data)
+                    changed = True
+            except queue.Empty:
+                pass
+
+            if changed:
+                if turn["tools"]:
+                    tools_placeholder.markdown("\n".join(
+                        f"🔧 **{tool['name']}** · {tool['status']}" + (f" — {tool['preview']}" if tool["preview"] else "")
+                        for tool in turn["tools"]
+                    ))
+                if turn["text"]:
+                    text_placeholder.markdown(turn["text"])
+                if turn["usage"]:
+                    status_placeholder.caption(f"{turn['usage']['total_tokens_used']:,} tokens used")
+
+            if turn["done"]:
+                if turn["reset"]:
+                    # the worker has left chat(), so the history is no longer in use
+                    st.session_state.turn = None
+                    st.session_state.assistant.reset()
+                    reset_messages()
                 else:
-                    st.markdown(content) # Simple text message
-
-            # --- Assistant Messages ---
-            elif role == "assistant":
-                # Display text content if available
-                if content:
-                     st.markdown(content)
-
-                # Display tool calls if present
-                if message.get("tool_calls"):
-                    st.markdown("---") # Separator
-                    calls = message["tool_calls"]
-                    if len(calls) == 1:
-                         st.markdown(f"🔧 Using tool: **{calls[0].function.name}**")
-                    else:
-                         tool_names = ", ".join([f"**{call.function.name}**" for call in calls])
-                         st.markdown(f"🔧 Using tools: {tool_names}")
-                    # Optional: Display arguments if desired
-                    # for call in calls:
-                    #     try:
-                    #         args = json.loads(call.function.arguments)
-                    #         st.json(args)
-                    #     except json.JSONDecodeError:
-                    #         st.text(f"Args: {call.function.arguments}") # Fallback
-
-            # --- Tool Messages ---
-            elif role == "tool":
-                st.markdown(f"--- Tool Result: **{message.get('name', 'Unknown Tool')}** ---")
-                try:
-                    # Attempt to parse content as JSON
-                    tool_result = json.loads(content)
-                    # Check if the result is a dictionary or list (likely JSON data)
-                    if isinstance(tool_result, (dict, list)):
-                        st.json(tool_result)
-                    # Check if it's a string that looks like code
-                    elif isinstance(tool_result, str) and ('def ' in tool_result or 'import ' in tool_result or '{' in tool_result or '=>' in tool_result or 'const ' in tool_result):
-                         st.code(tool_result, language='python') # Or detect language?
-                    else:
-                        st.markdown(tool_result) # Render as markdown otherwise
-                except json.JSONDecodeError:
-                    # If not JSON, treat as plain text/code
-                    if isinstance(content, str) and ('def ' in content or 'import ' in content or '{' in content or '=>' in content or 'const ' in content):
-                         st.code(content, language='python') # Basic code detection
-                    else:
-                         st.markdown(content) # Render as markdown
+                    _finish_turn(turn)
+                st.rerun()
+            if not changed:
+                if turn["reset"]:
+                    status = "Resetting…"
+                elif st.session_state.assistant.cancel_requested:
+                    status = "Cancelling…"
+                else:
+                    status = "Thinking…"
+                if not turn["usage"]:
+                    status_placeholder.caption(status)
+                time.sleep(TURN_POLL_SECONDS)
 
 def main():
     st.set_page_config(page_title="Code Route", page_icon="📡", layout="wide")
@@ -104,12 +336,18 @@ def main():
             elif message.startswith("Already"):
                 st.info(message)
             else:
-                st.session_state.messages.append({"role": "system", "content": message})
+                add_message({"role": "system", "content": message})
                 st.rerun()
     with col4:
         if st.button("🔄 Reset", use_container_width=True):
-            st.session_state.assistant.reset()
-            st.session_state.messages = []
+            if st.session_state.turn:
+                # the worker may still be inside chat(); render_turn resets once it is done,
+                # and the input stays disabled until then
+                st.session_state.assistant.cancel()
+                st.session_state.turn["reset"] = True
+            else:
+                st.session_state.assistant.reset()
+                reset_messages()
             st.rerun()
 
     st.divider()
@@ -126,26 +364,23 @@ def main():
     uploaded_img = st.file_uploader("Attach image", type=["png", "jpg", "jpeg", "gif", "webp"],
                                    key="uploader", label_visibility="collapsed")
     if uploaded_img is not None:
-        img_bytes = uploaded_img.read()
+        img_bytes = uploaded_img.getvalue()
         st.image(img_bytes, caption="Preview", width=200)
-        st.session_state.image_data = base64.b64encode(img_bytes).decode()
+        # downscaled and re-encoded for the current model; repeated reruns hit the image cache
+        st.session_state.image_data = prepare_image(
+            img_bytes, max_dimension_for_model(st.session_state.assistant.current_model)
+        )
     else:
         st.session_state.image_data = None
 
     # Chat input ---------------------------------------------------------
-    prompt = st.chat_input("Type something… (⌘/Ctrl + Enter to send)")
-    if prompt is not None or st.session_state.image_data:
+    turn_running = st.session_state.turn is not None
+    prompt = st.chat_input("Type something… (⌘/Ctrl + Enter to send)", disabled=turn_running)
+    if not turn_running and (prompt is not None or st.session_state.image_data):
         # Prepare message content structure for user input
         user_content = prompt
         if st.session_state.image_data:
-            user_content_list = [{
-                    "type": "image",
-                    "source": {
-                        "type": "base64",
-                        "media_type": "image/jpeg", # Assume jpeg for now
-                        "data": st.session_state.image_data
-                    }
-                }]
+            user_content_list = [st.session_state.image_data.to_block()]
             if prompt:
                 user_content_list.append({"type": "text", "text": prompt})
             user_content = user_content_list # Use the list structure
@@ -154,36 +389,14 @@ def main():
         user_message_struct = {"role": "user", "content": user_content}
         add_message(user_message_struct)
 
-        # Render chat immediately after adding user message
-        # This requires finding the container where chat is rendered if not the main page
-        # For simplicity, we'll rely on the full rerun after assistant response for now.
-        # Consider using st.container() for the chat history if immediate update is needed.
-        # render_chat() # Re-rendering here might be complex with Streamlit's flow
-
-        with st.chat_message("assistant"):
-            with st.spinner("Thinking…"):
-                # Store length before assistant call
-                messages_before_call = len(st.session_state.assistant.conversation_history)
-
-                try:
-                    # Call the assistant (it modifies its own history)
-                    # The actual response text is less important now, we'll pull from history
-                    _ = st.session_state.assistant.chat(user_content)
-                except Exception as e:
-                    # Add error message directly to Streamlit state if assistant fails
-                    error_message = {"role": "assistant", "content": f"**Error:** {e}"}
-                    add_message(error_message)
-                    st.markdown(error_message["content"]) # Display error immediately
-
-                # Add new messages from assistant history to Streamlit state
-                new_messages = st.session_state.assistant.conversation_history[messages_before_call:]
-                for msg in new_messages:
-                    add_message(msg)
-
-                # Clear the image data after processing
-                st.session_state.image_data = None
-                # Force a rerun to render the new messages added via add_message
-                st.rerun()
+        # Clear the image data; the turn owns the content now
+        st.session_state.image_data = None
+        start_turn(user_content)
+        # Rerun so the user message renders with the history and the turn streams below it
+        st.rerun()
+
+    if st.session_state.turn is not None:
+        render_turn()
 
     # Footer -------------------------------------------------------------
     st.caption("© 2025 Code Route – Powered by Streamlit")
@@ -3,11 +3,17 @@ import importlib
 import inspect
 import json
 import logging
+import os
 import pkgutil
+import reprlib
 import sys
-from typing import Any, Dict, List, Optional
+from collections.abc import Collection, Mapping
+from itertools import islice
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 from openai import OpenAI
+from openai.types.chat import ChatCompletionMessageToolCall
 from prompt_toolkit import prompt
 from prompt_toolkit.styles import Style
 from prompt_toolkit.completion import Completer, Completion
@@ -25,16 +31,102 @@ from rich.tree import Tree
 from rich.text import Text
 
 from .config import Config
+from .images import ImageStore, is_image_ref, set_active_model
 from .prompts.system_prompts import SystemPrompts
-from .tools.base import BaseTool
+from .registry import ToolCatalog, get_catalog
+from . import workspace
+from .tools.base import PREVIEW_SCAN_CHARS, BaseTool, ToolResult, preview_text
 from .themes import get_themed_console, STATUS_ICONS
 
+# api clients are shared by every Assistant in the process, keyed by (base_url, api_key),
+# so sessions reuse one HTTP connection pool per provider
+_clients: Dict[tuple, OpenAI] = {}
+_clients_lock = threading.Lock()
+
 # configure logging to error level only
 logging.basicConfig(
     level=logging.ERROR,
     format='%(levelname)s: %(message)s'
 )
 
+
+class _DisplayRepr(reprlib.Repr):
+    """
+    bounded-cost repr for tool display: visits at most a few elements per container,
+    slices strings before formatting them and hides base64 payloads.
+    """
+
+    def __init__(self, maxstring: int):
+        super().__init__()
+        self.maxstring = maxstring
+        self.maxother = maxstring
+        self.maxlevel = 3
+        self.maxdict = 8
+        self.maxlist = 8
+        self.maxtuple = 8
+        self.maxset = 8
+        self.maxfrozenset = 8
+
+    def repr_str(self, x, level):
+        if len(x) > 1000 and (x.startswith('data:') or ';base64,' in x[:256]):
+            return "'[base64 data omitted]'"
+        return super().repr_str(x, level)
+
+    # reprlib sorts dicts and sets before taking their first elements; these take them in order
+    def repr_dict(self, x, level):
+        if not x:
+            return '{}'
+        if level <= 0:
+            return '{...}'
+        pieces = [f'{self.repr1(key, level - 1)}: {self.repr1(value, level - 1)}'
+                  for key, value in islice(x.items(), self.maxdict)]
+        if len(x) > self.maxdict:
+            pieces.append('...')
+        return '{' + ', '.join(pieces) + '}'
+
+    def repr_set(self, x, level):
+        if not x:
+            return 'set()'
+        return self._repr_iterable(x, level, '{', '}', self.maxset)
+
+    def repr_frozenset(self, x, level):
+        if not x:
+            return 'frozenset()'
+        return self._repr_iterable(x, level, 'frozenset({', '})', self.maxfrozenset)
+
+    def repr_bytes(self, x, level):
+        return self.repr_instance(x[:self.maxother + 1], level)
+
+    def repr_bytearray(self, x, level):
+        return self.repr_instance(x[:self.maxother + 1], level)
+
+    def repr_int(self, x, level):
+        if x.bit_length() > 4 * self.maxother:
+            # converting a huge int to decimal takes quadratic time
+            return f'<int of {x.bit_length()} bits>'
+        return super().repr_int(x, level)
+
+    def repr_instance(self, x, level):
+        # other containers are shown by their first elements, never through their own full repr
+        if isinstance(x, Mapping):
+            return f'{type(x).__name__}({self.repr_dict(x, level)})'
+        if isinstance(x, Collection) and not isinstance(x, (str, bytes, bytearray, range)):
+            return f'{type(x).__name__}({self._repr_iterable(x, level, "[", "]", self.maxlist)})'
+        return super().repr_instance(x, level)
+
+
+def _bounded_display(value: Any, limit: int) -> str:
+    """format a value for display in time independent of its size"""
+    if isinstance(value, str):
+        text = value[:limit + 1]
+        if len(value) > 1000 and (value.startswith('data:') or ';base64,' in value[:256]):
+            return "[base64 data omitted]"
+    else:
+        text = _DisplayRepr(limit).repr(value)
+    if len(text) > limit:
+        return text[:limit - 3] + "..."
+    return text
+
 class Assistant:
     """main assistant class for code route"""
 
@@ -47,11 +139,23 @@ class Assistant:
         self.temperature = getattr(Config, 'DEFAULT_TEMPERATURE', 0.65)
         self.total_tokens_used = 0
 
+        # images live here once each; the history only holds image_ref blocks
+        self.image_store = ImageStore()
+
+        # streaming delivers text deltas to listeners as they arrive; off for the terminal UI
+        self.stream_responses = False
+        self._listeners: List[Callable[[str, Dict[str, Any]], None]] = []
+        self._cancel_requested = threading.Event()
+
         self.current_model = self._resolve_initial_model(getattr(Config, 'MODEL', Config.DEFAULT_MODEL))
         self.client_settings = Config.MODEL_SETTINGS[self.current_model]
         self.client = self._create_client_for_model(self.current_model)
 
-        self.tools = self._load_tools()
+        self._catalog: Optional[ToolCatalog] = None
+        self.tools = self._load_shared_tools()
+
+        if getattr(Config, 'WARM_WORKSPACE_SNAPSHOT', False):
+            workspace.warm(os.getcwd())
 
     @staticmethod
     def _requires_external_key(settings: Dict[str, Any]) -> bool:
@@ -130,12 +234,49 @@ class Assistant:
                     f"Model '{model_name}' requires an API key. Update Config.MODEL_SETTINGS with credentials."
                 )
 
-        return OpenAI(api_key=api_key, base_url=base_url)
+        with _clients_lock:
+            client = _clients.get((base_url, api_key))
+            if client is None:
+                client = _clients[(base_url, api_key)] = OpenAI(api_key=api_key, base_url=base_url)
+        return client
 
     def _update_client(self, model_name: str) -> None:
         self.client_settings = self._get_model_settings(model_name)
         self.client = self._create_client_for_model(model_name)
 
+    def add_listener(self, listener: Callable[[str, Dict[str, Any]], None]) -> None:
+        """
+        register a callback for turn events. it is called as listener(event, data) with
+        event one of: text_delta, tool_start, tool_end, usage.
+        """
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[str, Dict[str, Any]], None]) -> None:
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def _emit(self, event: str, **data) -> None:
+        for listener in list(self._listeners):
+            try:
+                listener(event, data)
+            except Exception as e:
+                logging.error(f"Error in event listener for {event}: {e!s}")
+
+    def cancel(self) -> None:
+        """ask the running turn to stop at the next chunk or tool boundary"""
+        self._cancel_requested.set()
+
+    def clear_cancel(self) -> None:
+        """
+        forget an earlier cancel; call before starting a turn (before its thread starts),
+        so a cancel sent while the turn is starting up is kept
+        """
+        self._cancel_requested.clear()
+
+    @property
+    def cancel_requested(self) -> bool:
+        return self._cancel_requested.is_set()
+
     def export_conversation(self, filename: str):
         """export conversation to json file"""
         try:
@@ -160,7 +301,7 @@ class Assistant:
                 "packages": [package_name]
             }
 
-        result = self._execute_tool(ToolUseMock())
+        result = self._tool_result_content(self._execute_tool(ToolUseMock()))
         if "Error" not in result and "failed" not in result.lower():
             self.console.print("[green]The package was installed successfully.[/green]")
             return True
@@ -168,14 +309,30 @@ class Assistant:
             self.console.print(f"[red]Failed to install {package_name}. Output:[/red] {result}")
             return False
 
-    def _load_tools(self) -> List[Dict[str, Any]]:
+    def _load_shared_tools(self, refresh: bool = False) -> List[Dict[str, Any]]:
+        """
+        Use the process-wide tool catalog, loading the tools directory only the first
+        time (or when refresh is set). Returns the tool schemas for the model.
+        """
+        self._catalog = get_catalog(self._build_catalog, refresh=refresh)
+        return self._catalog.schemas
+
+    def _build_catalog(self) -> ToolCatalog:
+        classes: Dict[str, type] = {}
+        schemas = self._load_tools(classes)
+        return ToolCatalog(schemas, classes)
+
+    def _load_tools(self, classes: Optional[Dict[str, type]] = None) -> List[Dict[str, Any]]:
         """
         Dynamically load all tool classes from the tools directory.
         If a dependency is missing, prompt the user to install it via uvpackagemanager.
+        Loaded classes are recorded in `classes` by tool name when given.
 
         Returns:
             A list of tools (dicts) containing their 'name', 'description', and 'input_schema'.
         """
+        if classes is None:
+            classes = {}
         tools = []
         tools_path = getattr(Config, 'TOOLS_DIR', None)
 
@@ -196,7 +353,7 @@ class Assistant:
                 # attempt loading the tool module
                 try:
                     module = importlib.import_module(f'code_route.tools.{module_info.name}')
-                    self._extract_tools_from_module(module, tools)
+                    self._extract_tools_from_module(module, tools, classes)
                 except ImportError as e:
                     # handle missing dependencies
                     missing_module = self._parse_missing_dependency(str(e))
@@ -218,7 +375,7 @@ class Assistant:
                             # retry loading the module after installation
                             try:
                                 module = importlib.import_module(f'code_route.tools.{module_info.name}')
-                                self._extract_tools_from_module(module, tools)
+                                self._extract_tools_from_module(module, tools, classes)
                             except Exception as retry_err:
                                 self.console.print(f"[red]Failed to load tool after installation: {retry_err!s}[/red]")
                         else:
@@ -247,15 +404,18 @@ class Assistant:
             missing_module = "unknown"
         return missing_module
 
-    def _extract_tools_from_module(self, module, tools: List[Dict[str, Any]]) -> None:
+    def _extract_tools_from_module(self, module, tools: List[Dict[str, Any]],
+                                   classes: Optional[Dict[str, type]] = None) -> None:
         """
         given a tool module, find and instantiate all tool classes (subclasses of BaseTool).
-        append them to the 'tools' list.
+        append them to the 'tools' list and record each class in 'classes' by tool name.
         """
         for name, obj in inspect.getmembers(module):
             if (inspect.isclass(obj) and issubclass(obj, BaseTool) and obj != BaseTool):
                 try:
                     tool_instance = obj()
+                    if classes is not None:
+                        classes[tool_instance.name] = obj
                     tools.append({
                         "type": "function",
                         "function": {
@@ -273,7 +433,7 @@ class Assistant:
         refresh the list of tools and show newly discovered tools using a table.
         """
         current_tool_names = {tool['function']['name'] for tool in self.tools}
-        self.tools = self._load_tools()
+        self.tools = self._load_shared_tools(refresh=True)
         new_tool_names = {tool['function']['name'] for tool in self.tools}
         added_tools = new_tool_names - current_tool_names
 
@@ -407,18 +567,12 @@ class Assistant:
         essential_parts = []
         for key in essential_keys:
             if key in args:
-                value = str(args[key])
-                if len(value) > 50:
-                    value = value[:47] + "..."
-                essential_parts.append(f"{key}={value}")
+                essential_parts.append(f"{key}={_bounded_display(args[key], 50)}")
         
         # fallback to first key if no essential args
         if not essential_parts and args:
             first_key = next(iter(args))
-            value = str(args[first_key])
-            if len(value) > 50:
-                value = value[:47] + "..."
-            essential_parts.append(f"{first_key}={value}")
+            essential_parts.append(f"{first_key}={_bounded_display(args[first_key], 50)}")
         
         return f"({', '.join(essential_parts)})" if essential_parts else ""
     
@@ -426,19 +580,7 @@ class Assistant:
         """Display tool execution result in a clean, compact format"""
         result_text = Text()
         
-        # check if this is an error - proper error detection
-        is_error = False
-        if isinstance(result, str):
-            # if it's valid JSON, it's likely a successful structured response
-            try:
-                json.loads(result)
-                is_error = False  # structured data = success
-            except (json.JSONDecodeError, TypeError):
-                # not JSON, check if it's an error message
-                is_error = result.startswith("Error:")
-        elif isinstance(result, dict) and "error" in result:
-            # dictionary with explicit error key
-            is_error = True
+        is_error = self._is_error_result(result)
         
         if is_error:
             result_text.append("❌ ", style="red")
@@ -457,29 +599,27 @@ class Assistant:
             if result_preview:
                 self.console.print(f"  {result_preview}", style="dim white")
     
+    @staticmethod
+    def _is_error_result(result: Any) -> bool:
+        """
+        structured results carry their own status; plain strings signal errors by prefix
+        (a string starting with "Error:" can never be valid JSON, so no parse is needed)
+        """
+        if isinstance(result, ToolResult):
+            return result.is_error
+        if isinstance(result, str):
+            return result.startswith("Error:")
+        # dictionary with explicit error key
+        return isinstance(result, dict) and "error" in result
+
     def _get_result_preview(self, result: Any) -> str:
         """Get a concise preview of the result for display"""
+        if isinstance(result, ToolResult):
+            result = result.preview
         if isinstance(result, str):
-            if len(result.strip()) == 0:
-                return ""
-            # first line only, truncated if needed
-            first_line = result.strip().split('\n')[0]
-            if len(first_line) > 100:
-                return first_line[:97] + "..."
-            return first_line
-        elif isinstance(result, (dict, list)):
-            try:
-                result_str = json.dumps(result, indent=None)
-                if len(result_str) > 100:
-                    return result_str[:97] + "..."
-                return result_str
-            except (TypeError, ValueError):
-                return str(result)[:100]
-        else:
-            result_str = str(result)
-            if len(result_str) > 100:
-                return result_str[:97] + "..."
-            return result_str
+            # first non-blank line only, found within a bounded prefix
+            return preview_text(result, 100, PREVIEW_SCAN_CHARS)
+        return _bounded_display(result, 100)
 
     def _display_tool_usage(self, tool_name: str, input_data: Dict, result: Any):
         """
@@ -492,7 +632,11 @@ class Assistant:
     
     def _display_detailed_tool_info(self, tool_name: str, input_data: Dict, result: Any):
         """Display detailed tool information when SHOW_TOOL_USAGE is enabled"""
-        is_error = isinstance(result, str) and result.startswith("Error")
+        if isinstance(result, ToolResult):
+            is_error = result.is_error
+            result = result.payload
+        else:
+            is_error = isinstance(result, str) and result.startswith("Error")
         status_icon = "❌" if is_error else "✅"
         
         # compact details panel
@@ -500,12 +644,9 @@ class Assistant:
         details += f"**Status:** {'Error' if is_error else 'Success'}\n"
         
         if input_data:
-            cleaned_input = self._clean_data_for_display(input_data)
-            details += f"**Input:** {json.dumps(cleaned_input, indent=None)[:200]}...\n"
+            details += f"**Input:** {self._clean_data_for_display(input_data, 200)}\n"
         
-        cleaned_result = self._clean_data_for_display(result)
-        result_preview = str(cleaned_result)[:300] + ("..." if len(str(cleaned_result)) > 300 else "")
-        details += f"**Result:** {result_preview}"
+        details += f"**Result:** {self._clean_data_for_display(result, 300)}"
         
         panel = Panel(
             Markdown(details),
@@ -516,48 +657,12 @@ class Assistant:
         )
         self.console.print(panel)
 
-    def _clean_data_for_display(self, data):
-        """
-        helper method to clean data for display by handling various data types
-        and removing/replacing large content like base64 strings.
-        """
-        if isinstance(data, str):
-            try:
-                # try to parse as JSON first
-                parsed_data = json.loads(data)
-                return self._clean_parsed_data(parsed_data)
-            except json.JSONDecodeError:
-                # if it's a long string, check for base64 patterns
-                if len(data) > 1000 and ';base64,' in data:
-                    return "[base64 data omitted]"
-                return data
-        elif isinstance(data, dict):
-            return self._clean_parsed_data(data)
-        else:
-            return data
-
-    def _clean_parsed_data(self, data):
+    def _clean_data_for_display(self, data, limit: int = 300) -> str:
         """
-        recursively clean parsed JSON/dict data, handling nested structures
-        and replacing large data with placeholders.
+        helper method to format data for display, replacing large content like
+        base64 strings. only a bounded prefix of the data is ever examined.
         """
-        if isinstance(data, dict):
-            cleaned = {}
-            for key, value in data.items():
-                # handle image data in various formats
-                if key in ['data', 'image', 'source'] and isinstance(value, str):
-                    if len(value) > 1000 and (';base64,' in value or value.startswith('data:')):
-                        cleaned[key] = "[base64 data omitted]"
-                    else:
-                        cleaned[key] = value
-                else:
-                    cleaned[key] = self._clean_parsed_data(value)
-            return cleaned
-        elif isinstance(data, list):
-            return [self._clean_parsed_data(item) for item in data]
-        elif isinstance(data, str) and len(data) > 1000 and ';base64,' in data:
-            return "[base64 data omitted]"
-        return data
+        return _bounded_display(data, limit)
 
     def _execute_tool(self, tool_use):
         """
@@ -570,25 +675,7 @@ class Assistant:
         self._display_tool_execution_start(tool_name, tool_input)
         
         start_time = time.time()
-        tool_result = None
-
-        try:
-            module = importlib.import_module(f'code_route.tools.{tool_name}')
-            tool_instance = self._find_tool_instance_in_module(module, tool_name)
-
-            if not tool_instance:
-                tool_result = f"Error: Tool not found: {tool_name}"
-            else:
-                # execute the tool with the provided input
-                try:
-                    result = tool_instance.execute(**tool_input)
-                    tool_result = result
-                except Exception as exec_err:
-                    tool_result = f"Error executing tool '{tool_name}': {exec_err!s}"
-        except ImportError:
-            tool_result = f"Error: Failed to import tool: {tool_name}"
-        except Exception as e:
-            tool_result = f"Error executing tool: {e!s}"
+        tool_result = self._invoke_tool(tool_name, tool_input)
 
         execution_time = time.time() - start_time
         
@@ -597,6 +684,140 @@ class Assistant:
         
         return tool_result
 
+    def _invoke_tool(self, tool_name: str, tool_input: Dict[str, Any]) -> Any:
+        """
+        import, instantiate and execute a tool, converting failures into error strings.
+        the raw result (str, ToolResult, dict, ...) is returned unserialized.
+        """
+        try:
+            tool_class = self._catalog.tool_class(tool_name) if self._catalog else None
+            if tool_class is not None:
+                tool_instance = tool_class()
+            else:
+                # not in the catalog (e.g. created since the last refresh); import it directly
+                module = importlib.import_module(f'code_route.tools.{tool_name}')
+                tool_instance = self._find_tool_instance_in_module(module, tool_name)
+
+            if not tool_instance:
+                return f"Error: Tool not found: {tool_name}"
+
+            # execute the tool with the provided input; images it returns are sized for this model
+            set_active_model(self.current_model)
+            try:
+                return tool_instance.execute(**tool_input)
+            except Exception as exec_err:
+                return f"Error executing tool '{tool_name}': {exec_err!s}"
+        except ImportError:
+            return f"Error: Failed to import tool: {tool_name}"
+        except Exception as e:
+            return f"Error executing tool: {e!s}"
+
+    def _store_tool_images(self, result: Any) -> Tuple[str, List[str]]:
+        """
+        move the images of a structured tool result into the image store.
+        returns the content for the history and the digests of the images it references.
+        """
+        payload = result.payload if isinstance(result, ToolResult) else result
+        if not isinstance(payload, (dict, list)):
+            return self._tool_result_content(result), []
+        interned = self.image_store.intern(payload)
+        if interned is payload:
+            return self._tool_result_content(result), []
+        digests = []
+        self._collect_image_refs(interned, digests)
+        return ToolResult(interned).serialize(), digests
+
+    @staticmethod
+    def _map_image_refs(content: Any, replace: Callable[[Dict[str, Any]], Any]) -> Any:
+        """apply replace to every image_ref block in nested lists and dicts"""
+        if is_image_ref(content):
+            return replace(content)
+        if isinstance(content, list):
+            return [Assistant._map_image_refs(item, replace) for item in content]
+        if isinstance(content, dict):
+            return {key: Assistant._map_image_refs(value, replace) for key, value in content.items()}
+        return content
+
+    @staticmethod
+    def _collect_image_refs(content: Any, digests: List[str]) -> None:
+        """append the digest of every image_ref block in content, in order"""
+        def collect(ref):
+            digests.append(ref["digest"])
+            return ref
+        Assistant._map_image_refs(content, collect)
+
+    @staticmethod
+    def _message_image_refs(msg: Dict[str, Any]) -> List[str]:
+        if "image_refs" in msg:
+            return msg["image_refs"]
+        if msg.get("role") == "user" and isinstance(msg.get("content"), list):
+            return [block["digest"] for block in msg["content"] if is_image_ref(block)]
+        return []
+
+    def _resolve_image_ref(self, ref: Dict[str, Any], inline: bool, reason: str) -> Dict[str, Any]:
+        """an image block for the model, or a short text placeholder standing in for it"""
+        image = self.image_store.get(ref["digest"])
+        if image is not None and inline:
+            return image.to_block()
+        if image is None:
+            reason = "no longer available"
+        return {
+            "type": "text",
+            "text": f"[image sha256:{ref['digest'][:12]} ({ref.get('description', 'image')}) not resent: {reason}]"
+        }
+
+    def _outbound_history(self) -> List[Dict[str, Any]]:
+        """
+        the conversation history as it is sent on this call.
+
+        only the Config.INLINE_IMAGE_LIMIT most recent distinct images are sent
+        as image data, each at its latest occurrence; repeats and older images
+        become short text placeholders. messages without images are passed
+        through untouched.
+        """
+        refs_by_index: Dict[int, List[str]] = {}
+        latest: Dict[str, int] = {}
+        for index, msg in enumerate(self.conversation_history):
+            digests = self._message_image_refs(msg)
+            if digests:
+                refs_by_index[index] = digests
+                for digest in digests:
+                    latest[digest] = index
+
+        if not refs_by_index:
+            return self.conversation_history
+
+        # the most recently used images are the ones worth their bytes
+        newest_first = sorted(latest, key=lambda digest: latest[digest], reverse=True)
+        inline = set(newest_first[:Config.INLINE_IMAGE_LIMIT])
+
+        outbound = list(self.conversation_history)
+        for index in refs_by_index:
+            def resolve(ref, index=index):
+                digest = ref["digest"]
+                if latest[digest] > index:
+                    return self._resolve_image_ref(ref, False, "sent again later in the conversation")
+                return self._resolve_image_ref(ref, digest in inline, "superseded by newer images")
+
+            msg = dict(self.conversation_history[index])
+            if msg.get("role") == "tool":
+                msg.pop("image_refs", None)
+                resolved = self._map_image_refs(json.loads(msg["content"]), resolve)
+                msg["content"] = ToolResult(resolved).serialize()
+            else:
+                msg["content"] = self._map_image_refs(msg["content"], resolve)
+            outbound[index] = msg
+        return outbound
+
+    @staticmethod
+    def _tool_result_content(result: Any) -> str:
+        """serialize a tool result into the string sent to the model"""
+        if isinstance(result, ToolResult):
+            return result.serialize()
+        if isinstance(result, (dict, list)):
+            return json.dumps(result)
+        return str(result)
+
     def _find_tool_instance_in_module(self, module, tool_name: str):
         """
         search a given module for a tool class matching tool_name and return an instance of it.
@@ -656,6 +877,82 @@ class Assistant:
 
         self.console.print("---")
 
+    def _request_completion(self, messages: List[Dict[str, Any]]):
+        """send one chat completion request, streaming it when stream_responses is set"""
+        request = {
+            "model": self.current_model,
+            "max_tokens": min(
+                Config.MAX_TOKENS,
+                Config.MAX_CONVERSATION_TOKENS - self.total_tokens_used
+            ),
+            "temperature": self.temperature,
+            "tools": self.tools,
+            "messages": messages,
+        }
+        if not self.stream_responses:
+            return self.client.chat.completions.create(**request)
+
+        stream = self.client.chat.completions.create(
+            stream=True, stream_options={"include_usage": True}, **request
+        )
+        return self._collect_stream(stream)
+
+    def _collect_stream(self, stream):
+        """
+        assemble a streamed completion into the same shape as a regular response,
+        emitting text deltas to listeners as they arrive. a cancel request stops
+        reading and reports finish_reason "cancelled".
+        """
+        content_parts: List[str] = []
+        tool_calls: Dict[int, Dict[str, str]] = {}
+        finish_reason = None
+        usage = None
+
+        try:
+            for chunk in stream:
+                if self.cancel_requested:
+                    finish_reason = "cancelled"
+                    break
+                if getattr(chunk, 'usage', None):
+                    usage = chunk.usage
+                if not chunk.choices:
+                    continue
+
+                choice = chunk.choices[0]
+                delta = choice.delta
+                if delta.content:
+                    content_parts.append(delta.content)
+                    self._emit("text_delta", text=delta.content)
+                for call in delta.tool_calls or []:
+                    entry = tool_calls.setdefault(call.index, {"id": "", "name": "", "arguments": ""})
+                    if call.id:
+                        entry["id"] = call.id
+                    if call.function:
+                        entry["name"] += call.function.name or ""
+                        entry["arguments"] += call.function.arguments or ""
+                if choice.finish_reason:
+                    finish_reason = choice.finish_reason
+        finally:
+            close = getattr(stream, 'close', None)
+            if close:
+                close()
+
+        message = SimpleNamespace(
+            content="".join(content_parts) or None,
+            tool_calls=[
+                ChatCompletionMessageToolCall(
+                    id=entry["id"],
+                    type="function",
+                    function={"name": entry["name"], "arguments": entry["arguments"] or "{}"},
+                )
+                for _, entry in sorted(tool_calls.items())
+            ] or None,
+        )
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=message, finish_reason=finish_reason)],
+            usage=usage,
+        )
+
     def _get_completion(self):
         """
         get a completion from the OpenRouter API.
@@ -668,8 +965,8 @@ class Assistant:
             # check if we need to add the system message
             system_message_added = False
             if self.conversation_history and len(self.conversation_history) > 0:
-                # copy existing messages
-                for msg in self.conversation_history:
+                # copy existing messages, with stored images resolved for this call
+                for msg in self._outbound_history():
                     # skip any system messages as OpenRouter might not support them
                     if msg.get('role') == 'system':
                         system_message_added = True
@@ -689,17 +986,11 @@ class Assistant:
                     "content": f"System instructions: {SystemPrompts.DEFAULT}\n\n{SystemPrompts.TOOL_USAGE}"
                 })
 
+            if self.cancel_requested:
+                return "Response cancelled."
+
             # make the API call
-            response = self.client.chat.completions.create(
-                model=self.current_model,
-                max_tokens=min(
-                    Config.MAX_TOKENS,
-                    Config.MAX_CONVERSATION_TOKENS - self.total_tokens_used
-                ),
-                temperature=self.temperature,
-                tools=self.tools,
-                messages=messages
-            )
+            response = self._request_completion(messages)
 
             # response received
 
@@ -718,6 +1009,12 @@ class Assistant:
 
                 self.total_tokens_used += message_tokens
                 self._display_token_usage(response.usage)
+                self._emit(
+                    "usage",
+                    prompt_tokens=getattr(response.usage, 'prompt_tokens', getattr(response.usage, 'input_tokens', 0)),
+                    completion_tokens=getattr(response.usage, 'completion_tokens', getattr(response.usage, 'output_tokens', 0)),
+                    total_tokens_used=self.total_tokens_used,
+                )
 
             if self.total_tokens_used >= Config.MAX_CONVERSATION_TOKENS:
                 self.console.print("\n[bold red]Token limit reached! Please reset the conversation.[/bold red]")
@@ -734,6 +1031,15 @@ class Assistant:
                 self.console.print("[red]Error: Invalid message format in response[/red]")
                 return "Error: Invalid message format in response"
 
+            if getattr(choice, 'finish_reason', None) == "cancelled":
+                # keep whatever text was streamed before the cancel
+                if choice.message.content:
+                    self.conversation_history.append({
+                        "role": "assistant",
+                        "content": choice.message.content
+                    })
+                return "Response cancelled."
+
             if hasattr(choice, 'finish_reason') and choice.finish_reason == "tool_calls" and hasattr(choice.message, 'tool_calls') and choice.message.tool_calls:
 
                 tool_results = []
@@ -750,45 +1056,60 @@ class Assistant:
                 for tool_call in message.tool_calls:
                     # extract tool information
                     tool_name = tool_call.function.name
+
+                    if self.cancel_requested:
+                        # every tool call still needs a result for the history to stay valid
+                        tool_results.append({
+                            "role": "tool",
+                            "tool_call_id": tool_call.id,
+                            "name": tool_name,
+                            "content": "Error: Cancelled by user before the tool ran"
+                        })
+                        continue
+
                     tool_args = json.loads(tool_call.function.arguments)
 
                     # Clean, compact tool execution display
                     self._display_tool_execution_start(tool_name, tool_args)
+                    self._emit("tool_start", name=tool_name, arguments=tool_args)
 
 
                     # execute the tool with timing
                     start_time = time.time()
                     
-                    try:
-                        # find and execute the tool
-                        module = importlib.import_module(f'code_route.tools.{tool_name}')
-                        tool_instance = self._find_tool_instance_in_module(module, tool_name)
+                    result = self._invoke_tool(tool_name, tool_args)
 
-                        if not tool_instance:
-                            result = f"Error: Tool not found: {tool_name}"
-                        else:
-                            # execute the tool with the provided input
-                            result = tool_instance.execute(**tool_args)
-                    except Exception as e:
-                        result = f"Error executing tool '{tool_name}': {e!s}"
-                    
                     execution_time = time.time() - start_time
                     
                     # Display clean result
                     self._display_tool_result(tool_name, result, execution_time)
+                    self._emit(
+                        "tool_end",
+                        name=tool_name,
+                        is_error=self._is_error_result(result),
+                        preview=self._get_result_preview(result),
+                        duration=execution_time,
+                    )
 
-                    # add the tool result to the conversation
-                    tool_results.append({
+                    # add the tool result to the conversation; its images go to the image store
+                    content, image_refs = self._store_tool_images(result)
+                    tool_result = {
                         "role": "tool",
                         "tool_call_id": tool_call.id,
                         "name": tool_name,
-                        "content": json.dumps(result) if isinstance(result, (dict, list)) else str(result)
-                    })
+                        "content": content
+                    }
+                    if image_refs:
+                        tool_result["image_refs"] = image_refs
+                    tool_results.append(tool_result)
 
                 # add all tool results to the conversation history
                 for tool_result in tool_results:
                     self.conversation_history.append(tool_result)
 
+                if self.cancel_requested:
+                    return "Response cancelled."
+
                 # continue the conversation with the tool results
                 return self._get_completion()  # recursive call
 
@@ -799,6 +1120,9 @@ class Assistant:
                     "role": "assistant",
                     "content": message.content
                 })
+                if not self.stream_responses:
+                    # streamed text was already emitted delta by delta
+                    self._emit("text_delta", text=message.content)
                 return message.content
             else:
                 self.console.print("[red]No content in final response.[/red]")
@@ -838,7 +1162,8 @@ class Assistant:
             # add user message to conversation history
             self.conversation_history.append({
                 "role": "user",
-                "content": user_input  # this can be either string or list
+                # this can be either string or list; attached images are kept as references
+                "content": self.image_store.intern(user_input)
             })
 
             # show thinking indicator if enabled
@@ -926,6 +1251,7 @@ class Assistant:
         Reset the assistant's memory and token usage.
         """
         self.conversation_history = []
+        self.image_store.clear()
         self.total_tokens_used = 0
         
         reset_text = Text.assemble(
@@ -1071,6 +1397,7 @@ def main():
                             console.print(f"\n[bold red]Error exporting conversation: {e!s}[/bold red]")
                     continue
 
+            assistant.clear_cancel()
             response = assistant.chat(user_input)
             
             try:
@@ -5,33 +5,50 @@ code route cli - global command line interface
 
 this module provides the main cli entry point for code route,
 handling initialization, configuration, and launching the assistant.
+
+heavy modules (rich, openai, prompt_toolkit, the assistant and its tools)
+are imported inside the code paths that need them, so --version, --help
+and --init start quickly. run with --profile-startup to see the cost of
+each import.
 """
 
 import argparse
-import os
 import sys
-import subprocess
+import time
 from pathlib import Path
-from typing import Optional
 
-from rich.console import Console
-from rich.panel import Panel
-from rich.markdown import Markdown
-from rich.table import Table
-from rich.text import Text
-from rich.columns import Columns
-from rich.align import Align
+from . import __version__
+
+_console = None
 
-from .config import Config
-from .assistant import Assistant
-from .themes import get_themed_console, STATUS_ICONS
+# modules imported on the interactive path, in the order they are first needed
+STARTUP_IMPORTS = [
+    ("config", "code_route.config"),
+    ("rich", "rich.console"),
+    ("themes", "code_route.themes"),
+    ("prompt_toolkit", "prompt_toolkit"),
+    ("openai", "openai"),
+    ("assistant", "code_route.assistant"),
+]
 
 
-console = get_themed_console()
+def get_console():
+    """return the shared themed console, importing rich on first use"""
+    global _console
+    if _console is None:
+        from .themes import get_themed_console
+        _console = get_themed_console()
+    return _console
 
 
 def show_banner():
     """display the code route banner"""
+    from rich.align import Align
+    from rich.panel import Panel
+    from rich.text import Text
+
+    from .themes import STATUS_ICONS
+
     title_text = Text()
     title_text.append("🛤️  ", style="bright_yellow")
     title_text.append("CODE ROUTE", style="bright_blue bold")
@@ -47,7 +64,7 @@ def show_banner():
         )
     )
     
-    console.print(Panel(
+    get_console().print(Panel(
         banner_content,
         style="primary",
         border_style="bright_blue",
@@ -58,6 +75,8 @@ def show_banner():
 
 
 def _has_usable_model() -> bool:
+    from .config import Config
+
     for settings in Config.MODEL_SETTINGS.values():
         provider = settings.get("provider")
         base_url = settings.get("base_url")
@@ -80,6 +99,11 @@ def check_config():
     if _has_usable_model():
         return True
 
+    from rich.panel import Panel
+    from rich.text import Text
+
+    from .themes import STATUS_ICONS
+
     error_panel = Panel(
         Text.assemble(
             (f"{STATUS_ICONS['error']} Missing model credentials\n\n", "bold red"),
@@ -92,12 +116,16 @@ def check_config():
         border_style="red",
         padding=(1, 2)
     )
-    console.print(error_panel)
+    get_console().print(error_panel)
     return False
 
 
 def init_project():
     """initialize code route in the current directory"""
+    from rich.panel import Panel
+
+    from .themes import STATUS_ICONS
+
     cwd = Path.cwd()
     env_file = cwd / ".env"
     
@@ -123,52 +151,73 @@ def init_project():
         padding=(1, 2)
     )
     
-    console.print(init_panel)
+    get_console().print(init_panel)
 
 
 def show_tools():
     """show available tools"""
+    from rich.panel import Panel
+    from rich.table import Table
+    from rich.text import Text
+
+    from .registry import scan_tools, summarize
+    from .themes import STATUS_ICONS
+
     try:
-        assistant = Assistant()
+        tools = scan_tools()
+        counts = summarize(tools)
         tools_table = Table(
-            title=f"{STATUS_ICONS['tool']} Available Tools ({len(assistant.tools)} loaded)",
+            title=f"{STATUS_ICONS['tool']} Available Tools ({counts.get('available', 0)} of {len(tools)} ready)",
+            caption=", ".join(f"{status}: {count}" for status, count in sorted(counts.items())),
             show_header=True,
             header_style="bold cyan",
             border_style="cyan"
         )
         tools_table.add_column("Tool Name", style="bright_yellow", width=25)
         tools_table.add_column("Description", style="white")
+        tools_table.add_column("Status", style="white", width=22)
         
-        for tool in sorted(assistant.tools, key=lambda x: x.get('function', {}).get('name', '')):
-            func_info = tool.get('function', {})
-            name = func_info.get('name', 'Unknown')
-            desc = func_info.get('description', 'No description available')
-            
+        for tool in tools:
+            desc = tool.description or 'No description available'
             if len(desc) > 80:
                 desc = desc[:77] + "..."
+
+            if tool.error:
+                status = f"{STATUS_ICONS['error']} {tool.error}"
+            elif tool.missing_dependencies:
+                status = f"{STATUS_ICONS['warning']} missing {', '.join(tool.missing_dependencies)}"
+            else:
+                status = f"{STATUS_ICONS['success']} ready"
             
-            tools_table.add_row(f"{STATUS_ICONS.get('gear', '⚙️')} {name}", desc)
+            tools_table.add_row(f"{STATUS_ICONS.get('gear', '⚙️')} {tool.name}", desc, status)
         
-        if not assistant.tools:
-            tools_table.add_row("No tools loaded", "Check your configuration")
+        if not tools:
+            tools_table.add_row("No tools found", "Check your configuration", "")
         
-        console.print(tools_table)
+        get_console().print(tools_table)
         return True
     except Exception as e:
         error_text = Text.assemble(
             (f"{STATUS_ICONS['error']} Error loading tools: ", "red"),
             (str(e), "red dim")
         )
-        console.print(Panel(error_text, border_style="red"))
+        get_console().print(Panel(error_text, border_style="red"))
         return False
 
 
 def launch_web():
     """launch the web interface"""
+    import subprocess
+
+    from rich.panel import Panel
+    from rich.text import Text
+
+    from .themes import STATUS_ICONS
+
     launch_text = Text.assemble(
         (f"{STATUS_ICONS['web']} Launching Code Route Web Interface...", "bright_cyan"),
     )
-    console.print(Panel(launch_text, border_style="cyan"))
+    get_console().print(Panel(launch_text, border_style="cyan"))
     
     try:
         import streamlit
@@ -180,17 +229,49 @@ def launch_web():
             ("Install with: ", "white"),
             ("pip install streamlit", "yellow")
         )
-        console.print(Panel(error_text, border_style="red"))
+        get_console().print(Panel(error_text, border_style="red"))
     except Exception as e:
         error_text = Text.assemble(
             (f"{STATUS_ICONS['error']} Error launching web interface:\n", "red"),
             (str(e), "red dim")
         )
-        console.print(Panel(error_text, border_style="red"))
+        get_console().print(Panel(error_text, border_style="red"))
+
+
+def launch_web_lite(host: str, port: int):
+    """launch the lightweight flask + server-sent events interface"""
+    from rich.panel import Panel
+    from rich.text import Text
+
+    from .themes import STATUS_ICONS
+
+    try:
+        from .weblite import run
+    except ImportError as e:
+        error_text = Text.assemble(
+            (f"{STATUS_ICONS['error']} Flask not available: {e}\n", "red"),
+            ("Install with: ", "white"),
+            ("pip install flask", "yellow")
+        )
+        get_console().print(Panel(error_text, border_style="red"))
+        return
+
+    launch_text = Text.assemble(
+        (f"{STATUS_ICONS['web']} Code Route Web Lite on http://{host}:{port}", "bright_cyan"),
+    )
+    get_console().print(Panel(launch_text, border_style="cyan"))
+    run(host=host, port=port)
 
 
 def show_status():
     """show system status"""
+    from rich.table import Table
+
+    from .config import Config
+    from .registry import scan_tools
+    from .ripgrep import describe as describe_search
+    from .themes import STATUS_ICONS
+
     status_table = Table(
         title=f"{STATUS_ICONS['dashboard']} Code Route System Status",
         show_header=True,
@@ -220,14 +301,21 @@ def show_status():
     status_table.add_row("E2B API", e2b_status, e2b_details)
     
     try:
-        assistant = Assistant()
-        tool_count = len(assistant.tools)
-        tools_status = f"{STATUS_ICONS['success']} {tool_count} loaded"
-        tools_details = f"Ready for use"
+        tools = scan_tools()
+        unavailable = [tool.name for tool in tools if not tool.available]
+        tools_status = f"{STATUS_ICONS['success']} {len(tools) - len(unavailable)} ready"
+        if unavailable:
+            tools_details = f"Unavailable: {', '.join(unavailable)}"
+        else:
+            tools_details = "Ready for use"
     except Exception as e:
         tools_status = f"{STATUS_ICONS['error']} Error"
         tools_details = str(e)[:50] + "..." if len(str(e)) > 50 else str(e)
     status_table.add_row("Tools", tools_status, tools_details)
+
+    search_ok, search_details = describe_search()
+    search_status = f"{STATUS_ICONS['success']} Ready" if search_ok else f"{STATUS_ICONS['warning']} Fallback"
+    status_table.add_row("Search", search_status, search_details)
     
     cwd = Path.cwd()
     env_exists = (cwd / ".env").exists()
@@ -235,7 +323,66 @@ def show_status():
     dir_details = str(cwd)
     status_table.add_row("Directory", dir_status, dir_details)
     
-    console.print(status_table)
+    get_console().print(status_table)
+
+
+def _time_fresh_process(cli_args, runs: int = 3) -> float:
+    """wall-clock milliseconds for the cli in a fresh interpreter (best of runs)"""
+    import subprocess
+
+    best = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-m", "code_route.cli", *cli_args],
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=False)
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def profile_startup():
+    """import each startup module in turn and report the time spent on it"""
+    import importlib
+
+    # measured first, before this process has imported anything heavy
+    version_ms = _time_fresh_process(["--version"])
+
+    timings = []
+    for label, module_name in STARTUP_IMPORTS:
+        already_loaded = module_name in sys.modules
+        start = time.perf_counter()
+        importlib.import_module(module_name)
+        timings.append((label, module_name, (time.perf_counter() - start) * 1000, already_loaded))
+
+    from rich.table import Table
+
+    from .config import Config
+    from .themes import STATUS_ICONS
+
+    interactive_ms = sum(ms for _, _, ms, _ in timings)
+
+    table = Table(
+        title=f"{STATUS_ICONS['dashboard']} Startup Profile",
+        show_header=True,
+        header_style="bold cyan",
+        border_style="cyan"
+    )
+    table.add_column("Step", style="bright_cyan", width=16)
+    table.add_column("Module", style="white")
+    table.add_column("Time", style="bright_yellow", justify="right")
+
+    for label, module_name, ms, already_loaded in timings:
+        table.add_row(label, module_name + (" (already loaded)" if already_loaded else ""), f"{ms:.1f} ms")
+
+    def _budget_row(name: str, spent: float, budget: int) -> None:
+        icon = STATUS_ICONS['success'] if spent <= budget else STATUS_ICONS['warning']
+        table.add_row(name, f"{icon} budget {budget} ms", f"{spent:.1f} ms", style="bold")
+
+    # non-interactive: full process wall time for --version; interactive: imports on top of that
+    _budget_row("non-interactive", version_ms, Config.STARTUP_BUDGET_MS)
+    _budget_row("interactive", version_ms + interactive_ms, Config.INTERACTIVE_STARTUP_BUDGET_MS)
+
+    get_console().print(table)
 
 
 def main():
@@ -247,21 +394,31 @@ def main():
 Examples:
   code-route              Start interactive assistant
   code-route --web        Launch web interface
+  code-route --web-lite   Launch the lightweight streaming web interface
   code-route --init       Initialize in current directory
   code-route --tools      Show available tools
   code-route --status     Show system status
+  code-route --profile-startup  Report time spent importing startup modules
         """
     )
     
     parser.add_argument("--web", action="store_true", help="Launch web interface")
+    parser.add_argument("--web-lite", action="store_true", help="Launch the lightweight Flask + SSE web interface")
+    parser.add_argument("--host", default="127.0.0.1", help="Host for --web-lite (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=5000, help="Port for --web-lite (default: 5000)")
     parser.add_argument("--init", action="store_true", help="Initialize Code Route in current directory")
     parser.add_argument("--tools", action="store_true", help="Show available tools")
     parser.add_argument("--status", action="store_true", help="Show system status")
-    parser.add_argument("--version", action="version", version=f"Code Route {getattr(Config, 'VERSION', '0.1.0')}")
+    parser.add_argument("--version", action="version", version=f"Code Route {__version__}")
     parser.add_argument("--no-banner", action="store_true", help="Skip banner display")
+    parser.add_argument("--profile-startup", action="store_true", help="Report time spent per startup import")
     
     args = parser.parse_args()
     
+    if args.profile_startup:
+        profile_startup()
+        return
+    
     if args.init:
         init_project()
         return
@@ -274,8 +431,6 @@ Examples:
         show_banner()
     
     if args.tools:
-        if not check_config():
-            sys.exit(1)
         show_tools()
         return
     
@@ -285,17 +440,23 @@ Examples:
         launch_web()
         return
     
+    if args.web_lite:
+        if not check_config():
+            sys.exit(1)
+        launch_web_lite(args.host, args.port)
+        return
+    
     if not check_config():
-        console.print("\n💡 Use 'code-route --init' to set up a new project")
+        get_console().print("\n💡 Use 'code-route --init' to set up a new project")
         sys.exit(1)
     
     try:
         from .assistant import main as assistant_main
         assistant_main()
     except KeyboardInterrupt:
-        console.print("\n[bold blue]👋 Goodbye![/bold blue]")
+        get_console().print("\n[bold blue]👋 Goodbye![/bold blue]")
     except Exception as e:
-        console.print(f"[red]Error starting assistant: {e}[/red]")
+        get_console().print(f"[red]Error starting assistant: {e}[/red]")
         sys.exit(1)
 
 
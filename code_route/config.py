@@ -58,6 +58,7 @@ class Config:
             "provider": "lmstudio",
             "base_url": LMSTUDIO_API_BASE,
             "api_key": LMSTUDIO_API_KEY,
+            "image_max_dimension": 1024,  # local vision models work on small inputs
         },
     }
 
@@ -67,11 +68,53 @@ class Config:
     MAX_TOKENS = 20000
     MAX_CONVERSATION_TOKENS = 20000000  # max tokens per convo
 
+    # images are downscaled so their longest side fits; models can override
+    # this with "image_max_dimension" in MODEL_SETTINGS
+    IMAGE_MAX_DIMENSION = 1568
+    # image files larger than this are not read
+    IMAGE_MAX_FILE_BYTES = 20 * 1024 * 1024
+    # images sent as data on each call; older and repeated ones become text placeholders
+    INLINE_IMAGE_LIMIT = 2
+
     # paths
     BASE_DIR = Path(__file__).parent
     TOOLS_DIR = BASE_DIR / "tools"
     PROMPTS_DIR = BASE_DIR / "prompts"
 
+    # startup budgets in milliseconds, checked by `code-route --profile-startup`
+    STARTUP_BUDGET_MS = 100  # --version, --help, --init
+    INTERACTIVE_STARTUP_BUDGET_MS = 1500  # imports needed before the first prompt
+
+    # greptool keeps a trigram index in <workspace>/.code_route/ for searches over
+    # at least this many files; None disables the index
+    GREP_INDEX_MIN_FILES = 2000
+    # "auto" hands greptool and globtool work to ripgrep when rg is on PATH,
+    # "ripgrep" does the same but reports a missing rg in --status, "python"
+    # always uses the built-in engine
+    SEARCH_BACKEND = os.getenv("CODE_ROUTE_SEARCH_BACKEND", "auto").lower()
+
+    # greptool results per page, and results counted before a search stops
+    GREP_HEAD_LIMIT = 250
+    GREP_MAX_RESULTS = 5000
+    # paths globtool returns at most, unless a call asks for more
+    GLOB_MAX_RESULTS = 1000
+    # lstool entries shown per directory, and lines per listing
+    LS_MAX_ENTRIES = 200
+    LS_MAX_LINES = 2000
+    # filecontentreadertool content per file; longer files are cut at a line
+    # boundary with a marker giving the offset to continue from
+    READ_MAX_BYTES = 256 * 1024
+    # content read from one directory in total; files beyond it get an outline
+    READ_DIRECTORY_MAX_BYTES = 256 * 1024
+    # "text" frames filecontentreadertool results as plain text under a header
+    # per file (see framing.py); "json" returns a path-to-content object
+    READ_OUTPUT_FORMAT = "text"
+    # file contents the file tools keep in memory across calls in a session
+    FILE_CACHE_MAX_BYTES = 64 * 1024 * 1024
+    # list the working directory into the workspace snapshot on a background
+    # thread when a session starts, so the first search finds it warm
+    WARM_WORKSPACE_SNAPSHOT = True
+
     # assistant config
     ENABLE_THINKING = True
     SHOW_TOOL_USAGE = True
@@ -0,0 +1,165 @@
+"""
+session-wide cache of file contents
+
+the file tools read the same files over and over in one session: the model
+reads a file, greps it, edits it and reads it again. every read goes
+through this module, which keeps the bytes of recently read files (and
+their decoded text, per encoding) in an LRU bounded by
+Config.FILE_CACHE_MAX_BYTES. an entry is used only while the file's mtime
+and size are unchanged, so a stat is all a repeated read costs.
+
+the edit tools write through write_text()/write_bytes(), which drop the old
+content from the cache. files changed within RACY_SECONDS are not cached,
+which includes files just written, since a second change in the same
+mtime tick with the same size would go unnoticed.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from .config import Config
+
+RACY_SECONDS = 2.0
+
+
+class _Entry:
+    def __init__(self, stamp: Tuple[int, int], data: bytes):
+        self.stamp = stamp
+        self.data = data
+        # decoded text by (encoding, errors, newline)
+        self.texts: Dict[Tuple[str, str, Optional[str]], str] = {}
+        self.cost = len(data)
+
+
+_entries: "OrderedDict[str, _Entry]" = OrderedDict()
+_size = 0
+_lock = threading.Lock()
+
+
+def _stamp(st: os.stat_result) -> Tuple[int, int]:
+    return st.st_mtime_ns, st.st_size
+
+
+def _max_entry_bytes() -> int:
+    return Config.FILE_CACHE_MAX_BYTES // 8
+
+
+def _get(path: str, stamp: Tuple[int, int]) -> Optional[_Entry]:
+    with _lock:
+        entry = _entries.get(path)
+        if entry is None:
+            return None
+        if entry.stamp != stamp:
+            _drop(path)
+            return None
+        _entries.move_to_end(path)
+        return entry
+
+
+def _drop(path: str) -> None:
+    global _size
+    entry = _entries.pop(path, None)
+    if entry is not None:
+        _size -= entry.cost
+
+
+def _evict() -> None:
+    while _size > Config.FILE_CACHE_MAX_BYTES and _entries:
+        _drop(next(iter(_entries)))
+
+
+def _put(path: str, entry: _Entry) -> None:
+    global _size
+    with _lock:
+        _drop(path)
+        if entry.cost <= _max_entry_bytes():
+            _entries[path] = entry
+            _size += entry.cost
+            _evict()
+
+
+def _charge(path: str, entry: _Entry, cost: int) -> None:
+    """count decoded text towards the cache size; called with _lock held"""
+    global _size
+    entry.cost += cost
+    if _entries.get(path) is entry:
+        _size += cost
+        _evict()
+
+
+def _load(path: str, max_size: Optional[int]) -> Optional[_Entry]:
+    """the cached or freshly read entry for an absolute path; None when it is over max_size"""
+    stamp = _stamp(os.stat(path))
+    entry = _get(path, stamp)
+    if entry is not None:
+        return entry if max_size is None or stamp[1] <= max_size else None
+    if max_size is not None and stamp[1] > max_size:
+        return None
+    with open(path, "rb") as f:
+        st = os.fstat(f.fileno())
+        data = f.read()
+    entry = _Entry((st.st_mtime_ns, len(data)), data)
+    if time.time_ns() - st.st_mtime_ns > RACY_SECONDS * 1e9 and len(data) == st.st_size:
+        _put(path, entry)
+    return entry
+
+
+def read_bytes(path: str, max_size: Optional[int] = None) -> Optional[bytes]:
+    """the content of a file; None (without reading it) when it is larger than max_size"""
+    entry = _load(os.path.abspath(path), max_size)
+    return entry.data if entry is not None else None
+
+
+def read_text(path: str, encoding: str = "utf-8", errors: str = "strict", newline: Optional[str] = None) -> str:
+    """the decoded content of a file, like open(path, encoding=..., errors=..., newline=...).read()"""
+    path = os.path.abspath(path)
+    entry = _load(path, None)
+    key = (encoding, errors, newline)
+    text = entry.texts.get(key)
+    if text is None:
+        text = entry.data.decode(encoding, errors)
+        if newline is None:
+            text = text.replace("\r\n", "\n").replace("\r", "\n")
+        with _lock:
+            # another thread may have decoded it meanwhile; count it once
+            if key not in entry.texts:
+                entry.texts[key] = text
+                _charge(path, entry, len(text))
+    return text
+
+
+def read_range(path: str, start: int, length: int) -> bytes:
+    """length bytes of a file from start, from the cache when the file is in it"""
+    path = os.path.abspath(path)
+    entry = _get(path, _stamp(os.stat(path)))
+    if entry is not None:
+        return entry.data[start:start + length]
+    with open(path, "rb") as f:
+        f.seek(start)
+        return f.read(length)
+
+
+def write_bytes(path: str, data: bytes) -> None:
+    """write a file and drop its old content from the cache"""
+    with open(path, "wb") as f:
+        f.write(data)
+    # a file just written has a racy mtime, so the next read loads it from disk
+    invalidate(path)
+
+
+def write_text(path: str, text: str, encoding: str = "utf-8", newline: Optional[str] = None) -> None:
+    """write a file like open(path, 'w', encoding=..., newline=...) through write_bytes()"""
+    translated = text
+    if newline is None and os.linesep != "\n":
+        translated = text.replace("\n", os.linesep)
+    elif newline:
+        translated = text.replace("\n", newline)
+    write_bytes(path, translated.encode(encoding))
+
+
+def invalidate(path: str) -> None:
+    with _lock:
+        _drop(os.path.abspath(path))
@@ -0,0 +1,61 @@
+"""
+plain-text framing of several files' contents in one tool result
+
+filecontentreadertool returns {path: content}. as json every newline and
+quote in source code is escaped, which costs tokens on the most frequent
+tool call. frame() writes each file as a header line followed by its text
+unchanged:
+
+    ==> /src/app.py (120 lines) <==
+    ...the 120 lines...
+
+the header gives the line count, so unframe() recovers the exact mapping
+even when a file itself contains header-like lines. content that does not
+end in a newline says so in its header.
+"""
+
+import re
+from typing import Dict
+
+_NO_NEWLINE = ", no newline at end"
+_HEADER = re.compile(r"^==> (.*) \((\d+) lines?((?:, no newline at end)?)\) <==$")
+
+
+def _header(path: str, content: str) -> str:
+    count = content.count("\n")
+    ending = ""
+    if content and not content.endswith("\n"):
+        count += 1
+        ending = _NO_NEWLINE
+    return f"==> {path} ({count} line{'' if count == 1 else 's'}{ending}) <=="
+
+
+def frame(results: Dict[str, str]) -> str:
+    """the contents of several files as one text, a blank line between files"""
+    frames = []
+    for path, content in results.items():
+        body = content if not content or content.endswith("\n") else content + "\n"
+        frames.append(f"{_header(path, content)}\n{body}")
+    return "\n".join(frames)
+
+
+def unframe(text: str) -> Dict[str, str]:
+    """the {path: content} mapping frame() was given"""
+    results: Dict[str, str] = {}
+    lines = text.split("\n")
+    index = 0
+    while index < len(lines):
+        match = _HEADER.match(lines[index])
+        if match is None:
+            if lines[index]:
+                raise ValueError(f"expected a file header at line {index + 1}")
+            index += 1
+            continue
+        path, count, no_newline = match.group(1), int(match.group(2)), bool(match.group(3))
+        body = lines[index + 1:index + 1 + count]
+        content = "\n".join(body)
+        if count and not no_newline:
+            content += "\n"
+        results[path] = content
+        index += 1 + count
+    return results
@@ -0,0 +1,406 @@
+"""
+ignore rules shared by the filesystem tools
+
+greptool, globtool, lstool and filecontentreadertool decide what to skip with
+one engine that follows git's rules: .gitignore files in every directory,
+.git/info/exclude, .coderouteignore files (same syntax, for paths the
+assistant should skip but git should not) and a few built-in defaults for
+version control, dependency and cache directories.
+
+each ignore file is compiled once and cached until it changes, and walks
+prune ignored directories instead of filtering their contents afterwards.
+directory listings, and which of their entries a walk kept, come from the
+session's workspace snapshot (workspace.py).
+"""
+
+import os
+import re
+import threading
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from . import workspace
+
+IGNORE_FILES = (".gitignore", ".coderouteignore")
+
+DEFAULT_RULES = (
+    ".git/", ".svn/", ".hg/",
+    "node_modules/", "bower_components/",
+    "__pycache__/", "*.pyc", "*.pyo",
+    ".venv/", "venv/", ".tox/", ".nox/", ".eggs/",
+    ".mypy_cache/", ".pytest_cache/", ".ruff_cache/",
+    ".code_route/",
+    ".DS_Store",
+)
+
+WalkEntry = Tuple[str, List[os.DirEntry], List[os.DirEntry]]
+
+MAX_SPLITS = 8   # rule-set combinations whose walk results one listing keeps
+
+
+def translate_glob(pattern: str, recursive: bool = True, hidden: bool = True) -> str:
+    """
+    translate a glob into a regex over '/'-separated paths: * and ? stay within
+    one path component and ** spans components (only when recursive). without
+    hidden, names starting with '.' only match a component that starts with '.'
+    too, as in python's glob
+    """
+    out = []
+    i, n = 0, len(pattern)
+    # a component that does not start with '.'
+    visible = "" if hidden else "(?!\\.)"
+    while i < n:
+        c = pattern[i]
+        at_start = i == 0 or pattern[i - 1] == "/"
+        if c == "*":
+            if recursive and pattern.startswith("**", i) and at_start:
+                end = i + 2
+                if end < n and pattern[end] == "/":
+                    # **/ matches zero or more directories
+                    out.append("(?:.*/)?" if hidden else f"(?:{visible}[^/]*/)*")
+                    i = end + 1
+                    continue
+                if end == n:
+                    # trailing ** matches everything below
+                    out.append(".*" if hidden else f"(?:{visible}[^/]*(?:/{visible}[^/]*)*)?")
+                    i = end
+                    continue
+        if at_start and c != ".":
+            out.append(visible)
+        if c == "*":
+            while i < n and pattern[i] == "*":
+                i += 1
+            out.append("[^/]*")
+            continue
+        if c == "?":
+            out.append("[^/]")
+        elif c == "[":
+            end = i + 1
+            if end < n and pattern[end] in "!^":
+                end += 1
+            if end < n and pattern[end] == "]":
+                end += 1
+            end = pattern.find("]", end)
+            if end == -1:
+                out.append("\\[")
+            else:
+                stuff = pattern[i + 1:end].replace("\\", "\\\\")
+                if stuff[0] in "!^":
+                    stuff = "^" + stuff[1:]
+                out.append(f"[{stuff}]")
+                i = end
+        elif c == "\\" and i + 1 < n:
+            i += 1
+            out.append(re.escape(pattern[i]))
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return "".join(out)
+
+
+def expand_braces(pattern: str) -> List[str]:
+    """
+    expand {a,b} alternatives, nested ones included, as shells do; braces
+    without a top-level comma and escaped braces stay literal
+    """
+    i, n = 0, len(pattern)
+    while i < n:
+        c = pattern[i]
+        if c == "\\":
+            i += 2
+            continue
+        if c == "{":
+            depth, j, commas = 1, i + 1, []
+            while j < n and depth:
+                if pattern[j] == "\\":
+                    j += 2
+                    continue
+                if pattern[j] == "{":
+                    depth += 1
+                elif pattern[j] == "}":
+                    depth -= 1
+                elif pattern[j] == "," and depth == 1:
+                    commas.append(j)
+                j += 1
+            if depth == 0 and commas:
+                bounds = [i] + commas + [j - 1]
+                prefix, suffix = pattern[:i], pattern[j:]
+                expanded = []
+                for start, end in zip(bounds, bounds[1:]):
+                    expanded.extend(expand_braces(prefix + pattern[start + 1:end] + suffix))
+                return list(dict.fromkeys(expanded))
+        i += 1
+    return [pattern]
+
+
+def compile_glob(pattern: str, recursive: bool = True, hidden: bool = True):
+    return re.compile(f"(?s:{translate_glob(pattern, recursive, hidden)})\\Z")
+
+
+class _Rule:
+    __slots__ = ("regex", "negate", "dir_only", "anchored")
+
+    def __init__(self, regex, negate: bool, dir_only: bool, anchored: bool):
+        self.regex = regex
+        self.negate = negate
+        self.dir_only = dir_only
+        self.anchored = anchored
+
+
+def _parse_line(line: str) -> Optional[_Rule]:
+    line = line.rstrip("\r\n")
+    if not line or line.startswith("#"):
+        return None
+    # trailing spaces are ignored unless escaped
+    while line.endswith(" ") and not line.endswith("\\ "):
+        line = line[:-1]
+    negate = line.startswith("!")
+    if negate:
+        line = line[1:]
+    dir_only = line.endswith("/")
+    line = line.rstrip("/")
+    # a slash anywhere but the end ties the pattern to the ignore file's directory
+    anchored = "/" in line
+    line = line.lstrip("/")
+    if not line:
+        return None
+    return _Rule(compile_glob(line), negate, dir_only, anchored)
+
+
+class RuleSet:
+    """the compiled rules of one ignore file, relative to the directory it applies to"""
+
+    def __init__(self, lines: Iterable[str], base: str):
+        self.base = base
+        self.rules = [rule for rule in map(_parse_line, lines) if rule is not None]
+        self._any_negated = any(rule.negate for rule in self.rules)
+        self._combined: Dict[bool, Tuple] = {}
+        if not self._any_negated:
+            # without negations the last-match-wins order does not matter; one regex per kind suffices
+            for is_dir in (True, False):
+                rules = [rule for rule in self.rules if is_dir or not rule.dir_only]
+                self._combined[is_dir] = (
+                    self._union(rule.regex for rule in rules if not rule.anchored),
+                    self._union(rule.regex for rule in rules if rule.anchored),
+                )
+
+    @staticmethod
+    def _union(regexes):
+        sources = [regex.pattern for regex in regexes]
+        return re.compile("|".join(f"(?:{source})" for source in sources)) if sources else None
+
+    def __bool__(self) -> bool:
+        return bool(self.rules)
+
+    def match(self, rel_path: str, name: str, is_dir: bool) -> Optional[bool]:
+        """True if ignored, False if explicitly re-included, None if no rule applies"""
+        if not self._any_negated:
+            by_name, by_path = self._combined[is_dir]
+            if (by_name and by_name.match(name)) or (by_path and by_path.match(rel_path)):
+                return True
+            return None
+        result = None
+        for rule in self.rules:
+            if rule.dir_only and not is_dir:
+                continue
+            if rule.regex.match(rel_path if rule.anchored else name):
+                result = not rule.negate
+        return result
+
+
+_cache: Dict[str, Tuple[Tuple[int, int], RuleSet]] = {}
+_cache_lock = threading.Lock()
+
+
+def _load_rules(path: str, base: str) -> Optional[RuleSet]:
+    """compile an ignore file, reusing the cached rules while the file is unchanged"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    stamp = (st.st_mtime_ns, st.st_size)
+    with _cache_lock:
+        cached = _cache.get(path)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+    try:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            rules = RuleSet(f.readlines(), base)
+    except OSError:
+        return None
+    with _cache_lock:
+        _cache[path] = (stamp, rules)
+    return rules
+
+
+_base_rules: Dict[Tuple[str, Tuple[str, ...]], RuleSet] = {}
+
+
+def _base_rule_set(lines: Tuple[str, ...], base: str) -> RuleSet:
+    """built-in and tool rules for a root; one shared object, so snapshot splits can be keyed by it"""
+    key = (base, lines)
+    with _cache_lock:
+        rules = _base_rules.get(key)
+        if rules is None:
+            rules = _base_rules[key] = RuleSet(lines, base)
+    return rules
+
+
+def find_repo_root(path: str) -> Optional[str]:
+    """nearest directory at or above path that contains .git"""
+    current = os.path.abspath(path)
+    while True:
+        if os.path.exists(os.path.join(current, ".git")):
+            return current
+        parent = os.path.dirname(current)
+        if parent == current:
+            return None
+        current = parent
+
+
+class IgnoreFilter:
+    """
+    decides which paths under a root are ignored
+
+    extra_rules are gitignore-syntax lines a tool adds on top of the defaults.
+    """
+
+    def __init__(self, root: str, extra_rules: Iterable[str] = (), use_defaults: bool = True):
+        self.root = os.path.abspath(root)
+        self.repo_root = find_repo_root(self.root)
+        base_rules = (list(DEFAULT_RULES) if use_defaults else []) + list(extra_rules)
+        self._base_chain: List[RuleSet] = []
+        if base_rules:
+            self._base_chain.append(_base_rule_set(tuple(base_rules), self.root))
+        if self.repo_root:
+            exclude = _load_rules(os.path.join(self.repo_root, ".git", "info", "exclude"), self.repo_root)
+            if exclude:
+                self._base_chain.append(exclude)
+        self._chains: Dict[str, List[RuleSet]] = {}
+        self._ignored_dirs: Dict[str, bool] = {}
+
+    def _chain(self, directory: str, names: Optional[Iterable[str]] = None) -> List[RuleSet]:
+        """rule sets that apply inside directory (absolute), lowest precedence first"""
+        chain = self._chains.get(directory)
+        if chain is not None:
+            return chain
+        top = self.repo_root or self.root
+        parent = os.path.dirname(directory)
+        if directory == top or not directory.startswith(top + os.sep) or parent == directory:
+            chain = list(self._base_chain)
+        else:
+            chain = list(self._chain(parent))
+        # a directory listing, when the caller has one, saves a stat per ignore file name
+        present = IGNORE_FILES if names is None else [name for name in IGNORE_FILES if name in names]
+        for name in present:
+            rules = _load_rules(os.path.join(directory, name), directory)
+            if rules:
+                chain.append(rules)
+        self._chains[directory] = chain
+        return chain
+
+    @staticmethod
+    def _decide(chain: List[RuleSet], path: str, name: str, is_dir: bool) -> bool:
+        ignored = False
+        for rules in chain:
+            rel_path = path[len(rules.base) + 1:].replace(os.sep, "/")
+            result = rules.match(rel_path, name, is_dir)
+            if result is not None:
+                ignored = result
+        return ignored
+
+    def is_ignored(self, path: str, is_dir: Optional[bool] = None) -> bool:
+        """whether path, or any directory between the root and it, is ignored"""
+        path = os.path.abspath(path)
+        if is_dir is None:
+            is_dir = os.path.isdir(path)
+        start = self.repo_root or self.root
+        if path == start or not path.startswith(start + os.sep):
+            return False
+        parts = path[len(start) + 1:].split(os.sep)
+        current = start
+        for index, part in enumerate(parts):
+            child = os.path.join(current, part)
+            last = index == len(parts) - 1
+            if self._decide(self._chain(current), child, part, is_dir if last else True):
+                return True
+            current = child
+        return False
+
+    def is_ignored_file(self, path: str) -> bool:
+        """
+        whether walk() from the filter's root would skip a file below it: unlike
+        is_ignored, only the directories below the root count, each decided once
+        """
+        path = os.path.abspath(path)
+        directory, name = os.path.split(path)
+        return self._is_ignored_dir(directory) or self._decide(self._chain(directory), path, name, False)
+
+    def _is_ignored_dir(self, directory: str) -> bool:
+        if directory == self.root or not directory.startswith(self.root + os.sep):
+            return False
+        ignored = self._ignored_dirs.get(directory)
+        if ignored is None:
+            parent, name = os.path.split(directory)
+            ignored = self._is_ignored_dir(parent) or self._decide(self._chain(parent), directory, name, True)
+            self._ignored_dirs[directory] = ignored
+        return ignored
+
+    def walk(self, top: Optional[str] = None, max_depth: Optional[int] = None) -> Iterator[WalkEntry]:
+        """see walk(); top defaults to the filter's root"""
+        return _walk(top if top is not None else self.root, self, max_depth)
+
+
+def _walk(top: str, ignore: Optional[IgnoreFilter], max_depth: Optional[int]) -> Iterator[WalkEntry]:
+    stack = [(top, os.path.abspath(top), 0)]
+    while stack:
+        dirpath, abs_dirpath, depth = stack.pop()
+        listing = workspace.listing(abs_dirpath)
+        if listing is None:
+            continue
+        chain = ignore._chain(abs_dirpath, listing.names) if ignore else []
+        key = tuple(chain)
+        split = listing.splits.get(key)
+        if split is None:
+            split = _split(listing.entries, abs_dirpath, ignore, chain)
+            if len(listing.splits) >= MAX_SPLITS:
+                listing.splits.clear()
+            listing.splits[key] = split
+        dirs, files = list(split[0]), list(split[1])
+
+        # like os.walk, callers may prune dirs in place
+        yield dirpath, dirs, files
+
+        if max_depth is not None and depth >= max_depth:
+            continue
+        for entry in reversed(dirs):
+            if not entry.is_symlink():
+                # snapshot entries keep the path they were first listed under; build it from dirpath
+                stack.append((os.path.join(dirpath, entry.name), os.path.join(abs_dirpath, entry.name), depth + 1))
+
+
+def _split(entries: List[os.DirEntry], abs_dirpath: str, ignore: Optional[IgnoreFilter],
+           chain: List[RuleSet]) -> Tuple[List[os.DirEntry], List[os.DirEntry]]:
+    """(dirs, files) of a listing that the rules keep, sorted by name"""
+    dirs, files = [], []
+    for entry in entries:
+        try:
+            is_dir = entry.is_dir()
+        except OSError:
+            is_dir = False
+        if chain and ignore._decide(chain, os.path.join(abs_dirpath, entry.name), entry.name, is_dir):
+            continue
+        (dirs if is_dir else files).append(entry)
+    dirs.sort(key=lambda entry: entry.name)
+    files.sort(key=lambda entry: entry.name)
+    return dirs, files
+
+
+def walk(top: str, include_ignored: bool = False, extra_rules: Iterable[str] = (),
+         max_depth: Optional[int] = None) -> Iterator[WalkEntry]:
+    """
+    walk top-down like os.walk, yielding (dirpath, dir entries, file entries)
+    sorted by name. ignored entries are left out and ignored directories are
+    never entered, unless include_ignored is set. max_depth 0 lists only top.
+    """
+    ignore = None if include_ignored else IgnoreFilter(top, extra_rules)
+    return _walk(top, ignore, max_depth)
@@ -0,0 +1,264 @@
+"""
+shared image pipeline for screenshots, uploads and image file reads
+
+images are sniffed for their real MIME type, downscaled to the model's maximum
+dimension and re-encoded before they are base64-encoded for the model:
+lossless WebP for screenshots and other few-colour graphics, lossy WebP for
+photos with transparency and JPEG for other photos. encoded variants are
+cached by content hash and target size, so the same image is never
+processed twice.
+
+Pillow is optional: without it images pass through unchanged, with their
+detected MIME type.
+"""
+
+import base64
+import hashlib
+import io
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from .config import Config
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+# what opening or re-encoding a damaged or hostile image raises
+DECODE_ERRORS: Tuple[type, ...] = (OSError, ValueError, SyntaxError)
+if Image is not None:
+    DECODE_ERRORS += (Image.DecompressionBombError,)
+
+# magic numbers for the formats vision models accept
+_SIGNATURES = (
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+)
+
+JPEG_QUALITY = 85
+WEBP_QUALITY = 90
+GRAPHIC_MAX_COLORS = 256     # images with at most this many colours are treated as graphics
+CACHE_ENTRIES = 64
+
+_cache: "OrderedDict[Tuple[str, int], EncodedImage]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+class EncodedImage:
+    """an image ready to be sent to a model"""
+
+    def __init__(self, data: bytes, media_type: str, width: Optional[int] = None,
+                 height: Optional[int] = None, digest: Optional[str] = None):
+        self.data = data
+        self.media_type = media_type
+        self.width = width
+        self.height = height
+        self.digest = digest or hashlib.sha256(data).hexdigest()
+        self._base64: Optional[str] = None
+
+    @property
+    def byte_size(self) -> int:
+        return len(self.data)
+
+    @property
+    def base64(self) -> str:
+        if self._base64 is None:
+            self._base64 = base64.b64encode(self.data).decode("ascii")
+        return self._base64
+
+    def to_block(self) -> Dict[str, Any]:
+        """the image content block used in conversation messages"""
+        return {
+            "type": "image",
+            "source": {
+                "type": "base64",
+                "media_type": self.media_type,
+                "data": self.base64,
+            }
+        }
+
+    def describe(self) -> str:
+        size = f"{self.width}x{self.height} " if self.width and self.height else ""
+        return f"{size}{self.media_type}, {self.byte_size // 1024}KB"
+
+
+def detect_mime(data: bytes) -> Optional[str]:
+    """detect an image MIME type from its leading bytes; None if not a known image"""
+    for signature, mime in _SIGNATURES:
+        if data.startswith(signature):
+            return mime
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "image/webp"
+    return None
+
+
+def max_dimension_for_model(model: Optional[str]) -> int:
+    """longest image side the given model should receive"""
+    settings = Config.MODEL_SETTINGS.get(model or "", {})
+    return settings.get("image_max_dimension", Config.IMAGE_MAX_DIMENSION)
+
+
+# the model tools on this thread produce images for; tools are created without one
+_active = threading.local()
+
+
+def set_active_model(model: Optional[str]) -> None:
+    _active.model = model
+
+
+def active_max_dimension() -> int:
+    """longest image side for the model the running tool works for"""
+    return max_dimension_for_model(getattr(_active, "model", None))
+
+
+def _is_graphic(image: "Image.Image") -> bool:
+    """screenshots, diagrams and UI captures have few distinct colours; photos have many"""
+    sample = image.copy()
+    sample.thumbnail((128, 128))
+    return sample.convert("RGB").getcolors(GRAPHIC_MAX_COLORS) is not None
+
+
+def _encode(data: bytes, mime: Optional[str], max_dimension: int, digest: str) -> EncodedImage:
+    if Image is None:
+        return EncodedImage(data, mime or "application/octet-stream", digest=digest)
+
+    with Image.open(io.BytesIO(data)) as image:
+        image.load()
+        if getattr(image, "is_animated", False):
+            # re-encoding would drop frames; pass animations through untouched
+            return EncodedImage(data, mime or "image/gif", image.width, image.height, digest)
+
+        resized = max(image.size) > max_dimension
+        if resized:
+            image.thumbnail((max_dimension, max_dimension), Image.LANCZOS)
+
+        has_alpha = image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info)
+        buffer = io.BytesIO()
+        if _is_graphic(image):
+            # text and flat colours compress far better losslessly than as JPEG or lossy WebP
+            image.save(buffer, format="WEBP", lossless=True, method=4)
+            media_type = "image/webp"
+        elif has_alpha:
+            image.save(buffer, format="WEBP", quality=WEBP_QUALITY, method=4)
+            media_type = "image/webp"
+        else:
+            image.convert("RGB").save(buffer, format="JPEG", quality=JPEG_QUALITY, optimize=True)
+            media_type = "image/jpeg"
+        encoded = buffer.getvalue()
+
+        if not resized and mime and len(data) <= len(encoded):
+            # the original is already small enough and smaller than any re-encode
+            return EncodedImage(data, mime, image.width, image.height, digest)
+        return EncodedImage(encoded, media_type, image.width, image.height)
+
+
+def prepare_image(data: bytes, max_dimension: Optional[int] = None) -> EncodedImage:
+    """downscale and re-encode image bytes for a model, using the shared cache"""
+    max_dimension = max_dimension or Config.IMAGE_MAX_DIMENSION
+    digest = hashlib.sha256(data).hexdigest()
+    key = (digest, max_dimension)
+
+    with _cache_lock:
+        cached = _cache.get(key)
+        if cached is not None:
+            _cache.move_to_end(key)
+            return cached
+
+    encoded = _encode(data, detect_mime(data), max_dimension, digest)
+
+    with _cache_lock:
+        _cache[key] = encoded
+        if len(_cache) > CACHE_ENTRIES:
+            _cache.popitem(last=False)
+    return encoded
+
+
+def prepare_pil_image(image: "Image.Image", max_dimension: Optional[int] = None) -> EncodedImage:
+    """prepare an in-memory Pillow image (e.g. a screenshot) without a PNG round trip per size"""
+    max_dimension = max_dimension or Config.IMAGE_MAX_DIMENSION
+    if max(image.size) > max_dimension:
+        image = image.copy()
+        image.thumbnail((max_dimension, max_dimension), Image.LANCZOS)
+    buffer = io.BytesIO()
+    # a lossless intermediate keeps the cache keyed on pixel content
+    image.save(buffer, format="PNG", compress_level=1)
+    return prepare_image(buffer.getvalue(), max_dimension)
+
+
+def is_image_block(block: Any) -> bool:
+    """True for an inline base64 image content block"""
+    return (isinstance(block, dict) and block.get("type") == "image"
+            and isinstance(block.get("source"), dict) and block["source"].get("type") == "base64")
+
+
+def is_image_ref(block: Any) -> bool:
+    """True for a reference to an image held in an ImageStore"""
+    return isinstance(block, dict) and block.get("type") == "image_ref" and "digest" in block
+
+
+class ImageStore:
+    """
+    content-addressed store for the images of one conversation
+
+    the conversation history holds small image_ref blocks instead of base64
+    data; each distinct image is stored once, however often it is attached or
+    captured. the assistant resolves references back into image blocks (or
+    text placeholders) when it assembles a request.
+    """
+
+    def __init__(self):
+        self._images: Dict[str, EncodedImage] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._images)
+
+    def __contains__(self, digest: str) -> bool:
+        return digest in self._images
+
+    def add(self, image: EncodedImage) -> Dict[str, Any]:
+        """store an image (a no-op if already present) and return its reference block"""
+        with self._lock:
+            image = self._images.setdefault(image.digest, image)
+        return {
+            "type": "image_ref",
+            "digest": image.digest,
+            "media_type": image.media_type,
+            "description": image.describe(),
+        }
+
+    def add_block(self, block: Dict[str, Any]) -> Dict[str, Any]:
+        """store the image of an inline base64 image block and return its reference block"""
+        source = block["source"]
+        data = base64.b64decode(source["data"])
+        image = EncodedImage(data, source.get("media_type") or detect_mime(data) or "image/png")
+        # keep the already-encoded text so inlining it again costs nothing
+        image._base64 = source["data"]
+        return self.add(image)
+
+    def get(self, digest: str) -> Optional[EncodedImage]:
+        return self._images.get(digest)
+
+    def intern(self, content: Any) -> Any:
+        """
+        return content with every inline image block, at any depth of nested
+        lists and dicts, replaced by a reference; content without images is
+        returned as is
+        """
+        if is_image_block(content):
+            return self.add_block(content)
+        if isinstance(content, list):
+            interned = [self.intern(item) for item in content]
+            return content if all(a is b for a, b in zip(interned, content)) else interned
+        if isinstance(content, dict):
+            interned = {key: self.intern(value) for key, value in content.items()}
+            return content if all(interned[key] is value for key, value in content.items()) else interned
+        return content
+
+    def clear(self) -> None:
+        with self._lock:
+            self._images.clear()
@@ -0,0 +1,98 @@
+"""
+byte offsets of the lines of a file, for reads of a line range
+
+filecontentreadertool reads "lines 12000-12080" by seeking to the first
+line's offset and reading up to the last one's end, instead of decoding the
+file from the start. an index is built with one binary pass over the file
+and cached by path until the file's mtime or size changes.
+"""
+
+import os
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Tuple
+
+MAX_INDEXES = 64
+CHUNK_BYTES = 1024 * 1024
+
+
+class LineIndex:
+    """where each line starts; a last line without a newline still counts"""
+
+    def __init__(self, starts: array, size: int, mtime_ns: int):
+        self._starts = starts
+        self.size = size
+        self.mtime_ns = mtime_ns
+
+    @property
+    def line_count(self) -> int:
+        return len(self._starts)
+
+    def start(self, line: int) -> int:
+        """byte offset of a 1-based line; one past the last line is the file size"""
+        if line > len(self._starts):
+            return self.size
+        return self._starts[line - 1]
+
+    def span(self, first: int, last: int) -> Tuple[int, int]:
+        """(offset, length) in bytes of lines first..last, inclusive"""
+        start = self.start(first)
+        return start, self.start(last + 1) - start
+
+    def last_line_within(self, first: int, max_bytes: int) -> int:
+        """the last line from first on that keeps lines first.. within max_bytes (first at least)"""
+        limit = self.start(first) + max_bytes
+        low, high = first, len(self._starts)
+        while low < high:
+            middle = (low + high + 1) // 2
+            if self.start(middle + 1) <= limit:
+                low = middle
+            else:
+                high = middle - 1
+        return low
+
+
+def build(path: str) -> LineIndex:
+    starts = array("q")
+    size = 0
+    with open(path, "rb") as f:
+        mtime_ns = os.fstat(f.fileno()).st_mtime_ns
+        while True:
+            chunk = f.read(CHUNK_BYTES)
+            if not chunk:
+                break
+            position = chunk.find(b"\n")
+            while position != -1:
+                starts.append(size + position + 1)
+                position = chunk.find(b"\n", position + 1)
+            size += len(chunk)
+    if size:
+        starts.insert(0, 0)
+        if starts[-1] == size:
+            # a final newline does not start another line
+            starts.pop()
+    return LineIndex(starts, size, mtime_ns)
+
+
+_indexes: "OrderedDict[str, Tuple[int, int, LineIndex]]" = OrderedDict()
+_lock = threading.Lock()
+
+
+def get_index(path: str) -> LineIndex:
+    """the cached index of path, rebuilt when the file has changed"""
+    path = os.path.abspath(path)
+    st = os.stat(path)
+    with _lock:
+        cached = _indexes.get(path)
+        if cached is not None and cached[:2] == (st.st_mtime_ns, st.st_size):
+            _indexes.move_to_end(path)
+            return cached[2]
+    index = build(path)
+    with _lock:
+        # keyed by what was read, so a file that changed meanwhile is indexed again next time
+        _indexes[path] = (index.mtime_ns, index.size, index)
+        _indexes.move_to_end(path)
+        while len(_indexes) > MAX_INDEXES:
+            _indexes.popitem(last=False)
+    return index
@@ -0,0 +1,47 @@
+"""
+outlines of source files: the lines that define classes and functions
+
+filecontentreadertool returns an outline instead of the content for files
+that do not fit a directory read's byte budget, so the model still sees
+what is in them and can read the interesting parts by line range. python
+files are outlined from their syntax tree, other files by matching common
+definition keywords.
+"""
+
+import ast
+import re
+from typing import List
+
+MAX_LINES = 100
+MAX_LINE_CHARS = 160
+
+_DEFINITION = re.compile(
+    r"^\s*(?:export\s+)?(?:default\s+)?"
+    r"(?:(?:public|private|protected|internal|static|async|abstract|final|pub(?:\(\w+\))?)\s+)*"
+    r"(?:def|class|function|fn|func|interface|struct|enum|trait|impl|type|namespace)\s+[A-Za-z_$<(]"
+)
+
+
+def _python_lines(text: str) -> List[int]:
+    tree = ast.parse(text)
+    return sorted(
+        node.lineno for node in ast.walk(tree)
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef))
+    )
+
+
+def outline(path: str, text: str) -> List[str]:
+    """numbered definition lines of a file, like a read with line_numbers"""
+    lines = text.split("\n")
+    numbers: List[int] = []
+    if path.endswith(".py"):
+        try:
+            numbers = _python_lines(text)
+        except (SyntaxError, ValueError):
+            numbers = []
+    if not numbers:
+        numbers = [number for number, line in enumerate(lines, 1) if _DEFINITION.match(line)]
+    shown = [f"{number:6}\t{lines[number - 1].rstrip()[:MAX_LINE_CHARS]}" for number in numbers[:MAX_LINES]]
+    if len(numbers) > MAX_LINES:
+        shown.append(f"... {len(numbers) - MAX_LINES} more definitions")
+    return shown
@@ -0,0 +1,194 @@
+"""
+tool registry - introspection and process-wide caching of tools
+
+scan_tools() discovers tools by statically parsing the modules in
+Config.TOOLS_DIR, so listing them never imports tool code, instantiates
+tools or creates API clients. this is what `code-route --tools` and
+`--status` use.
+
+get_catalog() holds the loaded tool classes and their schemas once per
+process, so every Assistant (e.g. one per web session) shares them instead
+of re-importing the tools directory.
+"""
+
+import ast
+import importlib.util
+import pkgutil
+import sys
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Type
+
+from .config import Config
+
+# modules in the tools directory that never define tools
+SKIPPED_MODULES = {"base"}
+
+
+class ToolInfo:
+    """static description of a tool, as read from its module source"""
+
+    def __init__(self, module: str, class_name: Optional[str] = None, name: Optional[str] = None,
+                 description: str = "", dependencies: Optional[List[str]] = None,
+                 missing_dependencies: Optional[List[str]] = None, error: Optional[str] = None):
+        self.module = module
+        self.class_name = class_name
+        self.name = name or module
+        self.description = description
+        self.dependencies = dependencies or []
+        self.missing_dependencies = missing_dependencies or []
+        self.error = error
+
+    @property
+    def available(self) -> bool:
+        return not self.error and not self.missing_dependencies
+
+    @property
+    def status(self) -> str:
+        if self.error:
+            return "error"
+        if self.missing_dependencies:
+            return "missing dependency"
+        return "available"
+
+    def __repr__(self) -> str:
+        return f"ToolInfo(name={self.name!r}, module={self.module!r}, status={self.status!r})"
+
+
+def _is_base_tool(node: ast.ClassDef) -> bool:
+    for base in node.bases:
+        if isinstance(base, ast.Name) and base.id == "BaseTool":
+            return True
+        if isinstance(base, ast.Attribute) and base.attr == "BaseTool":
+            return True
+    return False
+
+
+def _constant_str(node: Optional[ast.AST]) -> Optional[str]:
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return node.value
+    return None
+
+
+def _class_string_attribute(node: ast.ClassDef, attribute: str) -> Optional[str]:
+    """read a string attribute defined as `attr = "..."` or as a property returning a literal"""
+    for item in node.body:
+        if isinstance(item, ast.Assign):
+            if any(isinstance(t, ast.Name) and t.id == attribute for t in item.targets):
+                return _constant_str(item.value)
+        elif isinstance(item, ast.AnnAssign):
+            if isinstance(item.target, ast.Name) and item.target.id == attribute:
+                return _constant_str(item.value)
+        elif isinstance(item, ast.FunctionDef) and item.name == attribute:
+            for statement in ast.walk(item):
+                if isinstance(statement, ast.Return):
+                    return _constant_str(statement.value)
+    return None
+
+
+def _module_dependencies(tree: ast.Module) -> List[str]:
+    """top-level absolute imports of a module, including those inside module-level try blocks"""
+    dependencies: List[str] = []
+    statements = list(tree.body)
+    while statements:
+        statement = statements.pop(0)
+        if isinstance(statement, ast.Import):
+            names = [alias.name for alias in statement.names]
+        elif isinstance(statement, ast.ImportFrom) and statement.level == 0 and statement.module:
+            names = [statement.module]
+        elif isinstance(statement, ast.Try):
+            statements[:0] = statement.body
+            continue
+        else:
+            # imports under `if` (TYPE_CHECKING, version guards) are not hard requirements
+            continue
+        for name in names:
+            root = name.split(".")[0]
+            if root not in dependencies:
+                dependencies.append(root)
+    return dependencies
+
+
+def _is_importable(module_name: str) -> bool:
+    stdlib = getattr(sys, "stdlib_module_names", ())
+    if module_name in stdlib or module_name in sys.modules:
+        return True
+    try:
+        return importlib.util.find_spec(module_name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+def inspect_tool_module(path: Path) -> List[ToolInfo]:
+    """statically inspect one tool module and describe the tools it defines"""
+    module = path.stem
+    try:
+        tree = ast.parse(path.read_text(encoding="utf-8"), filename=str(path))
+    except SyntaxError as e:
+        return [ToolInfo(module, error=f"Syntax error on line {e.lineno}: {e.msg}")]
+    except (OSError, UnicodeDecodeError) as e:
+        return [ToolInfo(module, error=f"Unable to read module: {e!s}")]
+
+    dependencies = _module_dependencies(tree)
+    missing = [dep for dep in dependencies if not _is_importable(dep)]
+
+    tools = []
+    for node in tree.body:
+        if not isinstance(node, ast.ClassDef) or not _is_base_tool(node):
+            continue
+        name = _class_string_attribute(node, "name")
+        description = _class_string_attribute(node, "description") or ""
+        error = None if name else "Tool name is not a string literal"
+        tools.append(ToolInfo(
+            module,
+            class_name=node.name,
+            name=name,
+            description=" ".join(description.split()),
+            dependencies=dependencies,
+            missing_dependencies=missing,
+            error=error,
+        ))
+    return tools
+
+
+def scan_tools(tools_dir: Optional[Path] = None) -> List[ToolInfo]:
+    """describe every tool in the tools directory without importing any of them"""
+    tools_dir = Path(tools_dir or Config.TOOLS_DIR)
+    tools: List[ToolInfo] = []
+    for module_info in pkgutil.iter_modules([str(tools_dir)]):
+        if module_info.name in SKIPPED_MODULES or module_info.ispkg:
+            continue
+        tools.extend(inspect_tool_module(tools_dir / f"{module_info.name}.py"))
+    return sorted(tools, key=lambda tool: tool.name)
+
+
+def summarize(tools: List[ToolInfo]) -> Dict[str, int]:
+    """count tools by status"""
+    counts: Dict[str, int] = {}
+    for tool in tools:
+        counts[tool.status] = counts.get(tool.status, 0) + 1
+    return counts
+
+
+class ToolCatalog:
+    """loaded tool classes and the schemas sent to the model; treat as read-only"""
+
+    def __init__(self, schemas: List[Dict[str, Any]], classes: Dict[str, Type]):
+        self.schemas = schemas
+        self.classes = classes
+
+    def tool_class(self, name: str) -> Optional[Type]:
+        return self.classes.get(name)
+
+
+_catalog: Optional[ToolCatalog] = None
+_catalog_lock = threading.Lock()
+
+
+def get_catalog(loader: Callable[[], ToolCatalog], refresh: bool = False) -> ToolCatalog:
+    """return the process-wide catalog, building it with loader on first use or on refresh"""
+    global _catalog
+    with _catalog_lock:
+        if _catalog is None or refresh:
+            _catalog = loader()
+        return _catalog
@@ -0,0 +1,288 @@
+"""
+optional ripgrep backend for greptool and globtool
+
+when an rg binary is on PATH (and Config.SEARCH_BACKEND allows it) searches
+and file listings are handed to it: `rg --json` for every grep output mode
+and `rg --files` for enumeration. its results are turned back into the same
+FileResult objects the python engine produces, so the tools format both
+alike.
+
+ripgrep is told to follow the same ignore rules as ignore.py (.gitignore
+files inside and outside git repositories, .git/info/exclude and the
+built-in defaults, but not .ignore/.rgignore or the global gitignore), and
+every path it returns is checked against the shared IgnoreFilter as well,
+which also covers .coderouteignore. patterns ripgrep's regex engine rejects
+(look-around, backreferences, line breaks) or reads differently from python
+make the callers fall back to the python engine.
+
+ripgrep runs unsorted, since --sort makes it single-threaded. search()
+orders its results by path in python; list_files() leaves the order to
+its caller.
+"""
+
+import base64
+import json
+import os
+import shutil
+import subprocess
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from .config import Config
+from .ignore import DEFAULT_RULES, IgnoreFilter
+from .search import CONTENT, COUNT, FILES_WITH_MATCHES, FileResult
+
+MAX_PATH_ARGUMENTS = 1000   # longer explicit file lists go to the python engine
+
+# syntax both engines accept but read differently: posix classes and class set
+# operations in rust, word-boundary escapes \< and \> in recent rust versions
+_DIVERGENT_SYNTAX = ("[[:", "\\<", "\\>", "&&", "--", "~~", "||")
+
+_END_MESSAGE = b'{"type":"end"'   # rg --json writes the message type first
+
+_rg_path: Optional[str] = None
+_rg_checked = False
+
+
+class RipgrepError(Exception):
+    """ripgrep could not run a search; the caller should use the python engine"""
+
+
+def rg_path() -> Optional[str]:
+    """path of the rg binary, looked up once per process"""
+    global _rg_path, _rg_checked
+    if not _rg_checked:
+        _rg_path = shutil.which("rg")
+        _rg_checked = True
+    return _rg_path
+
+
+def enabled() -> bool:
+    """whether greptool and globtool should try ripgrep first"""
+    return Config.SEARCH_BACKEND != "python" and rg_path() is not None
+
+
+def describe() -> Tuple[bool, str]:
+    """(ok, details) about the search backend, for status displays"""
+    backend = Config.SEARCH_BACKEND
+    if backend == "python":
+        return True, "Python engine (SEARCH_BACKEND=python)"
+    if rg_path() is None:
+        ok = backend != "ripgrep"
+        return ok, "Python engine (rg not found on PATH)"
+    return True, f"ripgrep ({rg_path()}), Python engine as fallback"
+
+
+def supports(pattern: str) -> bool:
+    """False for patterns ripgrep would read differently from python's re"""
+    return not any(syntax in pattern for syntax in _DIVERGENT_SYNTAX)
+
+
+def _ignore_args(include_ignored: bool) -> List[str]:
+    if include_ignored:
+        return ["--hidden", "--no-ignore"]
+    args = ["--hidden", "--no-require-git", "--no-ignore-dot", "--no-ignore-global"]
+    for rule in DEFAULT_RULES:
+        args += ["--glob", f"!{rule}"]
+    return args
+
+
+def _common_args(include_ignored: bool, max_depth: Optional[int]) -> List[str]:
+    args = ["--no-config", "--no-messages"] + _ignore_args(include_ignored)
+    if max_depth is not None:
+        # rg counts the children of a directory argument as depth 1; walk() counts them as 0
+        args += ["--max-depth", str(max_depth + 1)]
+    return args
+
+
+def _ignore_check(paths: List[str], include_ignored: bool) -> Callable[[str], bool]:
+    """is_ignored for results found below the directory arguments; explicit files are never ignored"""
+    if include_ignored:
+        return lambda path: False
+    filters = [(os.path.abspath(path) + os.sep, IgnoreFilter(path)) for path in paths if os.path.isdir(path)]
+
+    def is_ignored(path: str) -> bool:
+        absolute = os.path.abspath(path)
+        for prefix, ignore in filters:
+            if absolute.startswith(prefix):
+                return ignore.is_ignored_file(absolute)
+        return False
+
+    return is_ignored
+
+
+class _Process:
+    """one rg run; finish() stops it if needed and keeps what it wrote to stderr"""
+
+    def __init__(self, args: List[str], paths: List[str]):
+        self.popen = subprocess.Popen([rg_path()] + args + ["--"] + paths, stdout=subprocess.PIPE,
+                                      stderr=subprocess.PIPE, stdin=subprocess.DEVNULL)
+        self.stdout = self.popen.stdout
+        self.errors = ""
+
+    def finish(self) -> None:
+        if self.popen.poll() is None:
+            self.popen.kill()
+        _, stderr = self.popen.communicate()
+        self.errors = stderr.decode("utf-8", errors="replace").strip()
+
+    @property
+    def returncode(self) -> Optional[int]:
+        return self.popen.returncode
+
+
+def _primed(results: Iterator, process: _Process) -> Iterator:
+    """
+    run results up to its first item so that a failed search raises
+    RipgrepError here instead of part-way through the caller's loop
+    """
+    try:
+        first = [next(results)]
+    except StopIteration:
+        # 1 means no matches; 2 is an error (bad pattern, unreadable path) unless results came first
+        if process.returncode not in (0, 1):
+            raise RipgrepError(process.errors or f"rg exited with status {process.returncode}")
+        first = []
+
+    def resume():
+        try:
+            yield from first
+            yield from results
+        finally:
+            results.close()
+
+    return resume()
+
+
+def list_files(paths: List[str], include_ignored: bool = False,
+               max_depth: Optional[int] = None) -> Iterator[str]:
+    """file paths below paths in no particular order, like rg --files"""
+    process = _Process(["--files", "--null"] + _common_args(include_ignored, max_depth), paths)
+    is_ignored = _ignore_check(paths, include_ignored)
+
+    def files():
+        try:
+            pending = b""
+            for block in iter(lambda: process.stdout.read(65536), b""):
+                pending += block
+                *names, pending = pending.split(b"\0")
+                for name in names:
+                    path = os.fsdecode(name)
+                    if not is_ignored(path):
+                        yield path
+        finally:
+            process.finish()
+
+    return _primed(files(), process)
+
+
+def _text(value: Dict, is_path: bool = False) -> str:
+    """decode ripgrep's json representation of possibly non-utf-8 data"""
+    if "text" in value:
+        return value["text"]
+    data = base64.b64decode(value["bytes"])
+    # undecodable content is dropped, as the python engine does
+    return os.fsdecode(data) if is_path else data.decode("utf-8", errors="ignore")
+
+
+def _file_result(path: str, mode: str, lines: Dict[int, str], matched: List[int], counts: List[int],
+                 stats: Dict, context_before: int, context_after: int, max_count: Optional[int]) -> FileResult:
+    """rebuild the result the python engine would give from ripgrep's merged output"""
+    result = FileResult(path)
+    if mode == FILES_WITH_MATCHES:
+        result.count = 1
+        return result
+    # rg was asked for one line more than max_count, so a capped file has more than max_count
+    result.truncated = max_count is not None and stats.get("matched_lines", 0) > max_count
+    if mode == COUNT:
+        result.count = sum(counts[:max_count]) if max_count is not None else stats.get("matches", 0)
+        return result
+
+    # the match past the cap, and others in the last match's trailing context, are dropped
+    if max_count is not None:
+        matched = matched[:max_count]
+    # ripgrep merges overlapping context; the python engine repeats it around every match
+    result.count = len(matched)
+    for number in matched:
+        before = [n for n in range(number - context_before, number) if n in lines]
+        after = []
+        for n in range(number + 1, number + context_after + 1):
+            if n not in lines:
+                break
+            after.append(n)
+        result.groups.append(len(result.lines))
+        result.lines.extend((n, lines[n], False) for n in before)
+        result.lines.append((number, lines[number], True))
+        result.lines.extend((n, lines[n], False) for n in after)
+    return result
+
+
+def search(paths: List[str], pattern: str, case_sensitive: bool = True, mode: str = CONTENT,
+           context_before: int = 0, context_after: int = 0, max_count: Optional[int] = None,
+           include_ignored: bool = False, max_depth: Optional[int] = None,
+           glob: Optional[str] = None) -> Iterator[FileResult]:
+    """
+    search paths with ripgrep, yielding FileResults in path order (compared
+    component by component, as greptool orders its file list); raises
+    RipgrepError when ripgrep cannot run the search. glob is handed to rg
+    as a pruning hint, so callers still filter paths themselves. the whole
+    search runs before the first result is yielded, since rg's parallel
+    output is in no particular order.
+    """
+    if not supports(pattern):
+        raise RipgrepError("pattern syntax differs between ripgrep and python")
+    if len(paths) > MAX_PATH_ARGUMENTS:
+        raise RipgrepError("too many paths for one rg command line")
+
+    args = ["--json", "--text", "--crlf"] + _common_args(include_ignored, max_depth)
+    if not case_sensitive:
+        args.append("--ignore-case")
+    if mode == FILES_WITH_MATCHES:
+        args += ["--max-count", "1"]
+    else:
+        if max_count is not None:
+            args += ["--max-count", str(max_count + 1)]
+        if mode == CONTENT:
+            args += ["--before-context", str(context_before), "--after-context", str(context_after)]
+    if glob:
+        args += ["--glob", glob]
+    args += ["--regexp", pattern]
+
+    process = _Process(args, paths)
+    is_ignored = _ignore_check(paths, include_ignored)
+    # capped counts are summed per line, since the summary includes the line past the cap
+    decode_matches = mode == CONTENT or (mode == COUNT and max_count is not None)
+
+    def results():
+        found: List[FileResult] = []
+        try:
+            lines: Dict[int, str] = {}
+            matched: List[int] = []
+            counts: List[int] = []
+            for raw in process.stdout:
+                if not decode_matches and not raw.startswith(_END_MESSAGE):
+                    # counts and file lists only need each file's summary; skip decoding the matches
+                    continue
+                message = json.loads(raw)
+                kind, data = message.get("type"), message.get("data", {})
+                if kind == "begin":
+                    lines, matched, counts = {}, [], []
+                elif kind in ("match", "context"):
+                    if mode == CONTENT:
+                        number = data["line_number"]
+                        lines[number] = _text(data["lines"]).rstrip()
+                        if kind == "match":
+                            matched.append(number)
+                    elif kind == "match":
+                        counts.append(len(data.get("submatches", [])))
+                elif kind == "end":
+                    stats = data.get("stats", {})
+                    path = _text(data["path"], is_path=True)
+                    if stats.get("matched_lines") and not is_ignored(path):
+                        found.append(_file_result(path, mode, lines, matched, counts, stats,
+                                                  context_before, context_after, max_count))
+        finally:
+            process.finish()
+        found.sort(key=lambda result: result.path.split(os.sep))
+        yield from found
+
+    return _primed(results(), process)
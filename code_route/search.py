@@ -0,0 +1,471 @@
+r"""
+content search engine used by greptool
+
+files are read whole (memory-mapped when large) and the pattern runs over the
+entire buffer at once. line boundaries are only located around matches, so a
+file without matches costs one regex scan and no per-line work. files are
+searched on a thread pool and results come back in the order the paths were
+given, so output is deterministic.
+
+lines are matched without their line terminator, as grep does, and \r\n
+and \r line endings are treated like \n. in multiline mode the pattern runs
+with DOTALL over the buffer as a whole instead, and each match is reported
+as the range of lines it spans. plain ascii patterns run over raw
+bytes; patterns with non-ascii text, unicode-aware classes (\w, \b, \d, \s)
+or anything that counts characters (., [^...], {n,m}) run over the decoded
+text, since over utf-8 bytes those would count bytes instead.
+
+patterns are analysed before searching: pure literals are found with
+find() instead of the regex engine, and the literal substrings every match
+must contain are checked against the raw file first, so files that cannot
+match are skipped before any decoding or regex work.
+
+callers that only need some results stop early: a file stops being read at
+its per-file match cap (or its first match, for files_with_matches), and
+closing the search() generator cancels the files still queued on workers.
+"""
+
+import mmap
+import os
+import re
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
+
+from . import filecache
+
+try:
+    from re import _parser as _sre_parse  # python 3.11+
+except ImportError:
+    import sre_parse as _sre_parse
+
+MMAP_THRESHOLD = 256 * 1024      # smaller files are cheaper to read than to map
+FILES_PER_TASK = 32              # files handed to a worker at a time
+MAX_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+PREFILTER_LITERALS = 3           # longest required literals checked before searching a file
+PREFILTER_MIN_LENGTH = 2         # single characters are in nearly every file
+
+CONTENT = "content"
+FILES_WITH_MATCHES = "files_with_matches"
+COUNT = "count"
+
+Buffer = Union[bytes, mmap.mmap, str]
+
+# \w \b \d \s and their negations are ascii-only in bytes patterns (an unescaped backslash before them)
+_UNICODE_CLASSES = re.compile(r"(?<!\\)(?:\\\\)*\\[wWbBdDsS]")
+
+_REPEATS = tuple(getattr(_sre_parse, name) for name in ("MAX_REPEAT", "MIN_REPEAT", "POSSESSIVE_REPEAT")
+                 if hasattr(_sre_parse, name))
+
+
+def _literal_runs(items, runs: List[str]) -> None:
+    """collect the literal strings that every match of a parsed pattern must contain"""
+    run: List[str] = []
+    for op, av in items:
+        if op is _sre_parse.LITERAL:
+            run.append(chr(av))
+            continue
+        if op is _sre_parse.AT:
+            # anchors are zero-width, so the literals on either side stay adjacent
+            continue
+        if run:
+            runs.append("".join(run))
+            run = []
+        if op is _sre_parse.SUBPATTERN:
+            _, add_flags, _, group = av
+            if not add_flags & re.IGNORECASE:
+                _literal_runs(group, runs)
+        elif op in _REPEATS and av[0] >= 1:
+            _literal_runs(av[2], runs)
+        # branches, classes and optional parts guarantee nothing
+    if run:
+        runs.append("".join(run))
+
+
+def _subpatterns(value) -> Iterator:
+    """the parsed subpatterns nested anywhere in an item's arguments"""
+    if isinstance(value, _sre_parse.SubPattern):
+        yield value
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            yield from _subpatterns(item)
+
+
+def _counts_characters(items) -> bool:
+    """whether a parsed pattern has parts that would match one byte of a multi-byte character"""
+    for op, av in items:
+        if op in (_sre_parse.ANY, _sre_parse.NOT_LITERAL):
+            return True
+        if op is _sre_parse.IN and av and av[0][0] is _sre_parse.NEGATE:
+            return True
+        if op in _REPEATS and (av[0], av[1]) not in ((0, _sre_parse.MAXREPEAT), (1, _sre_parse.MAXREPEAT), (0, 1)):
+            return True
+        if any(_counts_characters(sub) for sub in _subpatterns(av)):
+            return True
+    return False
+
+
+def _parse(pattern: str, flags: int) -> Tuple[list, bool]:
+    """parsed top-level items of a pattern and whether it ignores case"""
+    parsed = _sre_parse.parse(pattern, flags)
+    # inline flags such as (?i) end up in the parser state (named "pattern" before python 3.11)
+    state = getattr(parsed, "state", None) or parsed.pattern
+    return list(parsed), bool((flags | state.flags) & re.IGNORECASE)
+
+
+def analyze_pattern(pattern: str, flags: int = 0) -> Tuple[Optional[str], List[str]]:
+    """
+    return (literal, required): the pattern itself when it is a plain string,
+    and the literal substrings any match must contain (longest first)
+    """
+    items, ignore_case = _parse(pattern, flags)
+    if ignore_case:
+        return None, []
+    literal = None
+    if items and all(op is _sre_parse.LITERAL for op, _ in items):
+        literal = "".join(chr(av) for _, av in items)
+    runs: List[str] = []
+    _literal_runs(items, runs)
+    required = sorted({run for run in runs if len(run) >= PREFILTER_MIN_LENGTH}, key=len, reverse=True)
+    return literal, required[:PREFILTER_LITERALS]
+
+
+# letters that unicode case-insensitive matching also pairs with non-ascii characters (e.g. the kelvin sign)
+_UNICODE_FOLDS = re.compile("[iks]", re.IGNORECASE)
+
+
+def index_literals(pattern: str, flags: int = 0, min_length: int = 3, unicode: bool = True) -> List[bytes]:
+    """
+    lowercased utf-8 literals every match must contain, for case-folded
+    indexes; unlike analyze_pattern this also works for case-insensitive patterns
+    """
+    items, ignore_case = _parse(pattern, flags)
+    runs: List[str] = []
+    _literal_runs(items, runs)
+    literals = set()
+    for run in runs:
+        if "\n" in run or "\r" in run or (ignore_case and not run.isascii()):
+            # folding non-ascii case does not line up with the index's ascii lowercasing
+            continue
+        pieces = _UNICODE_FOLDS.split(run) if ignore_case and unicode else [run]
+        for piece in pieces:
+            encoded = piece.encode("utf-8").lower()
+            if len(encoded) >= min_length:
+                literals.add(encoded)
+    return sorted(literals, key=len, reverse=True)
+
+
+class Matcher:
+    """a compiled search pattern; raises re.error for invalid patterns"""
+
+    def __init__(self, pattern: str, case_sensitive: bool = True, multiline: bool = False):
+        self.pattern = pattern
+        self.multiline = multiline
+        flags = re.MULTILINE | (0 if case_sensitive else re.IGNORECASE) | (re.DOTALL if multiline else 0)
+        # compiling the text form first reports errors exactly as re would for the user's pattern
+        text_regex = re.compile(pattern, flags)
+        self.regex = text_regex
+        self.binary = False
+
+        literal, required = analyze_pattern(pattern, flags)
+        # found with find(); literals never span lines unless they contain a line break
+        self.literal: Optional[bytes] = None
+        # checked against the raw bytes of a file before it is decoded or searched
+        self.required: List[bytes] = [r.encode("utf-8") for r in required if "\n" not in r and "\r" not in r]
+        # buffers have \n line endings only, so multiline literals may contain them
+        if literal and "\r" not in literal and (multiline or "\n" not in literal):
+            self.literal = literal.encode("utf-8")
+            self.regex = re.compile(re.escape(self.literal), flags)
+            self.binary = True
+        elif (pattern.isascii() and not _UNICODE_CLASSES.search(pattern)
+              and not _counts_characters(_parse(pattern, flags)[0])):
+            try:
+                self.regex = re.compile(pattern.encode("ascii"), flags)
+                self.binary = True
+            except re.error:
+                # e.g. \u escapes are only valid in text patterns
+                pass
+        # case-folded literals for narrowing a search with the trigram index
+        self.index_literals = index_literals(pattern, flags, unicode=not self.binary)
+
+    @property
+    def newline(self):
+        return b"\n" if self.binary else "\n"
+
+    def may_match(self, raw) -> bool:
+        """False when the raw file content lacks a substring every match needs"""
+        return all(raw.find(literal) != -1 for literal in self.required)
+
+    def search(self, buffer: Buffer, position: int) -> Optional[Tuple[int, int]]:
+        """span of the first match at or after position"""
+        if self.literal is not None:
+            start = buffer.find(self.literal, position)
+            return None if start == -1 else (start, start + len(self.literal))
+        match = self.regex.search(buffer, position)
+        return None if match is None else match.span()
+
+
+class FileResult:
+    """matches found in one file"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.count = 0
+        # (line number, text, is_match) in file order; context lines have is_match False
+        self.lines: List[Tuple[int, str, bool]] = []
+        # index in lines where the output of each match (or group of overlapping matches) starts
+        self.groups: List[int] = []
+        # True when the search of this file stopped at the per-file match cap
+        self.truncated = False
+
+
+def _decode(value) -> str:
+    return value.decode("utf-8", errors="ignore") if isinstance(value, bytes) else value
+
+
+class _Lines:
+    """line arithmetic over a buffer, counting newlines incrementally as matches move forward"""
+
+    def __init__(self, buffer: Buffer, newline):
+        self.buffer = buffer
+        self.newline = newline
+        self.size = len(buffer)
+        self._counted_to = 0
+        self._line_number = 1
+
+    def start(self, position: int) -> int:
+        return self.buffer.rfind(self.newline, 0, position) + 1
+
+    def end(self, position: int) -> int:
+        """offset just past the newline ending the line at position"""
+        newline = self.buffer.find(self.newline, position)
+        return self.size if newline == -1 else newline + 1
+
+    def content_end(self, line_end: int) -> int:
+        """offset of the line terminator of a line ending at line_end, if it has one"""
+        if line_end and self.buffer[line_end - 1:line_end] == self.newline:
+            return line_end - 1
+        return line_end
+
+    def number(self, line_start: int) -> int:
+        """1-based number of the line starting at line_start; calls must not move backwards"""
+        if line_start > self._counted_to:
+            self._line_number += self.buffer[self._counted_to:line_start].count(self.newline)
+            self._counted_to = line_start
+        return self._line_number
+
+    def text(self, start: int, end: int) -> str:
+        return _decode(self.buffer[start:end]).rstrip()
+
+
+def _matching_lines(lines: _Lines, matcher: Matcher) -> Iterator[Tuple[int, int, int]]:
+    """
+    yield (start, content end, end) of each line containing a match, with the
+    same results as searching every line separately, but scanning the buffer
+    as a whole
+    """
+    buffer = lines.buffer
+    position = 0
+    while position < lines.size:
+        span = matcher.search(buffer, position)
+        if span is None:
+            return
+        start, end = span
+        line_start = lines.start(start)
+        line_end = lines.end(start)
+        content_end = lines.content_end(line_end)
+        # a match running past its line (e.g. \s+ over a newline) only counts if the line matches on its own
+        if end <= content_end or matcher.regex.search(buffer, line_start, content_end):
+            yield line_start, content_end, line_end
+        position = line_end
+
+
+def _matching_ranges(lines: _Lines, matcher: Matcher) -> Iterator[Tuple[int, int, int]]:
+    """
+    multiline mode: yield (start, end, matches) for the lines the matches
+    span, merging matches that share a line
+    """
+    buffer = lines.buffer
+    current = None
+    position = 0
+    while position < lines.size:
+        span = matcher.search(buffer, position)
+        if span is None or span[0] >= lines.size:
+            break
+        start, end = span
+        first = lines.start(start)
+        # a match ending with a line break ends on that line, not the next
+        last = lines.end(max(start, end - 1))
+        if current is not None and first < current[1]:
+            current = (current[0], max(current[1], last), current[2] + 1)
+        else:
+            if current is not None:
+                yield current
+            current = (first, last, 1)
+        position = end if end > start else end + 1
+    if current is not None:
+        yield current
+
+
+def _normalize_newlines(data: bytes) -> bytes:
+    return data.replace(b"\r\n", b"\n").replace(b"\r", b"\n")
+
+
+def _load(path: str):
+    """return (raw, closer) for a file: its bytes, or a memory map the closer releases"""
+    # small files come from the session's file cache
+    data = filecache.read_bytes(path, max_size=MMAP_THRESHOLD - 1)
+    if data is not None:
+        return data, None
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return b"", None
+        if size >= MMAP_THRESHOLD:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            return mapped, mapped.close
+        return f.read(), None
+
+
+def _to_buffer(raw, binary: bool) -> Buffer:
+    """the searchable form of raw content: normalized line endings, decoded for text patterns"""
+    if raw.find(b"\r") != -1:
+        # files with \r line endings are rare; normalize a copy rather than the mapping
+        raw = _normalize_newlines(raw[:])
+    elif binary:
+        return raw
+    return raw if binary else raw[:].decode("utf-8", errors="ignore")
+
+
+def search_file(path: str, matcher: Matcher, mode: str = CONTENT,
+                context_before: int = 0, context_after: int = 0,
+                max_count: Optional[int] = None) -> Optional[FileResult]:
+    """
+    search one file; returns None when it has no matches or cannot be read.
+    max_count stops after that many matching lines, like grep -m
+    """
+    try:
+        raw, close = _load(path)
+    except (OSError, ValueError):
+        return None
+    try:
+        if not matcher.may_match(raw):
+            return None
+        buffer = _to_buffer(raw, matcher.binary)
+        return _search_buffer(path, buffer, matcher, mode, context_before, context_after, max_count)
+    finally:
+        if close:
+            close()
+
+
+def _add_group(result: FileResult, lines: _Lines, range_start: int, range_end: int,
+               context_before: int, context_after: int) -> None:
+    """append the matching lines from range_start to range_end, with their context"""
+    result.groups.append(len(result.lines))
+    number = lines.number(range_start)
+    before = []
+    start = range_start
+    for _ in range(context_before):
+        if start == 0:
+            break
+        previous = lines.start(start - 1)
+        before.append((previous, start))
+        start = previous
+    for offset, (start, end) in enumerate(reversed(before)):
+        result.lines.append((number - len(before) + offset, lines.text(start, end), False))
+
+    start = range_start
+    while True:
+        end = lines.end(start)
+        result.lines.append((number, lines.text(start, end), True))
+        if end >= range_end:
+            break
+        start = end
+        number += 1
+
+    for offset in range(1, context_after + 1):
+        if end >= lines.size:
+            break
+        next_end = lines.end(end)
+        result.lines.append((number + offset, lines.text(end, next_end), False))
+        end = next_end
+
+
+def _search_buffer(path: str, buffer: Buffer, matcher: Matcher, mode: str,
+                   context_before: int, context_after: int,
+                   max_count: Optional[int] = None) -> Optional[FileResult]:
+    regex = matcher.regex
+    result = FileResult(path)
+    lines = _Lines(buffer, matcher.newline)
+    matched = 0
+
+    if matcher.multiline:
+        ranges = _matching_ranges(lines, matcher)
+    else:
+        # one range per matching line; its matches are only counted in count mode
+        ranges = ((start, end, len(regex.findall(buffer, start, content_end)) if mode == COUNT else 1)
+                  for start, content_end, end in _matching_lines(lines, matcher))
+
+    for range_start, range_end, matches in ranges:
+        if mode == FILES_WITH_MATCHES:
+            result.count = 1
+            return result
+        # stop at the first match past the cap, like grep -m; a file with exactly max_count is not capped
+        if max_count is not None and matched >= max_count:
+            result.truncated = True
+            break
+        matched += 1
+        if mode == COUNT:
+            result.count += matches
+        else:
+            result.count += 1
+            _add_group(result, lines, range_start, range_end, context_before, context_after)
+
+    return result if result.count else None
+
+
+def _search_chunk(paths: List[str], matcher: Matcher, mode: str, context_before: int,
+                  context_after: int, max_count: Optional[int],
+                  stop: Optional[threading.Event] = None) -> List[FileResult]:
+    results = []
+    for path in paths:
+        if stop is not None and stop.is_set():
+            break
+        result = search_file(path, matcher, mode, context_before, context_after, max_count)
+        if result is not None:
+            results.append(result)
+    return results
+
+
+def search(paths: Iterable[str], matcher: Matcher, mode: str = CONTENT,
+           context_before: int = 0, context_after: int = 0,
+           workers: Optional[int] = None, max_count: Optional[int] = None) -> Iterator[FileResult]:
+    """
+    search many files in parallel, yielding results in the order of paths.
+    only a bounded number of chunks is in flight, and closing the generator
+    stops the workers between files, so a consumer that stops early stops
+    the search too.
+    """
+    paths = list(paths)
+    chunks = [paths[i:i + FILES_PER_TASK] for i in range(0, len(paths), FILES_PER_TASK)]
+    workers = min(workers or MAX_WORKERS, len(chunks))
+    if workers <= 1:
+        for chunk in chunks:
+            yield from _search_chunk(chunk, matcher, mode, context_before, context_after, max_count)
+        return
+
+    stop = threading.Event()
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="code-route-search")
+    pending = deque()
+    next_chunk = 0
+    try:
+        while pending or next_chunk < len(chunks):
+            while next_chunk < len(chunks) and len(pending) < workers * 2:
+                pending.append(executor.submit(_search_chunk, chunks[next_chunk], matcher, mode,
+                                               context_before, context_after, max_count, stop))
+                next_chunk += 1
+            yield from pending.popleft().result()
+    finally:
+        stop.set()
+        executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,77 @@
+"""
+text or binary, and which encoding, from a file's first bytes
+
+filecontentreadertool used to go by mimetypes.guess_type, which skips text
+files with an application/* type (.json, .js, .ts) and lets binaries with
+an unknown extension through to a failed decode. sniff() looks at the
+content instead: a byte order mark names the encoding, a NUL byte means
+binary, a sample that decodes as UTF-8 is UTF-8, and anything else is read
+as latin-1 unless it is full of control characters. results are cached by
+path, mtime and size.
+"""
+
+import codecs
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+SAMPLE_BYTES = 8192
+MAX_CACHED = 4096
+MAX_CONTROL_RATIO = 0.05   # more C0 control bytes than this in a non-UTF-8 sample means binary
+
+# utf-32 first: its little-endian mark starts with utf-16's
+_BOMS = (
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+
+_TEXT_CONTROLS = frozenset(b"\t\n\r\f\b\x1b")
+_CONTROLS = bytes(byte for byte in range(32) if byte not in _TEXT_CONTROLS) + b"\x7f"
+
+# encodings whose lines end in a b"\n" byte, so byte offsets of lines can be indexed
+LINE_INDEXABLE = ("utf-8", "utf-8-sig", "latin-1")
+
+
+def detect(sample: bytes) -> Optional[str]:
+    """the encoding to read a file with, judged from its first bytes; None for binary"""
+    for bom, encoding in _BOMS:
+        if sample.startswith(bom):
+            return encoding
+    if b"\0" in sample:
+        return None
+    try:
+        # not final: the sample may end inside a character
+        codecs.getincrementaldecoder("utf-8")().decode(sample, final=False)
+        return "utf-8"
+    except UnicodeDecodeError:
+        pass
+    controls = len(sample) - len(sample.translate(None, _CONTROLS))
+    return "latin-1" if controls <= MAX_CONTROL_RATIO * len(sample) else None
+
+
+_cache: "OrderedDict[str, Tuple[int, int, Optional[str]]]" = OrderedDict()
+_lock = threading.Lock()
+
+
+def sniff(path: str) -> Optional[str]:
+    """detect() for the start of a file, cached until the file changes; OSError if it cannot be read"""
+    path = os.path.abspath(path)
+    st = os.stat(path)
+    with _lock:
+        cached = _cache.get(path)
+        if cached is not None and cached[:2] == (st.st_mtime_ns, st.st_size):
+            _cache.move_to_end(path)
+            return cached[2]
+    with open(path, "rb") as f:
+        st = os.fstat(f.fileno())
+        encoding = detect(f.read(SAMPLE_BYTES))
+    with _lock:
+        _cache[path] = (st.st_mtime_ns, st.st_size, encoding)
+        _cache.move_to_end(path)
+        while len(_cache) > MAX_CACHED:
+            _cache.popitem(last=False)
+    return encoding
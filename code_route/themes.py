@@ -1,14 +1,17 @@
 """
 Visual themes and styling for Code Route
+
+Rich and prompt_toolkit are imported on first use so that lightweight CLI
+paths (--version, --help, --init) do not pay for them.
 """
 
-from rich.console import Console
-from rich.theme import Theme
-from rich.style import Style
-from prompt_toolkit.styles import Style as PromptStyle
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from rich.console import Console
 
-# Custom theme for Code Route
-CODE_ROUTE_THEME = Theme({
+# Custom theme for Code Route (built into a rich Theme as CODE_ROUTE_THEME on first access)
+THEME_STYLES = {
     "primary": "bright_blue",
     "secondary": "cyan",
     "success": "bright_green",
@@ -27,13 +30,13 @@ CODE_ROUTE_THEME = Theme({
     "string": "green",
     "keyword": "blue",
     "comment": "dim green",
-})
+}
 
-# Prompt styles
-PROMPT_STYLE = PromptStyle.from_dict({
+# Prompt styles (built into a prompt_toolkit Style as PROMPT_STYLE on first access)
+PROMPT_STYLES = {
     'prompt': '#00FFFF bold',  # cyan
     'continuation': '#00FFFF',  # cyan
-})
+}
 
 # Progress bar styles
 PROGRESS_STYLES = {
@@ -2062,13 +2065,33 @@ STATUS_ICONS = {
     'assistant': '🤖',
 }
 
+
+def _build_lazy(name: str) -> Any:
+    """Build a lazily-created style object, importing its library on demand"""
+    if name == "CODE_ROUTE_THEME":
+        from rich.theme import Theme
+        return Theme(THEME_STYLES)
+    from prompt_toolkit.styles import Style as PromptStyle
+    return PromptStyle.from_dict(PROMPT_STYLES)
+
+
+def __getattr__(name: str) -> Any:
+    """Expose CODE_ROUTE_THEME and PROMPT_STYLE, built on first access"""
+    if name not in ("CODE_ROUTE_THEME", "PROMPT_STYLE"):
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = globals()[name] = _build_lazy(name)
+    return value
+
+
 # Console configurations
-def get_console(theme: bool = True) -> Console:
+def get_console(theme: bool = True) -> "Console":
     """Get a configured Rich console"""
+    from rich.console import Console
+
     if theme:
-        return Console(theme=CODE_ROUTE_THEME)
+        return Console(theme=globals().get("CODE_ROUTE_THEME") or __getattr__("CODE_ROUTE_THEME"))
     return Console()
 
-def get_themed_console() -> Console:
+def get_themed_console() -> "Console":
     """Get the themed console instance"""
     return get_console(theme=True)
\ No newline at end of file
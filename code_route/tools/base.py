@@ -1,5 +1,91 @@
+import json
 from abc import ABC, abstractmethod
-from typing import Dict
+from typing import Any, Dict, Optional, Union
+
+# how far into a result display helpers may look; keeps previews O(1) in output size
+PREVIEW_SCAN_CHARS = 4096
+
+
+def preview_text(text: str, limit: int = 100, scan: int = PREVIEW_SCAN_CHARS) -> str:
+    """
+    Return the first non-blank line of text, truncated to limit characters.
+    Only the first `scan` characters are examined, so the cost does not grow
+    with the size of the text.
+    """
+    window = text[:scan].lstrip()
+    newline = window.find("\n")
+    line = (window if newline == -1 else window[:newline]).rstrip()
+    if len(line) > limit:
+        return line[:limit - 3] + "..."
+    return line
+
+
+class ToolResult:
+    """
+    Structured tool output.
+
+    Tools may return a ToolResult instead of a pre-serialized string. The
+    assistant reads status and preview directly for display and serializes
+    the payload exactly once, compactly, when the result is sent to the model.
+    """
+
+    SUCCESS = "success"
+    ERROR = "error"
+
+    def __init__(self, payload: Any, status: str = SUCCESS,
+                 mime_type: Optional[str] = None, preview: Optional[str] = None):
+        self.payload = payload
+        self.status = status
+        if mime_type is None:
+            mime_type = "text/plain" if isinstance(payload, str) else "application/json"
+        self.mime_type = mime_type
+        self._preview = preview
+        self._serialized: Optional[str] = None
+        self._byte_size: Optional[int] = None
+
+    @classmethod
+    def error(cls, message: str, payload: Any = None) -> "ToolResult":
+        """Build an error result; the payload defaults to {"error": message}"""
+        if payload is None:
+            payload = {"error": message}
+        return cls(payload, status=cls.ERROR, preview=message)
+
+    @property
+    def is_error(self) -> bool:
+        return self.status == self.ERROR
+
+    @property
+    def preview(self) -> str:
+        """Short human-readable summary used for display"""
+        if self._preview is None:
+            if isinstance(self.payload, str):
+                self._preview = preview_text(self.payload)
+            elif isinstance(self.payload, dict):
+                self._preview = f"{len(self.payload)} entries"
+            elif isinstance(self.payload, (list, tuple, set, frozenset)):
+                self._preview = f"{len(self.payload)} items"
+            else:
+                self._preview = preview_text(str(self.payload))
+        return self._preview
+
+    @property
+    def byte_size(self) -> int:
+        """Size of the serialized payload in UTF-8 bytes"""
+        if self._byte_size is None:
+            self._byte_size = len(self.serialize().encode("utf-8"))
+        return self._byte_size
+
+    def serialize(self) -> str:
+        """Serialize the payload for the model (cached after the first call)"""
+        if self._serialized is None:
+            if isinstance(self.payload, str):
+                self._serialized = self.payload
+            else:
+                self._serialized = json.dumps(self.payload, separators=(",", ":"), ensure_ascii=False)
+        return self._serialized
+
+    def __str__(self) -> str:
+        return self.serialize()
 
 
 class BaseTool(ABC):
@@ -22,6 +108,6 @@ class BaseTool(ABC):
         pass
 
     @abstractmethod
-    def execute(self, **kwargs) -> str:
+    def execute(self, **kwargs) -> Union[str, ToolResult]:
         """Execute the tool with given parameters"""
         pass
@@ -1,6 +1,7 @@
 import os
 from typing import List
 
+from .. import workspace
 from .base import BaseTool
 
 
@@ -42,6 +43,7 @@ class CreateFoldersTool(BaseTool):
                     continue
 
                 os.makedirs(absolute_path, exist_ok=True)
+                workspace.invalidate(absolute_path)
                 results.append(f"Successfully created folder: {path}")
 
             except PermissionError:
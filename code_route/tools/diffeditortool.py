@@ -1,6 +1,7 @@
 import os
 from difflib import unified_diff
 
+from .. import filecache, workspace
 from .base import BaseTool
 
 
@@ -49,8 +50,7 @@ class DiffEditorTool(BaseTool):
             return f"Error: File does not exist at path: {path}"
 
         try:
-            with open(path, encoding='utf-8') as f:
-                original_content = f.read()
+            original_content = filecache.read_text(path)
         except Exception as e:
             return f"Error reading file {path}: {e!s}"
 
@@ -70,8 +70,8 @@ class DiffEditorTool(BaseTool):
         diff_output = "".join(diff_lines)
 
         try:
-            with open(path, 'w', encoding='utf-8') as f:
-                f.write(updated_content)
+            filecache.write_text(path, updated_content)
+            workspace.invalidate(path)
         except Exception as e:
             return f"Error writing updated content to file {path}: {e!s}"
 
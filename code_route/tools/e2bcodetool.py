@@ -1,10 +1,9 @@
 import base64
-import json
 
 from dotenv import load_dotenv
 from e2b_code_interpreter import Sandbox
 
-from .base import BaseTool
+from .base import BaseTool, ToolResult
 
 
 class E2bCodeTool(BaseTool):
@@ -52,7 +51,7 @@ class E2bCodeTool(BaseTool):
         "required": ["code"]
     }
 
-    def execute(self, **kwargs) -> str:
+    def execute(self, **kwargs) -> ToolResult:
         try:
             load_dotenv()
             
@@ -77,12 +76,13 @@ class E2bCodeTool(BaseTool):
                     sandbox.files.write(sandbox_path, file_content)
                     uploaded_files.append(sandbox_path)
                 except Exception as e:
-                    return json.dumps({
+                    error = f"Failed to upload file {sandbox_path}: {e!s}"
+                    return ToolResult.error(error, {
                         "success": False,
-                        "error": f"Failed to upload file {sandbox_path}: {e!s}",
+                        "error": error,
                         "stdout": "",
                         "stderr": ""
-                    }, indent=2)
+                    })
 
             result = sandbox.run_code(code)
             
@@ -106,14 +106,15 @@ class E2bCodeTool(BaseTool):
                 "downloaded_files": downloaded_files
             }
             
-            return json.dumps(response, indent=2)
+            return ToolResult(response, preview=f"Executed code in sandbox ({len(downloaded_files)} file(s) downloaded)")
             
         except Exception as e:
-            return json.dumps({
+            error = f"Tool execution failed: {e!s}"
+            return ToolResult.error(error, {
                 "success": False,
-                "error": f"Tool execution failed: {e!s}",
+                "error": error,
                 "stdout": "",
                 "stderr": "",
                 "uploaded_files": [],
                 "downloaded_files": {}
-            }, indent=2)
\ No newline at end of file
+            })
\ No newline at end of file
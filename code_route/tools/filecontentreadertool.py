@@ -1,27 +1,60 @@
-import json
-import mimetypes
+import fnmatch
 import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple, Union
 
-from .base import BaseTool
+from .. import filecache
+from ..config import Config
+from ..framing import frame
+from ..ignore import walk
+from ..images import DECODE_ERRORS, active_max_dimension, detect_mime, prepare_image
+from ..lineindex import get_index
+from ..outline import outline
+from ..sniff import LINE_INDEXABLE, sniff
+from .base import BaseTool, ToolResult
+
+MAX_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+BYTES_PER_TOKEN = 4       # rough estimate for turning a token budget into bytes
+MAX_OUTLINED = 50         # files over a directory budget that get an outline
+OUTLINE_SHARE = 0.1       # part of an exceeded directory budget kept for outlines
+MAX_OUTLINE_BYTES = 4 * 1024 * 1024
+MAX_LISTED_SKIPS = 50
+
+
+def _normalize_newlines(text: str) -> str:
+    """\r\n and \r as \n, as whole-file reads return them"""
+    return text.replace('\r\n', '\n').replace('\r', '\n')
 
 
 class FileContentReaderTool(BaseTool):
     name = "filecontentreadertool"
     description = '''
-    Reads content from multiple files and returns their contents.
-    Accepts a list of file paths and returns a dictionary with file paths as keys
-    and their content as values.
-    Handles file reading errors gracefully with built-in Python exceptions.
-    When given a directory, recursively reads all text files while skipping binaries and common ignore patterns.
+    Reads content from multiple files and returns their contents as plain text: each file
+    under a "==> path (N lines) <==" header followed by its content, unescaped.
+    With format "json" it returns an object of file paths to contents instead; results
+    with images are always json. Errors are reported per file in place of its content.
+    When given a directory, recursively reads all text files while skipping binaries, hidden and build directories,
+    and anything excluded by .gitignore, .coderouteignore or the built-in ignore rules.
+    Image files passed explicitly (PNG, JPEG, GIF, WebP) are returned as downscaled image blocks.
+    Large files can be read in parts: give a file as {"path", "offset", "limit"} for a range of
+    lines (1-based) or {"path", "byte_offset", "byte_limit"} for a range of bytes. Content over
+    max_bytes is cut at a line boundary with a marker that says where to continue.
+    Directory reads stop at max_total_bytes (or max_tokens): files matching prefer go first, then
+    smaller and more recently modified ones; files that do not fit get an outline of their
+    definitions, and the directory's own entry lists what was left out.
     '''
     
-    # ignore lists
-    IGNORE_PATTERNS = {
+    # skipped when reading directories, on top of the shared ignore rules (gitignore syntax)
+    DIRECTORY_RULES = (
         # hidden files and directories
-        '.git', '.svn', '.hg', '.DS_Store', '.env', '.idea', '.vscode', '.settings',
+        '.*',
         # build directories
-        'node_modules', '__pycache__', 'build', 'dist', 'venv', 'env', 'bin', 'obj',
-        'target', 'out', 'Debug', 'Release', 'x64', 'x86', 'builds', 'coverage',
+        'build/', 'dist/', 'env/', 'bin/', 'obj/', 'target/', 'out/',
+        'Debug/', 'Release/', 'x64/', 'x86/', 'builds/', 'coverage/',
+    )
+
+    # never read as text
+    SKIPPED_EXTENSIONS = {
         # binary file extensions
         '.pyc', '.pyo', '.so', '.dll', '.dylib', '.pdb', '.ilk', '.exp', '.map',
         '.exe', '.bin', '.dat', '.db', '.sqlite', '.sqlite3', '.o', '.cache',
@@ -47,37 +80,95 @@ class FileContentReaderTool(BaseTool):
             "file_paths": {
                 "type": "array",
                 "items": {
-                    "type": "string"
+                    "anyOf": [
+                        {"type": "string"},
+                        {
+                            "type": "object",
+                            "properties": {
+                                "path": {"type": "string"},
+                                "offset": {"type": "integer", "description": "First line to read (1-based)"},
+                                "limit": {"type": "integer", "description": "Number of lines to read"},
+                                "byte_offset": {"type": "integer", "description": "First byte to read"},
+                                "byte_limit": {"type": "integer", "description": "Number of bytes to read"}
+                            },
+                            "required": ["path"]
+                        }
+                    ]
                 },
-                "description": "List of file paths to read"
+                "description": "List of file paths to read, or objects with a path and a line or byte range"
+            },
+            "offset": {
+                "type": "integer",
+                "description": "First line to read (1-based) in files given without their own range"
+            },
+            "limit": {
+                "type": "integer",
+                "description": "Number of lines to read in files given without their own range"
+            },
+            "max_bytes": {
+                "type": "integer",
+                "description": "Largest amount of content returned per file",
+                "default": Config.READ_MAX_BYTES
+            },
+            "line_numbers": {
+                "type": "boolean",
+                "description": "Prefix every line with its line number",
+                "default": False
+            },
+            "max_total_bytes": {
+                "type": "integer",
+                "description": "Content read from each directory in total",
+                "default": Config.READ_DIRECTORY_MAX_BYTES
+            },
+            "max_tokens": {
+                "type": "integer",
+                "description": "Directory budget in tokens (about 4 bytes each), instead of max_total_bytes"
+            },
+            "prefer": {
+                "type": "array",
+                "items": {"type": "string"},
+                "description": "Glob patterns (e.g. \"*.py\") for directory files to read first"
+            },
+            "outline": {
+                "type": "boolean",
+                "description": "Give an outline of definitions for directory files over the budget",
+                "default": True
+            },
+            "format": {
+                "type": "string",
+                "enum": ["text", "json"],
+                "description": "Plain text with a header per file, or a JSON object of path to content",
+                "default": Config.READ_OUTPUT_FORMAT
             }
         },
         "required": ["file_paths"]
     }
 
     def _should_skip(self, path: str) -> bool:
-        """Determine if a file or directory should be skipped."""
+        """Determine if a file should be skipped."""
         name = os.path.basename(path)
         ext = os.path.splitext(name)[1].lower()
 
-        # skip if name or extension matches ignore patterns
-        if name in self.IGNORE_PATTERNS or ext in self.IGNORE_PATTERNS:
+        # skip if the extension marks a binary or ignored file type
+        if ext in self.SKIPPED_EXTENSIONS:
             return True
 
         # skip hidden files/directories (starting with .)
         if name.startswith('.'):
             return True
 
-        # if it's a file, check if it's binary using mimetype
+        # if it's a file, check its first bytes for binary content
         if os.path.isfile(path):
-            mime_type, _ = mimetypes.guess_type(path)
-            if mime_type and not mime_type.startswith('text/'):
-                return True
+            try:
+                return sniff(path) is None
+            except OSError:
+                return False
 
         return False
 
-    def _read_file(self, file_path: str) -> str:
-        """Safely read a file and handle errors."""
+    def _read_file(self, file_path: str, options: Optional[Dict] = None) -> str:
+        """Safely read a file, or the requested part of it, and handle errors."""
+        options = options or {}
         try:
             if not os.path.exists(file_path):
                 return "Error: File not found"
@@ -85,8 +176,22 @@ class FileContentReaderTool(BaseTool):
             if self._should_skip(file_path):
                 return "Skipped: Binary or ignored file type"
 
-            with open(file_path, encoding='utf-8') as file:
-                return file.read()
+            # text past the sniffed sample that does not decode shows as replacement characters
+            encoding = sniff(file_path) if os.path.isfile(file_path) else 'utf-8'
+            max_bytes = options.get('max_bytes') or Config.READ_MAX_BYTES
+            if options.get('offset') is not None and options['offset'] < 1:
+                return f"Error: offset must be 1 or more, got {options['offset']}"
+            if options.get('byte_offset') is not None and options['byte_offset'] < 0:
+                return f"Error: byte_offset must not be negative, got {options['byte_offset']}"
+            if options.get('byte_offset') is not None or options.get('byte_limit') is not None:
+                return self._read_bytes(file_path, encoding, options.get('byte_offset') or 0,
+                                        options.get('byte_limit'), max_bytes)
+            if (options.get('offset') or options.get('limit') or options.get('line_numbers')
+                    or os.path.getsize(file_path) > max_bytes):
+                return self._read_lines(file_path, encoding, options.get('offset') or 1, options.get('limit'),
+                                        max_bytes, options.get('line_numbers', False))
+
+            return filecache.read_text(file_path, encoding, errors='replace')
 
         except PermissionError:
             return "Error: Permission denied"
@@ -97,43 +202,222 @@ class FileContentReaderTool(BaseTool):
         except Exception as e:
             return f"Error: {e!s}"
 
-    def _read_directory(self, dir_path: str) -> dict:
-        """Recursively read all files in a directory."""
+    @staticmethod
+    def _read_lines(file_path: str, encoding: str, offset: int, limit: Optional[int], max_bytes: int,
+                    line_numbers: bool) -> str:
+        """lines offset.. of a file, seeking through its cached line index where the encoding allows"""
+        if encoding in LINE_INDEXABLE:
+            index = get_index(file_path)
+            total = index.line_count
+            if offset > max(total, 1):
+                return f"Error: offset {offset} is past the end of the file ({total} lines)"
+            last = total if not limit else min(total, offset + limit - 1)
+            # cut at a line boundary; a single line longer than max_bytes is cut inside the line
+            last = min(last, index.last_line_within(offset, max_bytes))
+            start, length = index.span(offset, last)
+            data = filecache.read_range(file_path, start, min(length, max_bytes))
+            if length > max_bytes:
+                # one line longer than max_bytes: a character cut at the end is dropped
+                end = start + len(data)
+                return (_normalize_newlines(data.decode(encoding, errors='ignore')) +
+                        f'\n[Showing bytes {start}-{end} of line {offset} ({total} lines). Next: byte_offset={end}]')
+            content = data.decode(encoding, errors='replace')
+        else:
+            # utf-16 and utf-32 newlines are not single bytes; split the decoded text instead
+            lines = filecache.read_text(file_path, encoding, errors='replace', newline='').split('\n')
+            if not lines[-1]:
+                # the text ended in a newline, or was empty
+                lines.pop()
+            total = len(lines)
+            if offset > max(total, 1):
+                return f"Error: offset {offset} is past the end of the file ({total} lines)"
+            last = total if not limit else min(total, offset + limit - 1)
+            size = 0
+            for number in range(offset, last + 1):
+                size += len(lines[number - 1].encode('utf-8')) + 1
+                if size > max_bytes and number > offset:
+                    last = number - 1
+                    break
+            content = ''.join(line + '\n' for line in lines[offset - 1:last])
+
+        # numbered by \n, like the line index; lone \r line breaks are converted afterwards
+        content = content.replace('\r\n', '\n')
+        if line_numbers and content:
+            lines = content.split('\n')
+            if content.endswith('\n'):
+                lines.pop()
+            content = '\n'.join(f'{number:6}\t{line}' for number, line in enumerate(lines, offset))
+        content = _normalize_newlines(content)
+        if last < total:
+            content += f'\n[Showing lines {offset}-{last} of {total}. Next: offset={last + 1}]'
+        return content
+
+    @staticmethod
+    def _read_bytes(file_path: str, encoding: str, byte_offset: int, byte_limit: Optional[int],
+                    max_bytes: int) -> str:
+        """a byte range of a file; characters cut at its edges show as replacement characters"""
+        size = os.path.getsize(file_path)
+        length = min(byte_limit if byte_limit is not None else size, max_bytes)
+        data = filecache.read_range(file_path, byte_offset, length)
+        end = byte_offset + len(data)
+        content = _normalize_newlines(data.decode(encoding, errors='replace'))
+        if end < size and (byte_limit is None or len(data) < byte_limit):
+            content += f'\n[Showing bytes {byte_offset}-{end} of {size}. Next: byte_offset={end}]'
+        return content
+
+    def _read_image(self, file_path: str) -> Optional[Union[dict, str]]:
+        """Return an image block (or an error) if the file is an image, otherwise None."""
+        try:
+            with open(file_path, 'rb') as file:
+                if detect_mime(file.read(16)) is None:
+                    return None
+                size = os.fstat(file.fileno()).st_size
+                if size > Config.IMAGE_MAX_FILE_BYTES:
+                    return f"Error: Image is too large to read ({size} bytes, limit {Config.IMAGE_MAX_FILE_BYTES})"
+                file.seek(0)
+                data = file.read(Config.IMAGE_MAX_FILE_BYTES)
+        except OSError:
+            # _read_file reports missing and unreadable files
+            return None
+        try:
+            return prepare_image(data, active_max_dimension()).to_block()
+        except DECODE_ERRORS as e:
+            return f"Error: Unable to decode image: {e!s}"
+
+    def _read_directory(self, dir_path: str, options: Optional[Dict] = None) -> dict:
+        """Recursively read the files in a directory, within a byte budget."""
+        options = options or {}
         results = {}
 
         try:
-            for root, dirs, files in os.walk(dir_path):
-                # filter out directories to skip
-                dirs[:] = [d for d in dirs if not self._should_skip(os.path.join(root, d))]
+            # ignored directories are pruned by the walk
+            paths = [os.path.join(root, entry.name)
+                     for root, _, files in walk(dir_path, extra_rules=self.DIRECTORY_RULES)
+                     for entry in files]
+            with ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix='code-route-read') as pool:
+                candidates = [candidate for candidate in pool.map(self._candidate, paths) if candidate]
+                chosen, over_budget, used, budget = self._plan(candidates, options)
+                contents = dict(zip(chosen, pool.map(lambda path: self._read_file(path, options), chosen)))
+                outlined: Dict[str, str] = {}
+                if options.get('outline') is not False:
+                    to_outline = over_budget[:MAX_OUTLINED]
+                    for path, text in zip(to_outline, pool.map(self._outline, to_outline)):
+                        # outlines come out of what is left of the budget too
+                        if text is not None and used + len(text) <= budget:
+                            outlined[path] = text
+                            used += len(text)
 
-                # process files
-                for file in files:
-                    file_path = os.path.join(root, file)
-                    if not self._should_skip(file_path):
-                        content = self._read_file(file_path)
-                        results[file_path] = content
+            for path in paths:
+                if path in contents:
+                    results[path] = contents[path]
+                elif path in outlined:
+                    results[path] = outlined[path]
+            skipped = [path for path in over_budget if path not in outlined]
+            if over_budget:
+                results[dir_path] = self._budget_report(dir_path, len(contents), len(candidates), used,
+                                                        budget, outlined, skipped)
 
         except Exception as e:
             results[dir_path] = f"Error reading directory: {e!s}"
 
         return results
 
-    def execute(self, **kwargs) -> str:
+    def _candidate(self, path: str) -> Optional[Tuple[str, int, float]]:
+        """(path, size, mtime) of a directory file worth reading"""
+        if self._should_skip(path):
+            return None
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return path, st.st_size, st.st_mtime
+
+    @staticmethod
+    def _plan(candidates: List[Tuple[str, int, float]], options: Dict) -> Tuple[List[str], List[str], int, int]:
+        """(files to read, files over the budget, bytes planned, budget) in reading priority"""
+        budget = options.get('max_total_bytes') or Config.READ_DIRECTORY_MAX_BYTES
+        if options.get('max_tokens'):
+            budget = options['max_tokens'] * BYTES_PER_TOKEN
+        max_bytes = options.get('max_bytes') or Config.READ_MAX_BYTES
+        prefer = options.get('prefer') or []
+
+        def priority(candidate):
+            path, size, mtime = candidate
+            preferred = any(fnmatch.fnmatch(os.path.basename(path), pattern) or fnmatch.fnmatch(path, pattern)
+                            for pattern in prefer)
+            return not preferred, size, -mtime
+
+        ordered = sorted(candidates, key=priority)
+        content_budget = budget
+        while True:
+            chosen, over_budget, used = [], [], 0
+            for path, size, _ in ordered:
+                cost = min(size, max_bytes)
+                if used + cost <= content_budget:
+                    chosen.append(path)
+                    used += cost
+                else:
+                    over_budget.append(path)
+            if not over_budget or options.get('outline') is False or content_budget < budget:
+                return chosen, over_budget, used, budget
+            # not everything fits: leave room for the outlines of what does not
+            content_budget = int(budget * (1 - OUTLINE_SHARE))
+
+    def _outline(self, path: str) -> Optional[str]:
+        """an outline entry for a file over the directory budget, or None"""
+        try:
+            size = os.path.getsize(path)
+            if size > MAX_OUTLINE_BYTES:
+                return None
+            lines = outline(path, filecache.read_text(path, sniff(path) or 'utf-8', errors='replace'))
+        except OSError:
+            return None
+        header = f'[Outline only: {size} bytes did not fit the directory budget; read parts with offset/limit]'
+        return '\n'.join([header] + lines)
+
+    @staticmethod
+    def _budget_report(dir_path: str, read: int, total: int, used: int, budget: int,
+                       outlined: Dict[str, str], skipped: List[str]) -> str:
+        """the directory's own entry: what a budgeted read left out"""
+        report = [f'[Read {read} of {total} files ({used} of {budget} bytes budget). '
+                  f'Raise max_total_bytes or read files individually for the rest.]']
+        if outlined:
+            report.append(f'Outlines only: {len(outlined)} files')
+        if skipped:
+            names = [os.path.relpath(path, dir_path) for path in skipped[:MAX_LISTED_SKIPS]]
+            more = f' and {len(skipped) - MAX_LISTED_SKIPS} more' if len(skipped) > MAX_LISTED_SKIPS else ''
+            report.append(f'Not read: {", ".join(names)}{more}')
+        return '\n'.join(report)
+
+    def execute(self, **kwargs) -> ToolResult:
         file_paths = kwargs.get('file_paths', [])
+        defaults = {key: kwargs.get(key) for key in ('offset', 'limit', 'max_bytes', 'line_numbers', 'max_total_bytes',
+                                                     'max_tokens', 'prefer', 'outline')}
         results = {}
 
         try:
-            for path in file_paths:
+            for spec in file_paths:
+                # a file is a path, or an object with a path and its own range
+                options = dict(defaults)
+                if isinstance(spec, dict):
+                    path = spec.get('path', '')
+                    options.update({key: value for key, value in spec.items() if key != 'path'})
+                else:
+                    path = spec
                 if os.path.isdir(path):
                     # if it's a directory, read it recursively
-                    dir_results = self._read_directory(path)
+                    dir_results = self._read_directory(path, options)
                     results.update(dir_results)
                 else:
-                    # if it's a file, read it directly
-                    content = self._read_file(path)
-                    results[path] = content
+                    # if it's a file, read it directly (images become image blocks)
+                    image = self._read_image(path)
+                    results[path] = image if image is not None else self._read_file(path, options)
 
-            return json.dumps(results, indent=2)
+            preview = f"Read {len(results)} file(s)"
+            output_format = kwargs.get('format') or Config.READ_OUTPUT_FORMAT
+            if output_format == 'text' and all(isinstance(content, str) for content in results.values()):
+                return ToolResult(frame(results), preview=preview)
+            return ToolResult(results, preview=preview)
 
         except Exception as e:
-            return json.dumps({"error": str(e)}, indent=2)
\ No newline at end of file
+            return ToolResult.error(str(e))
\ No newline at end of file
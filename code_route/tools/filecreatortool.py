@@ -1,6 +1,7 @@
 import json
 from pathlib import Path
 
+from .. import filecache, workspace
 from .base import BaseTool
 
 
@@ -127,15 +128,13 @@ class FileCreatorTool(BaseTool):
                 if isinstance(content, dict):
                     content = json.dumps(content, indent=2)
 
-                mode = 'wb' if binary else 'w'
                 if binary:
                     if isinstance(content, str):
                         content = content.encode(encoding)
-                    with open(path, mode) as f:
-                        f.write(content)
+                    filecache.write_bytes(str(path), content)
                 else:
-                    with open(path, mode, encoding=encoding, newline='') as f:
-                        f.write(content)
+                    filecache.write_text(str(path), content, encoding, newline='')
+                workspace.invalidate(str(path))
 
                 results.append({
                     'path': str(path),
@@ -1,6 +1,7 @@
 import os
 import re
 
+from .. import filecache, workspace
 from .base import BaseTool
 
 
@@ -37,9 +38,8 @@ class FileEditTool(BaseTool):
             if not os.path.exists(file_path):
                 raise FileNotFoundError(f"File not found: {file_path}")
 
-            with open(file_path, encoding='utf-8') as file:
-                original_content = file.read()
-                lines = original_content.splitlines()
+            original_content = filecache.read_text(file_path)
+            lines = original_content.splitlines()
 
             if edit_type == "full":
                 updated_content = new_content
@@ -56,8 +56,8 @@ class FileEditTool(BaseTool):
                 else:
                     raise ValueError("Invalid partial edit parameters")
 
-            with open(file_path, 'w', encoding='utf-8') as file:
-                file.write(updated_content)
+            filecache.write_text(file_path, updated_content)
+            workspace.invalidate(file_path)
 
             return f"File successfully updated: {file_path}\n{updated_content}"
 
@@ -1,9 +1,42 @@
-import glob
 import os
-from typing import Dict
+from typing import Dict, Iterable, List, Tuple
 
+from .. import ripgrep, workspace
+from ..config import Config
+from ..ignore import compile_glob, expand_braces, walk
 from .base import BaseTool
 
+GLOB_MAGIC = set('*?[')
+
+
+class _Pattern:
+    """one expanded glob, relative to the directory the shared walk starts from"""
+
+    def __init__(self, base: str, prefix: str, rest: str, recursive: bool):
+        # the literal directory as written (e.g. './src'), which matches are reported under
+        self.base = base
+        # directory part without wildcards, '/'-separated and ending in '/' (or empty)
+        self.prefix = prefix
+        # walked paths have no '.' components (recursive mode puts '**/' before './src/*.py')
+        rest = '/'.join(part for part in rest.split('/') if part != '.')
+        # like glob.glob, wildcards do not match names starting with '.'
+        self.regex = compile_glob(rest, recursive, hidden=False)
+        # without ** a pattern cannot match below its own depth
+        depth = prefix.count('/') + rest.count('/')
+        self.max_depth = depth if not (recursive and '**' in rest) else None
+
+    def wants_dir(self, rel_dir: str) -> bool:
+        """whether a directory (with a trailing '/') can contain matches"""
+        return rel_dir.startswith(self.prefix) or self.prefix.startswith(rel_dir)
+
+    def match(self, rel_path: str) -> bool:
+        return rel_path.startswith(self.prefix) and self.regex.match(rel_path[len(self.prefix):]) is not None
+
+    def output(self, rel_path: str) -> str:
+        """a matched path spelled the way glob.glob spells it for this pattern"""
+        rest = rel_path[len(self.prefix):]
+        return os.path.join(self.base, rest) if self.base else rest
+
 
 class GlobTool(BaseTool):
     @property
@@ -12,7 +45,11 @@ class GlobTool(BaseTool):
 
     @property
     def description(self) -> str:
-        return 'Finds files based on pattern matching using glob patterns'
+        return ('Finds files based on pattern matching using glob patterns. '
+                'Several patterns and brace alternatives (e.g. "src/**/*.{ts,tsx}") are matched in a single directory walk; '
+                'results can be sorted by modification time and are capped at max_results. '
+                'As with glob, names starting with "." are only matched by a pattern part that starts with "." (e.g. ".*", "**/.github/*"). '
+                'Files excluded by .gitignore, .coderouteignore and built-in rules (.git, node_modules, venvs, caches) are skipped.')
 
     @property
     def input_schema(self) -> Dict:
@@ -23,6 +60,16 @@ class GlobTool(BaseTool):
                     'type': 'string',
                     'description': 'The glob pattern to match files against'
                 },
+                'patterns': {
+                    'type': 'array',
+                    'items': {'type': 'string'},
+                    'description': 'Several glob patterns to match in one pass (alternative to pattern)'
+                },
+                'path': {
+                    'type': 'string',
+                    'description': 'Directory the patterns are relative to (defaults to current directory)',
+                    'default': '.'
+                },
                 'recursive': {
                     'type': 'boolean',
                     'description': 'Whether to search recursively (default: false)',
@@ -32,28 +79,151 @@ class GlobTool(BaseTool):
                     'type': 'boolean',
                     'description': 'Whether to include directories in results (default: false)',
                     'default': False
+                },
+                'sort_by': {
+                    'type': 'string',
+                    'enum': ['path', 'mtime'],
+                    'description': 'Order results by path, or by modification time with the newest first',
+                    'default': 'path'
+                },
+                'max_results': {
+                    'type': 'integer',
+                    'description': 'Maximum number of paths to return',
+                    'default': Config.GLOB_MAX_RESULTS
+                },
+                'include_ignored': {
+                    'type': 'boolean',
+                    'description': 'Also match files excluded by .gitignore, .coderouteignore and the built-in ignore rules',
+                    'default': False
                 }
-            },
-            'required': ['pattern']
+            }
         }
 
     def execute(self, **kwargs) -> str:
-        pattern = kwargs.get('pattern')
+        patterns = list(kwargs.get('patterns') or [])
+        if kwargs.get('pattern'):
+            patterns.insert(0, kwargs['pattern'])
+        path = kwargs.get('path') or '.'
         recursive = kwargs.get('recursive', False)
         include_dirs = kwargs.get('include_dirs', False)
+        include_ignored = kwargs.get('include_ignored', False)
+        sort_by = kwargs.get('sort_by', 'path')
+        max_results = kwargs.get('max_results', Config.GLOB_MAX_RESULTS)
 
-        if not pattern:
+        if not patterns:
             return 'Error: No pattern provided'
 
         try:
-            if recursive:
-                pattern = os.path.join('**', pattern)
-            
-            matches = glob.glob(pattern, recursive=recursive)
-            
-            if not include_dirs:
-                matches = [m for m in matches if os.path.isfile(m)]
-            
-            return '\n'.join(matches) if matches else 'No files found matching the pattern'
+            expanded = []
+            for pattern in patterns:
+                for alternative in expand_braces(pattern):
+                    if recursive:
+                        alternative = os.path.join('**', alternative)
+                    if path != '.':
+                        alternative = os.path.join(path, alternative)
+                    expanded.append(alternative)
+
+            matches = self._match(list(dict.fromkeys(expanded)), recursive, include_dirs, include_ignored)
+            if not matches:
+                return 'No files found matching the pattern'
+
+            if sort_by == 'mtime':
+                matches.sort(key=lambda match: (-self._mtime(match), match))
+            else:
+                matches.sort()
+
+            if max_results and len(matches) > max_results:
+                return '\n'.join(matches[:max_results]) + (
+                    f'\n\n[Showing {max_results} of {len(matches)} matches; narrow the pattern or raise max_results]')
+            return '\n'.join(matches)
         except Exception as e:
-            return f'Error finding files: {e!s}' 
\ No newline at end of file
+            return f'Error finding files: {e!s}'
+
+    @staticmethod
+    def _mtime(path: str) -> float:
+        # not from the walk's entries: snapshot entries may carry an old stat result
+        try:
+            return os.stat(path).st_mtime
+        except OSError:
+            return 0.0
+
+    def _split_pattern(self, pattern: str) -> Tuple[str, str]:
+        """split a pattern into its literal leading directory and the part that needs matching"""
+        parts = pattern.split('/')
+        literal = 0
+        while literal < len(parts) - 1 and not GLOB_MAGIC & set(parts[literal]):
+            literal += 1
+        base = '/'.join(parts[:literal])
+        if pattern.startswith('/') and not base:
+            base = '/'
+        return base, '/'.join(parts[literal:])
+
+    def _match(self, patterns: List[str], recursive: bool, include_dirs: bool,
+               include_ignored: bool) -> List[str]:
+        """every match of any pattern, without duplicates"""
+        matches: Dict[str, None] = {}
+        groups: Dict[bool, List[Tuple[str, str]]] = {}
+        for pattern in patterns:
+            base, rest = self._split_pattern(pattern)
+            if not GLOB_MAGIC & set(rest):
+                # nothing to expand: the path either exists or it does not
+                if os.path.isfile(pattern) or (include_dirs and os.path.isdir(pattern)):
+                    matches.setdefault(pattern, None)
+                continue
+            groups.setdefault(os.path.isabs(pattern), []).append((base, rest))
+
+        # relative and absolute patterns each share one walk, from their common literal directory
+        for split_patterns in groups.values():
+            bases = [[part for part in base.split('/') if part and part != '.'] for base, _ in split_patterns]
+            common = []
+            for parts in zip(*bases):
+                if len(set(parts)) > 1:
+                    break
+                common.append(parts[0])
+            top = '/'.join(common)
+            if split_patterns[0][0].startswith('/'):
+                top = '/' + top
+            compiled = [
+                _Pattern(base, ''.join(f'{part}/' for part in parts[len(common):]), rest, recursive)
+                for parts, (base, rest) in zip(bases, split_patterns)
+            ]
+            for match_path in self._walk_matches(top, compiled, include_dirs, include_ignored):
+                matches.setdefault(match_path, None)
+        return list(matches)
+
+    @staticmethod
+    def _outputs(rel_path: str, patterns: List[_Pattern]) -> Iterable[str]:
+        """the path as each matching pattern spells it"""
+        for pattern in patterns:
+            if pattern.match(rel_path):
+                yield pattern.output(rel_path)
+
+    def _walk_matches(self, top: str, patterns: List[_Pattern], include_dirs: bool,
+                      include_ignored: bool) -> Iterable[str]:
+        walk_top = top or '.'
+        if not os.path.isdir(walk_top):
+            return
+        depths = [pattern.max_depth for pattern in patterns]
+        max_depth = None if None in depths else max(depths)
+
+        # a listing from ripgrep beats a cold walk, but not one served from the workspace snapshot
+        if not include_dirs and ripgrep.enabled() and not workspace.is_cached(walk_top):
+            try:
+                files = ripgrep.list_files([walk_top], include_ignored, max_depth)
+            except (ripgrep.RipgrepError, OSError):
+                pass
+            else:
+                skip = len(walk_top) if walk_top != '.' else 1
+                for file_path in files:
+                    rel_path = file_path[skip:].lstrip(os.sep).replace(os.sep, '/')
+                    yield from self._outputs(rel_path, patterns)
+                return
+
+        for dirpath, dirs, files in walk(walk_top, include_ignored=include_ignored, max_depth=max_depth):
+            rel_dir = dirpath[len(walk_top):].lstrip(os.sep).replace(os.sep, '/')
+            rel_dir = f'{rel_dir}/' if rel_dir else ''
+            for entry in (dirs + files) if include_dirs else files:
+                yield from self._outputs(rel_dir + entry.name, patterns)
+            # only descend where some pattern can still match
+            dirs[:] = [entry for entry in dirs
+                       if any(pattern.wants_dir(f'{rel_dir}{entry.name}/') for pattern in patterns)]
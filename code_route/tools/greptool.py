@@ -1,8 +1,12 @@
 import os
 import re
-import glob
-from typing import Dict, List
+from typing import Dict, Iterable, Iterator, List, Optional
 
+from .. import ripgrep
+from ..config import Config
+from ..ignore import compile_glob, find_repo_root, walk
+from ..search import CONTENT, COUNT, FILES_WITH_MATCHES, FileResult, Matcher, search
+from ..trigram import get_index
 from .base import BaseTool
 
 
@@ -14,7 +18,12 @@ class GrepTool(BaseTool):
     @property
     def description(self) -> str:
         return '''Searches for regex patterns in file contents with advanced filtering options.
-        
+        Patterns are matched line by line; files are searched in parallel (with ripgrep when it is installed) and results are listed in path order.
+        With multiline, the pattern runs over whole files (. also matches newlines) and each match is shown as the lines it spans,
+        e.g. "@property\\s+def \\w+" or "foo\\([^)]*\\)" across several lines.
+        Files excluded by .gitignore, .coderouteignore and built-in rules (.git, node_modules, venvs, caches) are skipped.
+        Results are paged: the output ends with the total and the offset of the next page when more results exist.
+
         Supports directory searching, glob patterns, and multiple output modes.
         Never use bash grep - this tool is optimized for Code Route with proper permissions.'''
 
@@ -47,6 +56,11 @@ class GrepTool(BaseTool):
                     'description': 'Output format: content shows lines, files_with_matches shows paths, count shows match counts',
                     'default': 'content'
                 },
+                'multiline': {
+                    'type': 'boolean',
+                    'description': 'Match across lines: the pattern runs over whole files with . matching newlines',
+                    'default': False
+                },
                 'case_sensitive': {
                     'type': 'boolean',
                     'description': 'Whether the search should be case sensitive',
@@ -66,6 +80,30 @@ class GrepTool(BaseTool):
                     'type': 'integer',
                     'description': 'Lines of context after each match (content mode only)',
                     'default': 0
+                },
+                'offset': {
+                    'type': 'integer',
+                    'description': 'Number of results to skip, to fetch the next page (a result is a matching line in content mode, a file otherwise)',
+                    'default': 0
+                },
+                'head_limit': {
+                    'type': 'integer',
+                    'description': 'Maximum results to return (0 for no page limit)',
+                    'default': Config.GREP_HEAD_LIMIT
+                },
+                'max_results': {
+                    'type': 'integer',
+                    'description': 'Stop searching after this many results; the total is then reported as a lower bound',
+                    'default': Config.GREP_MAX_RESULTS
+                },
+                'max_per_file': {
+                    'type': 'integer',
+                    'description': 'Stop reading a file after this many matching lines (content and count modes)'
+                },
+                'include_ignored': {
+                    'type': 'boolean',
+                    'description': 'Also search files excluded by .gitignore, .coderouteignore and the built-in ignore rules',
+                    'default': False
                 }
             },
             'required': ['pattern']
@@ -78,36 +116,60 @@ class GrepTool(BaseTool):
         glob_pattern = kwargs.get('glob_pattern')
         output_mode = kwargs.get('output_mode', 'content')
         case_sensitive = kwargs.get('case_sensitive', True)
+        multiline = kwargs.get('multiline', False)
         line_numbers = kwargs.get('line_numbers', True)
         context_before = kwargs.get('context_before', 0)
         context_after = kwargs.get('context_after', 0)
+        include_ignored = kwargs.get('include_ignored', False)
+        offset = max(0, kwargs.get('offset') or 0)
+        head_limit = kwargs.get('head_limit', Config.GREP_HEAD_LIMIT)
+        max_results = kwargs.get('max_results', Config.GREP_MAX_RESULTS)
+        max_per_file = kwargs.get('max_per_file') or None
 
         if not pattern:
             return 'Error: No pattern provided'
 
         try:
-            flags = 0 if case_sensitive else re.IGNORECASE
-            regex = re.compile(pattern, flags)
-            if files:
-                search_files = files
+            matcher = Matcher(pattern, case_sensitive, multiline)
+            if output_mode == 'files_with_matches':
+                mode, unit = FILES_WITH_MATCHES, 'files'
+            elif output_mode == 'count':
+                mode, unit = COUNT, 'files'
             else:
-                search_files = self._find_files(path, glob_pattern)
+                mode, unit = CONTENT, 'matches'
 
-            if not search_files:
-                return 'No files found to search'
+            results = None
+            # ripgrep's multiline mode keeps \r in crlf files, which the python engine normalizes away
+            if ripgrep.enabled() and not multiline:
+                results = self._ripgrep_search(pattern, path, files, glob_pattern, case_sensitive, mode,
+                                               context_before, context_after, max_per_file, include_ignored)
+            if results is None:
+                if files:
+                    search_files = files
+                else:
+                    search_files = self._find_files(path, glob_pattern, include_ignored)
 
-            if output_mode == 'files_with_matches':
-                return self._search_files_only(search_files, regex)
-            if output_mode == 'count':
-                return self._search_count(search_files, regex)
-            return self._search_content(search_files, regex, line_numbers, context_before, context_after)
+                if not search_files:
+                    return 'No files found to search'
+
+                if not files:
+                    search_files = self._narrow_with_index(path, search_files, matcher)
+
+                results = search(search_files, matcher, mode, context_before, context_after, max_count=max_per_file)
+
+            # closing the search as soon as the page is complete cancels the files still queued
+            try:
+                entries = self._entries(results, mode, line_numbers)
+                return self._paginate(entries, unit, offset, head_limit, max_results)
+            finally:
+                results.close()
 
         except re.error as e:
             return f'Error: Invalid regex pattern: {e!s}'
         except Exception as e:
             return f'Error searching files: {e!s}'
 
-    def _find_files(self, path: str, glob_pattern: str = None) -> List[str]:
+    def _find_files(self, path: str, glob_pattern: str = None, include_ignored: bool = False) -> List[str]:
         files = []
         
         if os.path.isfile(path):
@@ -116,81 +178,132 @@ class GrepTool(BaseTool):
         if not os.path.isdir(path):
             return []
 
-        if glob_pattern:
-            pattern_path = os.path.join(path, glob_pattern)
-            files = glob.glob(pattern_path, recursive=True)
-            files = [f for f in files if os.path.isfile(f)]
-        else:
-            for root, _, filenames in os.walk(path):
-                for filename in filenames:
-                    files.append(os.path.join(root, filename))
+        # glob patterns are relative to path; without ** they cannot match below their own depth
+        matcher = compile_glob(glob_pattern) if glob_pattern else None
+        max_depth = glob_pattern.count('/') if glob_pattern and '**' not in glob_pattern else None
+        prefix = len(path.rstrip(os.sep)) + 1
 
-        return sorted(files)
+        for root, _, entries in walk(path, include_ignored=include_ignored, max_depth=max_depth):
+            for entry in entries:
+                file_path = os.path.join(root, entry.name)
+                if matcher is None or matcher.match(file_path[prefix:].replace(os.sep, '/')):
+                    files.append(file_path)
 
-    def _search_files_only(self, files: List[str], regex) -> str:
-        matching_files = []
-        
-        for file_path in files:
-            try:
-                with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    if any(regex.search(line) for line in f):
-                        matching_files.append(file_path)
-            except Exception:
-                continue
-                
-        return '\n'.join(matching_files) if matching_files else 'No matches found'
+        # compare component by component, the order ripgrep's results come in
+        return sorted(files, key=lambda file_path: file_path.split(os.sep))
 
-    def _search_count(self, files: List[str], regex) -> str:
-        results = []
-        
-        for file_path in files:
-            try:
-                count = 0
-                with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    for line in f:
-                        count += len(regex.findall(line))
-                
-                if count > 0:
-                    results.append(f'{file_path}: {count}')
-            except Exception:
-                continue
-                
-        return '\n'.join(results) if results else 'No matches found'
+    def _ripgrep_search(self, pattern: str, path: str, files: List[str], glob_pattern: Optional[str],
+                        case_sensitive: bool, mode: str, context_before: int, context_after: int,
+                        max_per_file: Optional[int], include_ignored: bool) -> Optional[Iterator[FileResult]]:
+        """results from ripgrep, filtered to the glob as _find_files would; None if rg cannot run the search"""
+        matcher = max_depth = hint = None
+        if not files and glob_pattern and os.path.isdir(path):
+            matcher = compile_glob(glob_pattern)
+            max_depth = glob_pattern.count('/') if '**' not in glob_pattern else None
+            # rg globs without a slash match names at any depth, a superset that only prunes the search
+            name = glob_pattern.rsplit('/', 1)[-1]
+            hint = name if '**' not in name and '{' not in name else None
 
-    def _search_content(self, files: List[str], regex, line_numbers: bool, 
-                       context_before: int, context_after: int) -> str:
-        results = []
-        
-        for file_path in files:
+        try:
+            results = ripgrep.search(files or [path], pattern, case_sensitive, mode, context_before, context_after,
+                                     max_per_file, include_ignored, max_depth, hint)
+        except (ripgrep.RipgrepError, OSError):
+            return None
+        if matcher is None:
+            return results
+
+        prefix = len(path.rstrip(os.sep)) + 1
+
+        def matching():
             try:
-                with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    lines = f.readlines()
-                
-                matches = []
-                for i, line in enumerate(lines):
-                    if regex.search(line):
-                        matches.append(i)
-                
-                if matches:
-                    file_results = []
-                    for match_line in matches:
-                        start = max(0, match_line - context_before)
-                        end = min(len(lines), match_line + context_after + 1)
-                        
-                        for line_idx in range(start, end):
-                            line_content = lines[line_idx].rstrip()
-                            if line_numbers:
-                                prefix = f'{file_path}:{line_idx + 1}:'
-                                if line_idx == match_line:
-                                    file_results.append(f'{prefix} {line_content}')
-                                else:
-                                    file_results.append(f'{prefix}- {line_content}')
-                            else:
-                                file_results.append(f'{file_path}: {line_content}')
-                    
-                    results.extend(file_results)
-                    
-            except Exception:
+                for result in results:
+                    if matcher.match(result.path[prefix:].replace(os.sep, '/')):
+                        yield result
+            finally:
+                results.close()
+
+        return matching()
+
+    def _narrow_with_index(self, path: str, files: List[str], matcher: Matcher) -> List[str]:
+        """drop files the workspace trigram index rules out; changed files are reindexed in the background"""
+        min_files = Config.GREP_INDEX_MIN_FILES
+        if min_files is None or len(files) < min_files or not matcher.index_literals:
+            return files
+
+        # only the workspace gets an index; greps elsewhere (home, site-packages) must not write one there
+        cwd = os.getcwd()
+        root = find_repo_root(cwd) or cwd
+        try:
+            if os.path.commonpath([os.path.abspath(path), root]) != root:
+                return files
+        except ValueError:
+            # on another drive
+            return files
+        try:
+            index = get_index(root)
+            candidates, stale = index.candidates(files, matcher.index_literals)
+        except OSError:
+            return files
+        index.update_in_background(stale)
+        return candidates
+
+    def _entries(self, results: Iterable[FileResult], mode: str, line_numbers: bool) -> Iterator[List[str]]:
+        """output lines per result: one file, or one match with its context"""
+        for result in results:
+            if mode == FILES_WITH_MATCHES:
+                yield [result.path]
+                continue
+            if mode == COUNT:
+                capped = ' (per-file limit reached)' if result.truncated else ''
+                yield [f'{result.path}: {result.count}{capped}']
                 continue
-                
-        return '\n'.join(results) if results else 'No matches found' 
\ No newline at end of file
+
+            bounds = result.groups + [len(result.lines)]
+            for start, end in zip(bounds, bounds[1:]):
+                group = []
+                for line_number, line_content, is_match in result.lines[start:end]:
+                    if not line_numbers:
+                        group.append(f'{result.path}: {line_content}')
+                    elif is_match:
+                        group.append(f'{result.path}:{line_number}: {line_content}')
+                    else:
+                        group.append(f'{result.path}:{line_number}:- {line_content}')
+                yield group
+
+    def _paginate(self, entries: Iterator[List[str]], unit: str, offset: int,
+                  head_limit: Optional[int], max_results: Optional[int]) -> str:
+        """
+        return one page of entries, counting the rest until max_results so the
+        total can be reported; the search stops there
+        """
+        page_end = offset + head_limit if head_limit else None
+        # a page past max_results is still served
+        limit = max(max_results, page_end or 0) if max_results else None
+
+        output: List[str] = []
+        total = 0
+        complete = True
+        for entry in entries:
+            # only an entry past the limit shows the results are incomplete
+            if limit is not None and total >= limit:
+                complete = False
+                break
+            if total >= offset and (page_end is None or total < page_end):
+                output.extend(entry)
+            total += 1
+
+        if total == 0:
+            return 'No matches found'
+        shown_end = min(total, page_end) if page_end is not None else total
+        total_text = str(total) if complete else f'at least {total}'
+        if offset >= total:
+            return f'No results at offset {offset}; the search found {total_text} {unit}'
+        if offset == 0 and shown_end == total and complete:
+            return '\n'.join(output)
+
+        footer = f'[Showing {unit} {offset + 1}-{shown_end} of {total_text}'
+        if not complete:
+            footer += ' (search stopped at max_results)'
+        if shown_end < total or not complete:
+            footer += f'. Next page: offset={shown_end}'
+        return '\n'.join(output) + f'\n\n{footer}]'
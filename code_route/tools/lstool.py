@@ -1,8 +1,39 @@
+import fnmatch
 import os
-from typing import Dict, List
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
 
+from ..config import Config
+from ..ignore import IgnoreFilter, WalkEntry, walk
 from .base import BaseTool
 
+MAX_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+
+
+class _Tree:
+    """one listed directory: its shown entries and, when summarizing, its totals"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.dirs: List['_Tree'] = []
+        self.files: List[Tuple[str, Optional[int]]] = []
+        self.hidden = 0            # entries past the per-directory cap
+        self.expanded = False
+        self.unreadable = False
+        self.totals: Optional[Future] = None   # (files, bytes) of a collapsed subtree
+
+    def summary(self) -> Tuple[int, int]:
+        """(files, bytes) below this directory"""
+        if self.totals is not None:
+            return self.totals.result()
+        count = len(self.files)
+        size = sum(file_size or 0 for _, file_size in self.files)
+        for child in self.dirs:
+            child_count, child_size = child.summary()
+            count += child_count
+            size += child_size
+        return count, size
+
 
 class LSTool(BaseTool):
     @property
@@ -11,7 +42,10 @@ class LSTool(BaseTool):
 
     @property
     def description(self) -> str:
-        return 'Lists files and directories with optional glob pattern filtering'
+        return ('Lists files and directories with optional glob pattern filtering. '
+                'With depth > 1 it renders an indented tree of the subdirectories in one call, '
+                'and summarize adds file counts and total sizes per directory. '
+                'Entries excluded by .gitignore, .coderouteignore and built-in rules (.git, node_modules, venvs, caches) are hidden.')
 
     @property
     def input_schema(self) -> Dict:
@@ -27,6 +61,26 @@ class LSTool(BaseTool):
                     'items': {'type': 'string'},
                     'description': 'List of glob patterns to ignore',
                     'default': []
+                },
+                'depth': {
+                    'type': 'integer',
+                    'description': 'Directory levels to show; 1 lists only path itself',
+                    'default': 1
+                },
+                'summarize': {
+                    'type': 'boolean',
+                    'description': 'Show the number of files and total size below each directory',
+                    'default': False
+                },
+                'max_entries': {
+                    'type': 'integer',
+                    'description': 'Entries shown per directory before the rest are counted',
+                    'default': Config.LS_MAX_ENTRIES
+                },
+                'include_ignored': {
+                    'type': 'boolean',
+                    'description': 'Also list entries excluded by .gitignore, .coderouteignore and the built-in ignore rules',
+                    'default': False
                 }
             },
             'required': ['path']
@@ -35,6 +89,10 @@ class LSTool(BaseTool):
     def execute(self, **kwargs) -> str:
         path = kwargs.get('path')
         ignore_patterns = kwargs.get('ignore', [])
+        include_ignored = kwargs.get('include_ignored', False)
+        depth = max(1, kwargs.get('depth', 1) or 1)
+        summarize = kwargs.get('summarize', False)
+        max_entries = kwargs.get('max_entries', Config.LS_MAX_ENTRIES)
 
         if not path:
             return 'Error: No path provided'
@@ -49,42 +107,128 @@ class LSTool(BaseTool):
             return f'Error: Path is not a directory: {path}'
 
         try:
-            entries = []
-            for item in sorted(os.listdir(path)):
-                if self._should_ignore(item, ignore_patterns):
-                    continue
-                    
-                item_path = os.path.join(path, item)
-                if os.path.isdir(item_path):
-                    entries.append(f'[dir]  {item}/')
-                else:
-                    size = self._get_file_size(item_path)
-                    entries.append(f'[file] {item} ({size})')
-
-            if not entries:
+            ignore = None if include_ignored else IgnoreFilter(path)
+            with ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix='code-route-ls') as pool:
+                tree = self._tree(path, path, depth, ignore, ignore_patterns, summarize, max_entries, pool)
+                if tree.unreadable:
+                    raise PermissionError(path)
+                lines: List[str] = []
+                self._render(tree, 0, summarize, lines)
+
+            if not lines:
                 return f'Directory is empty: {path}'
 
-            return f'Contents of {path}:\n\n' + '\n'.join(entries)
+            header = f'Contents of {path}'
+            if summarize:
+                count, size = tree.summary()
+                header += f' ({count} files, {self._format_size(size)})'
+            if len(lines) > Config.LS_MAX_LINES:
+                omitted = len(lines) - Config.LS_MAX_LINES
+                lines = lines[:Config.LS_MAX_LINES] + [
+                    f'\n[{omitted} more lines not shown; list a subdirectory or lower depth]']
+            return f'{header}:\n\n' + '\n'.join(lines)
 
         except PermissionError:
             return f'Error: Permission denied accessing: {path}'
         except Exception as e:
             return f'Error listing directory: {e!s}'
 
+    @staticmethod
+    def _walk(directory: str, ignore: Optional[IgnoreFilter], max_depth: Optional[int] = None):
+        # one filter for the whole listing, so parent ignore files apply inside subdirectories
+        if ignore is None:
+            return walk(directory, include_ignored=True, max_depth=max_depth)
+        return ignore.walk(directory, max_depth=max_depth)
+
+    def _tree(self, name: str, directory: str, depth: int, ignore: Optional[IgnoreFilter],
+              patterns: List[str], summarize: bool, max_entries: Optional[int],
+              pool: ThreadPoolExecutor) -> _Tree:
+        tree = _Tree(name)
+        tree.expanded = True
+        listing: Optional[WalkEntry] = next(self._walk(directory, ignore, max_depth=0), None)
+        if listing is None:
+            # the walk yields nothing for a directory it cannot read
+            tree.unreadable = True
+            return tree
+        _, dirs, files = listing
+
+        items = [(entry.name, True, entry) for entry in dirs] + [(entry.name, False, entry) for entry in files]
+        items = [item for item in sorted(items, key=lambda item: item[:2]) if not self._should_ignore(item[0], patterns)]
+        if max_entries is not None and len(items) > max_entries:
+            tree.hidden = len(items) - max_entries
+            if not summarize:
+                # entries past the cap are only counted, unless they add to the totals
+                items = items[:max_entries]
+
+        for index, (item, is_dir, entry) in enumerate(items):
+            item_path = os.path.join(directory, item)
+            visible = max_entries is None or index < max_entries
+            if not is_dir:
+                tree.files.append((item, self._size(item_path)))
+            elif depth > 1 and visible and not entry.is_symlink():
+                tree.dirs.append(self._tree(item, item_path, depth - 1, ignore, patterns,
+                                            summarize, max_entries, pool))
+            else:
+                child = _Tree(item)
+                if summarize and not entry.is_symlink():
+                    child.totals = pool.submit(self._aggregate, item_path, ignore, patterns)
+                tree.dirs.append(child)
+        return tree
+
+    def _aggregate(self, directory: str, ignore: Optional[IgnoreFilter], patterns: List[str]) -> Tuple[int, int]:
+        """(files, bytes) of a subtree that is not shown"""
+        count = size = 0
+        for root, dirs, files in self._walk(directory, ignore):
+            dirs[:] = [entry for entry in dirs if not self._should_ignore(entry.name, patterns)]
+            for entry in files:
+                if not self._should_ignore(entry.name, patterns):
+                    count += 1
+                    size += self._size(os.path.join(root, entry.name)) or 0
+        return count, size
+
+    def _render(self, tree: _Tree, level: int, summarize: bool, lines: List[str]) -> None:
+        indent = '  ' * level
+        children = [(child.name, True, child) for child in tree.dirs] + \
+                   [(name, False, file_size) for name, file_size in tree.files]
+        limit = len(children) - tree.hidden
+        for index, (item, is_dir, value) in enumerate(sorted(children, key=lambda child: child[:2])):
+            if index >= limit:
+                break
+            if is_dir:
+                line = f'{indent}[dir]  {item}/'
+                if summarize:
+                    count, size = value.summary()
+                    line += f' ({count} files, {self._format_size(size)})'
+                if value.unreadable:
+                    line += ' (permission denied)'
+                lines.append(line)
+                if value.expanded:
+                    self._render(value, level + 1, summarize, lines)
+            else:
+                lines.append(f'{indent}[file] {item} ({self._format_size(value)})')
+        if tree.hidden:
+            lines.append(f'{indent}... {tree.hidden} more entries')
+
     def _should_ignore(self, item: str, patterns: List[str]) -> bool:
         """Check if item matches any ignore pattern"""
-        import fnmatch
         return any(fnmatch.fnmatch(item, pattern) for pattern in patterns)
 
-    def _get_file_size(self, path: str) -> str:
-        """Get human-readable file size"""
+    @staticmethod
+    def _size(path: str) -> Optional[int]:
+        # a fresh stat: entries from the workspace snapshot may carry an old one
         try:
-            size = os.path.getsize(path)
-            if size < 1024:
-                return f'{size}B'
-            elif size < 1024 * 1024:
-                return f'{size // 1024}KB'
-            else:
-                return f'{size // (1024 * 1024)}MB'
-        except:
-            return '?' 
\ No newline at end of file
+            return os.path.getsize(path)
+        except OSError:
+            return None
+
+    @staticmethod
+    def _format_size(size: Optional[int]) -> str:
+        """Get human-readable file size"""
+        if size is None:
+            return '?'
+        if size < 1024:
+            return f'{size}B'
+        elif size < 1024 * 1024:
+            return f'{size // 1024}KB'
+        else:
+            return f'{size // (1024 * 1024)}MB'
@@ -1,6 +1,7 @@
 import os
 from typing import Dict, List
 
+from .. import filecache, workspace
 from .base import BaseTool
 
 
@@ -70,8 +71,7 @@ class MultiEditTool(BaseTool):
             return f'Error: File does not exist: {file_path}'
 
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
+            content = filecache.read_text(file_path)
 
             original_content = content
             edit_count = 0
@@ -104,8 +104,8 @@ class MultiEditTool(BaseTool):
                     content = content.replace(old_string, new_string, 1)
                     edit_count += 1
 
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(content)
+            filecache.write_text(file_path, content)
+            workspace.invalidate(file_path)
 
             return f'Successfully applied {len(edits)} edits to {file_path}'
 
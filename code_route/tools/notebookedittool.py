@@ -2,6 +2,7 @@ import json
 import os
 from typing import Dict
 
+from .. import filecache, workspace
 from .base import BaseTool
 
 
@@ -60,8 +61,7 @@ class NotebookEditTool(BaseTool):
             return f'Error: {file_path} is not a file'
 
         try:
-            with open(file_path, encoding='utf-8') as f:
-                notebook = json.load(f)
+            notebook = json.loads(filecache.read_text(file_path))
 
             if 'cells' not in notebook:
                 return 'Error: Invalid notebook format'
@@ -90,8 +90,8 @@ class NotebookEditTool(BaseTool):
                 if source:
                     cell['source'] = source.split('\n')
 
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(notebook, f, indent=1)
+            filecache.write_text(file_path, json.dumps(notebook, indent=1))
+            workspace.invalidate(file_path)
 
             return f'Successfully {operation}d cell at index {cell_index}'
         except json.JSONDecodeError:
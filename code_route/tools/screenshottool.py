@@ -1,8 +1,7 @@
-import base64
-import io
 from typing import Any
 
-from .base import BaseTool
+from ..images import active_max_dimension, prepare_pil_image
+from .base import BaseTool, ToolResult
 
 try:
     import pyautogui
@@ -15,6 +14,7 @@ class ScreenshotTool(BaseTool):
     description = '''
     Captures a screenshot of the current screen and returns an image block ready to be sent to Claude.
     Optionally, a specific region of the screen can be captured by providing coordinates.
+    The screenshot is downscaled and compressed (usually to WebP) before it is returned.
 
     Inputs:
     - region (optional): A list of four integers [x, y, width, height] specifying the region of the screen to capture.
@@ -26,8 +26,8 @@ class ScreenshotTool(BaseTool):
         "type": "image",
         "source": {
           "type": "base64",
-          "media_type": "image/png",
-          "data": "<base64-encoded png>"
+          "media_type": "image/webp",
+          "data": "<base64-encoded image>"
         }
       }
     ]
@@ -55,21 +55,13 @@ class ScreenshotTool(BaseTool):
 
         try:
             screenshot: Image.Image = pyautogui.screenshot(region=region)
+            image = prepare_pil_image(screenshot, active_max_dimension())
 
-            with io.BytesIO() as buffer:
-                screenshot.save(buffer, format="PNG")
-                encoded_data = base64.b64encode(buffer.getvalue()).decode("utf-8")
-
-            return [
-                {
-                    "type": "image",
-                    "source": {
-                        "type": "base64",
-                        "media_type": "image/png",
-                        "data": encoded_data,
-                    }
-                }
-            ]
+            return ToolResult(
+                [image.to_block()],
+                mime_type=image.media_type,
+                preview=f"Screenshot ({image.describe()})",
+            )
 
         except Exception as e:
             return f"Error capturing screenshot: {e!s}"
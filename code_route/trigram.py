@@ -0,0 +1,240 @@
+"""
+persistent trigram index that narrows greptool searches on large workspaces
+
+every indexed file gets a signature: a bitmap with one (hashed) bit for each
+distinct trigram of its lowercased content, sized to the file's trigram
+count. a search turns the literal substrings its pattern requires into the
+same bits, and only files whose signature has all of them can match; the
+real regex then runs on those candidates alone. signatures never produce
+false negatives, only the occasional false positive.
+
+the index lives in <workspace>/.code_route/ and is keyed by path, mtime and
+size. files that are new or changed since they were indexed are always
+searched, and are (re)indexed on a background thread after the search, so
+an index never makes a query slower or wrong - it only converges. files
+changed within RACY_SECONDS are not indexed, since a second change in the
+same mtime tick with the same size would keep their old trigrams.
+"""
+
+import logging
+import os
+import struct
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+INDEX_DIR = ".code_route"
+INDEX_FILE = "grep-trigrams.idx"
+MAGIC = b"CRTRIGRAM1\n"
+
+MIN_SIGNATURE_BITS = 10          # log2 of the smallest signature (128 bytes)
+MAX_SIGNATURE_BITS = 16          # log2 of the largest signature (8KB)
+MAX_INDEXED_BYTES = 8 * 1024 * 1024  # larger files are always searched
+UPDATE_SECONDS = 30.0            # work done by one background update before it yields
+RACY_SECONDS = 2.0
+
+_ENTRY = struct.Struct("<HqqB")  # path length, mtime_ns, size, log2 signature bits (0: not indexed)
+
+# (mtime_ns, size, log2 bits, signature)
+Entry = Tuple[int, int, int, int]
+
+
+def _trigrams(data: bytes) -> set:
+    data = data.lower()
+    return set(zip(data, data[1:], data[2:]))
+
+
+def _bit(trigram: Tuple[int, int, int], log2_bits: int) -> int:
+    a, b, c = trigram
+    return ((((a << 16) | (b << 8) | c) * 0x9E3779B1) & 0xFFFFFFFF) >> (32 - log2_bits)
+
+
+def signature(data: bytes) -> Tuple[int, int]:
+    """(log2 bits, bitmap) for content; about two bits per distinct trigram keeps false positives rare"""
+    trigrams = _trigrams(data)
+    log2_bits = max(MIN_SIGNATURE_BITS, min(MAX_SIGNATURE_BITS, (2 * len(trigrams)).bit_length()))
+    bitmap = bytearray(1 << (log2_bits - 3))
+    for trigram in trigrams:
+        bit = _bit(trigram, log2_bits)
+        bitmap[bit >> 3] |= 1 << (bit & 7)
+    return log2_bits, int.from_bytes(bitmap, "little")
+
+
+class TrigramIndex:
+    """the signatures of one workspace; thread-safe"""
+
+    def __init__(self, root: str):
+        self.root = root
+        self.path = os.path.join(root, INDEX_DIR, INDEX_FILE)
+        self._entries: Dict[str, Entry] = {}
+        self._lock = threading.Lock()
+        self._updating = False
+        self._loaded_stamp: Optional[Tuple[int, int]] = None
+        self._load()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _stamp(self) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def _load(self) -> None:
+        stamp = self._stamp()
+        entries: Dict[str, Entry] = {}
+        if stamp is not None:
+            try:
+                with open(self.path, "rb") as f:
+                    data = f.read()
+                entries = self._decode(data)
+            except (OSError, ValueError, struct.error, UnicodeDecodeError) as e:
+                logging.warning(f"Ignoring unreadable grep index {self.path}: {e!s}")
+                entries = {}
+        with self._lock:
+            self._entries = entries
+            self._loaded_stamp = stamp
+
+    @staticmethod
+    def _decode(data: bytes) -> Dict[str, Entry]:
+        if not data.startswith(MAGIC):
+            raise ValueError("not a grep index")
+        entries: Dict[str, Entry] = {}
+        offset = len(MAGIC)
+        while offset < len(data):
+            path_length, mtime_ns, size, log2_bits = _ENTRY.unpack_from(data, offset)
+            offset += _ENTRY.size
+            path = data[offset:offset + path_length].decode("utf-8")
+            offset += path_length
+            bitmap = 0
+            if log2_bits:
+                length = 1 << (log2_bits - 3)
+                bitmap = int.from_bytes(data[offset:offset + length], "little")
+                offset += length
+            entries[path] = (mtime_ns, size, log2_bits, bitmap)
+        return entries
+
+    def save(self) -> None:
+        """write the index atomically; concurrent writers simply replace each other"""
+        with self._lock:
+            entries = list(self._entries.items())
+        out = bytearray(MAGIC)
+        for path, (mtime_ns, size, log2_bits, bitmap) in entries:
+            encoded = path.encode("utf-8")
+            out += _ENTRY.pack(len(encoded), mtime_ns, size, log2_bits)
+            out += encoded
+            if log2_bits:
+                out += bitmap.to_bytes(1 << (log2_bits - 3), "little")
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        temp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(out)
+        os.replace(temp_path, self.path)
+        with self._lock:
+            self._loaded_stamp = self._stamp()
+
+    def refresh(self) -> None:
+        """reload if another process has rewritten the index since it was read"""
+        if self._stamp() != self._loaded_stamp and not self._updating:
+            self._load()
+
+    def _key(self, path: str) -> str:
+        return os.path.relpath(os.path.abspath(path), self.root)
+
+    def candidates(self, paths: Iterable[str], literals: List[bytes]) -> Tuple[List[str], List[str]]:
+        """
+        split paths into (candidates, stale): candidates keep the input order and
+        include every file the index cannot rule out; stale files are the ones
+        that need (re)indexing
+        """
+        query = set()
+        for literal in literals:
+            query |= _trigrams(literal)
+        masks: Dict[int, int] = {}
+        candidates, stale = [], []
+        with self._lock:
+            entries = self._entries
+        for path in paths:
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entry = entries.get(self._key(path))
+            if entry is None or entry[0] != st.st_mtime_ns or entry[1] != st.st_size:
+                candidates.append(path)
+                stale.append(path)
+                continue
+            log2_bits, bitmap = entry[2], entry[3]
+            if not log2_bits:
+                candidates.append(path)
+                continue
+            mask = masks.get(log2_bits)
+            if mask is None:
+                mask = 0
+                for trigram in query:
+                    mask |= 1 << _bit(trigram, log2_bits)
+                masks[log2_bits] = mask
+            if bitmap & mask == mask:
+                candidates.append(path)
+        return candidates, stale
+
+    def update(self, paths: Iterable[str], seconds: float = UPDATE_SECONDS) -> int:
+        """(re)index paths for up to the given time; returns how many were indexed"""
+        deadline = time.monotonic() + seconds
+        indexed = 0
+        for path in paths:
+            if time.monotonic() > deadline:
+                break
+            try:
+                with open(path, "rb") as f:
+                    st = os.fstat(f.fileno())
+                    if time.time_ns() - st.st_mtime_ns <= RACY_SECONDS * 1e9:
+                        # stays stale, so it is searched and indexed again later
+                        continue
+                    if st.st_size > MAX_INDEXED_BYTES:
+                        entry = (st.st_mtime_ns, st.st_size, 0, 0)
+                    else:
+                        entry = (st.st_mtime_ns, st.st_size) + signature(f.read())
+            except OSError:
+                continue
+            with self._lock:
+                self._entries[self._key(path)] = entry
+            indexed += 1
+        return indexed
+
+    def update_in_background(self, paths: List[str]) -> None:
+        """index paths on a daemon thread, unless an update is already running"""
+        if not paths:
+            return
+        with self._lock:
+            if self._updating:
+                return
+            self._updating = True
+
+        def run():
+            try:
+                if self.update(paths):
+                    self.save()
+            except Exception as e:
+                logging.warning(f"Grep index update failed: {e!s}")
+            finally:
+                self._updating = False
+
+        threading.Thread(target=run, name="code-route-grep-index", daemon=True).start()
+
+
+_indexes: Dict[str, TrigramIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_index(root: str) -> TrigramIndex:
+    """the process-wide index for a workspace root"""
+    root = os.path.abspath(root)
+    with _indexes_lock:
+        index = _indexes.get(root)
+        if index is None:
+            index = _indexes[root] = TrigramIndex(root)
+    index.refresh()
+    return index
@@ -0,0 +1,349 @@
+"""
+code route web lite - a small flask frontend that streams turns over server-sent events
+
+sessions live on the server (one Assistant each, sharing the process-wide tool
+catalog and api clients). the browser posts a message, then receives only the
+incremental events of the turn - text deltas, tool start/finish and token usage -
+over a single EventSource connection. there is no full-page rerun.
+
+events are numbered per session. /api/history returns the number of the last
+event its snapshot covers, and a stream only sends the events after it, so a
+reloaded page does not render a finished reply twice.
+
+start it with `code-route --web-lite`.
+"""
+
+import json
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+from flask import Flask, Response, jsonify, request
+
+from .assistant import Assistant
+
+SESSION_COOKIE = "code_route_session"
+SESSION_TTL_SECONDS = 60 * 60        # idle sessions are dropped after an hour
+KEEPALIVE_SECONDS = 15               # comment frames keep proxies from closing the stream
+
+
+class WebSession:
+    """server-side state for one browser session"""
+
+    def __init__(self):
+        self.assistant = Assistant()
+        # progress reaches the browser as events; the terminal spinner only clutters the server log
+        self.assistant.thinking_enabled = False
+        self.assistant.stream_responses = True
+        # guards the event log and turn starts; notified when an event is added
+        self.lock = threading.Condition()
+        self.seq = 0
+        self._events: List[Tuple[int, str, Dict[str, Any]]] = []   # the events of the latest turn
+        self.worker: Optional[threading.Thread] = None
+        self.last_seen = time.time()
+        self.assistant.add_listener(self._on_event)
+
+    @property
+    def busy(self) -> bool:
+        return self.worker is not None and self.worker.is_alive()
+
+    def _on_event(self, event: str, data: Dict[str, Any]) -> None:
+        if event == "tool_start":
+            # arguments can be whole files; the page only needs the name
+            data = {"name": data["name"]}
+        with self.lock:
+            self.seq += 1
+            self._events.append((self.seq, event, data))
+            self.lock.notify_all()
+
+    def events_after(self, seq: int, timeout: float) -> List[Tuple[int, str, Dict[str, Any]]]:
+        """the events numbered above seq, waiting up to timeout for one"""
+        with self.lock:
+            self.lock.wait_for(lambda: self.seq > seq, timeout)
+            return [entry for entry in self._events if entry[0] > seq]
+
+    def start_turn(self, message: str) -> bool:
+        """start a turn in a worker thread; False if one is already running"""
+        def run():
+            error = None
+            try:
+                reply = self.assistant.chat(message)
+            except Exception as e:
+                reply, error = None, str(e)
+            self._on_event("done", {"reply": reply, "error": error})
+
+        with self.lock:
+            if self.busy:
+                return False
+            # streams have sent the previous turn's events by now; numbering continues
+            self._events = []
+            self.assistant.clear_cancel()
+            self.worker = threading.Thread(target=run, name="code-route-lite-turn", daemon=True)
+            self.worker.start()
+        return True
+
+
+class SessionStore:
+    """thread-safe map of session id to WebSession with idle expiry"""
+
+    def __init__(self, ttl: int = SESSION_TTL_SECONDS):
+        self.ttl = ttl
+        self._sessions: Dict[str, WebSession] = {}
+        self._lock = threading.Lock()
+
+    def get(self, session_id: Optional[str]) -> Optional[WebSession]:
+        with self._lock:
+            self._expire()
+            session = self._sessions.get(session_id) if session_id else None
+            if session:
+                session.last_seen = time.time()
+            return session
+
+    def create(self) -> Tuple[str, WebSession]:
+        session = WebSession()
+        session_id = uuid.uuid4().hex
+        with self._lock:
+            self._expire()
+            self._sessions[session_id] = session
+        return session_id, session
+
+    def _expire(self) -> None:
+        cutoff = time.time() - self.ttl
+        for session_id, session in list(self._sessions.items()):
+            if session.last_seen < cutoff and not session.busy:
+                del self._sessions[session_id]
+
+
+def _sse(seq: int, event: str, data: Dict[str, Any]) -> str:
+    # the browser resends the id as Last-Event-ID when it reconnects
+    return f"id: {seq}\nevent: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+def _history_for_page(assistant: Assistant) -> list:
+    """compact view of the conversation: text only, tool calls by name"""
+    entries = []
+    for message in assistant.conversation_history:
+        role = message.get("role")
+        content = message.get("content")
+        if role == "user":
+            if isinstance(content, list):
+                content = " ".join(b.get("text", "[image]") for b in content if isinstance(b, dict))
+            entries.append({"role": "user", "text": content})
+        elif role == "assistant":
+            if content:
+                entries.append({"role": "assistant", "text": content})
+            for call in message.get("tool_calls") or []:
+                entries.append({"role": "tool", "text": call.function.name})
+    return entries
+
+
+def create_app(store: Optional[SessionStore] = None) -> Flask:
+    app = Flask(__name__)
+    store = store or SessionStore()
+
+    def current_session(create: bool = False):
+        session_id = request.cookies.get(SESSION_COOKIE)
+        session = store.get(session_id)
+        if session is None and create:
+            session_id, session = store.create()
+        return session_id, session
+
+    @app.get("/")
+    def index():
+        session_id, _ = current_session(create=True)
+        response = Response(PAGE_HTML, mimetype="text/html")
+        response.set_cookie(SESSION_COOKIE, session_id, httponly=True, samesite="Strict")
+        return response
+
+    @app.get("/api/history")
+    def history():
+        _, session = current_session()
+        if session is None:
+            return jsonify({"messages": [], "tokens": 0, "seq": 0})
+        # numbered before the snapshot: an event racing with it is sent again rather than lost
+        seq = session.seq
+        return jsonify({
+            "messages": _history_for_page(session.assistant),
+            "tokens": session.assistant.total_tokens_used,
+            "busy": session.busy,
+            "seq": seq,
+        })
+
+    @app.post("/api/chat")
+    def chat():
+        _, session = current_session()
+        if session is None:
+            return jsonify({"error": "No session; reload the page"}), 400
+        message = (request.get_json(silent=True) or {}).get("message", "").strip()
+        if not message:
+            return jsonify({"error": "Empty message"}), 400
+        if not session.start_turn(message):
+            return jsonify({"error": "A response is already in progress"}), 409
+        return jsonify({"status": "started"}), 202
+
+    @app.post("/api/cancel")
+    def cancel():
+        _, session = current_session()
+        if session is not None and session.busy:
+            session.assistant.cancel()
+        return jsonify({"status": "ok"})
+
+    @app.post("/api/reset")
+    def reset():
+        _, session = current_session()
+        if session is None:
+            return jsonify({"error": "No session; reload the page"}), 400
+        with session.lock:
+            if session.busy:
+                return jsonify({"error": "Cancel the running response first"}), 409
+            session.assistant.reset()
+        return jsonify({"status": "ok"})
+
+    @app.get("/api/events")
+    def events():
+        _, session = current_session()
+        if session is None:
+            return jsonify({"error": "No session; reload the page"}), 400
+        # events the page already has: up to its history snapshot, or up to the last one received
+        try:
+            seq = int(request.headers.get("Last-Event-ID") or request.args.get("after") or session.seq)
+        except ValueError:
+            seq = session.seq
+
+        def stream():
+            last = seq
+            while True:
+                entries = session.events_after(last, KEEPALIVE_SECONDS)
+                if not entries:
+                    yield ": keepalive\n\n"
+                    continue
+                session.last_seen = time.time()
+                for entry in entries:
+                    last = entry[0]
+                    yield _sse(*entry)
+
+        return Response(stream(), mimetype="text/event-stream",
+                        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+    return app
+
+
+def run(host: str = "127.0.0.1", port: int = 5000) -> None:
+    """serve the lite frontend with werkzeug's threaded server"""
+    create_app().run(host=host, port=port, threaded=True)
+
+
+PAGE_HTML = """<!doctype html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>Code Route</title>
+<style>
+  body { font-family: system-ui, sans-serif; margin: 0; background: #0f1117; color: #e6e6e6; }
+  header { padding: 12px 20px; border-bottom: 1px solid #2a2d36; display: flex; gap: 12px; align-items: center; }
+  header h1 { font-size: 18px; margin: 0; flex: 1; }
+  #log { padding: 20px; max-width: 900px; margin: 0 auto 120px; }
+  .msg { white-space: pre-wrap; padding: 10px 14px; border-radius: 8px; margin: 8px 0; }
+  .user { background: #1d3b5c; }
+  .assistant { background: #1b1e27; }
+  .tool { color: #e0c060; font-size: 13px; margin: 2px 0 2px 14px; }
+  .tool.error { color: #ff7070; }
+  form { position: fixed; bottom: 0; left: 0; right: 0; padding: 12px 20px; background: #0f1117;
+         border-top: 1px solid #2a2d36; display: flex; gap: 8px; }
+  textarea { flex: 1; background: #1b1e27; color: inherit; border: 1px solid #2a2d36; border-radius: 6px; padding: 8px; }
+  button { background: #2b5cab; color: white; border: 0; border-radius: 6px; padding: 8px 14px; cursor: pointer; }
+  button:disabled { opacity: 0.5; cursor: default; }
+  #tokens { font-size: 12px; color: #8a8f98; }
+</style>
+</head>
+<body>
+<header><h1>🛤️ Code Route</h1><span id="tokens"></span><button id="reset" type="button">Reset</button></header>
+<div id="log"></div>
+<form id="form">
+  <textarea id="input" rows="2" placeholder="Type something… (Ctrl/⌘ + Enter to send)"></textarea>
+  <button id="send" type="submit">Send</button>
+  <button id="cancel" type="button" disabled>Cancel</button>
+</form>
+<script>
+const log = document.getElementById("log");
+const input = document.getElementById("input");
+const send = document.getElementById("send");
+const cancel = document.getElementById("cancel");
+const tokens = document.getElementById("tokens");
+let current = null;
+const running = {};
+
+function add(role, text) {
+  const el = document.createElement("div");
+  el.className = (role === "tool" ? "tool" : "msg " + role);
+  el.textContent = role === "tool" ? "🔧 " + text : text;
+  log.appendChild(el);
+  window.scrollTo(0, document.body.scrollHeight);
+  return el;
+}
+function setBusy(busy) { send.disabled = busy; cancel.disabled = !busy; }
+function post(url, body) {
+  return fetch(url, {method: "POST", headers: {"Content-Type": "application/json"}, body: JSON.stringify(body || {})});
+}
+
+function listen(after) {
+  const events = new EventSource("/api/events?after=" + after);
+  events.addEventListener("text_delta", e => {
+    if (!current) current = add("assistant", "");
+    current.textContent += JSON.parse(e.data).text;
+    window.scrollTo(0, document.body.scrollHeight);
+  });
+  events.addEventListener("tool_start", e => {
+    const d = JSON.parse(e.data);
+    current = null;
+    running[d.name] = add("tool", d.name + " …");
+  });
+  events.addEventListener("tool_end", e => {
+    const d = JSON.parse(e.data);
+    const el = running[d.name] || add("tool", d.name);
+    el.textContent = "🔧 " + d.name + (d.is_error ? " failed" : " · " + d.duration.toFixed(2) + "s") + (d.preview ? " — " + d.preview : "");
+    if (d.is_error) el.classList.add("error");
+    delete running[d.name];
+  });
+  events.addEventListener("usage", e => {
+    tokens.textContent = JSON.parse(e.data).total_tokens_used.toLocaleString() + " tokens";
+  });
+  events.addEventListener("done", e => {
+    const d = JSON.parse(e.data);
+    if (d.error) add("assistant", "Error: " + d.error);
+    else if (!current && d.reply) add("assistant", d.reply);
+    current = null;
+    setBusy(false);
+  });
+}
+
+// the stream starts after the events the history already shows
+fetch("/api/history").then(r => r.json()).then(h => {
+  h.messages.forEach(m => add(m.role, m.text));
+  tokens.textContent = h.tokens ? h.tokens.toLocaleString() + " tokens" : "";
+  setBusy(!!h.busy);
+  listen(h.seq);
+});
+
+document.getElementById("form").addEventListener("submit", ev => {
+  ev.preventDefault();
+  const text = input.value.trim();
+  if (!text) return;
+  add("user", text);
+  input.value = "";
+  current = null;
+  setBusy(true);
+  post("/api/chat", {message: text}).then(r => { if (!r.ok) r.json().then(d => { add("assistant", d.error); setBusy(false); }); });
+});
+input.addEventListener("keydown", ev => {
+  if (ev.key === "Enter" && (ev.ctrlKey || ev.metaKey)) document.getElementById("form").requestSubmit();
+});
+cancel.addEventListener("click", () => post("/api/cancel"));
+document.getElementById("reset").addEventListener("click", () => {
+  post("/api/reset").then(r => { if (r.ok) { log.innerHTML = ""; tokens.textContent = ""; } });
+});
+</script>
+</body>
+</html>
+"""
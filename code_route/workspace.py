@@ -0,0 +1,120 @@
+"""
+session-wide snapshot of the workspace's directory listings
+
+every walk in ignore.py (and so greptool, globtool, lstool and the directory
+reads of filecontentreadertool) lists directories through listing(), which
+keeps each directory's scandir entries, and the split of those entries into
+kept dirs and files per set of ignore rules. a cached listing is reused for
+as long as the directory's mtime is unchanged, so a repeated walk costs one
+stat per directory instead of a scandir plus an ignore decision per entry.
+
+adding, removing or renaming an entry changes its directory's mtime, which
+covers changes made outside the assistant as well. listings read within
+RACY_SECONDS of their directory changing are not kept, since a second change
+in the same mtime tick would go unnoticed. the edit tools call invalidate()
+after they write. file sizes and mtimes are not part of the snapshot: the
+entries' stat caches would go stale, so callers stat the files they report.
+
+warm() builds the snapshot of the working directory on a daemon thread when
+a session starts, so the first search does not pay for it.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+MAX_LISTINGS = 50000   # directories kept; the least recently used go first
+RACY_SECONDS = 2.0
+WARM_SECONDS = 10.0    # a warm-up started in a huge tree (a home directory) gives up after this
+
+
+class Listing:
+    """one directory's entries, as scandir returned them"""
+
+    def __init__(self, entries: List[os.DirEntry], mtime_ns: int):
+        self.entries = entries
+        self.names = frozenset(entry.name for entry in entries)
+        self.mtime_ns = mtime_ns
+        # (dirs, files) kept by walks, keyed by the ignore rule sets that applied
+        self.splits: Dict[Tuple, Tuple[List[os.DirEntry], List[os.DirEntry]]] = {}
+
+
+_listings: "OrderedDict[str, Listing]" = OrderedDict()
+_lock = threading.Lock()
+_warming: Dict[str, threading.Thread] = {}
+
+
+def listing(directory: str) -> Optional[Listing]:
+    """
+    the entries of an absolute directory path, from the snapshot when the
+    directory is unchanged; None if it cannot be read
+    """
+    try:
+        mtime_ns = os.stat(directory).st_mtime_ns
+    except OSError:
+        return None
+    with _lock:
+        cached = _listings.get(directory)
+        if cached is not None and cached.mtime_ns == mtime_ns:
+            _listings.move_to_end(directory)
+            return cached
+
+    scanned_at = time.time_ns()
+    try:
+        with os.scandir(directory) as it:
+            entries = list(it)
+    except OSError:
+        return None
+    current = Listing(entries, mtime_ns)
+    if scanned_at - mtime_ns > RACY_SECONDS * 1e9:
+        with _lock:
+            _listings[directory] = current
+            _listings.move_to_end(directory)
+            while len(_listings) > MAX_LISTINGS:
+                _listings.popitem(last=False)
+    else:
+        with _lock:
+            _listings.pop(directory, None)
+    return current
+
+
+def is_cached(directory: str) -> bool:
+    """whether the snapshot already holds directory (absolute or relative)"""
+    with _lock:
+        return os.path.abspath(directory) in _listings
+
+
+def invalidate(path: str) -> None:
+    """forget what the snapshot knows about path and the directory holding it"""
+    path = os.path.abspath(path)
+    with _lock:
+        _listings.pop(path, None)
+        _listings.pop(os.path.dirname(path), None)
+
+
+def warm(root: str) -> None:
+    """walk root on a daemon thread to fill the snapshot, once per root at a time"""
+    root = os.path.abspath(root)
+    with _lock:
+        running = _warming.get(root)
+        if running is not None and running.is_alive():
+            return
+
+    def run():
+        # imported here: ignore.py lists directories through this module
+        from .ignore import walk
+        deadline = time.monotonic() + WARM_SECONDS
+        try:
+            for listed, _ in enumerate(walk(root)):
+                if listed >= MAX_LISTINGS or time.monotonic() > deadline:
+                    break
+        except Exception as e:
+            logging.warning(f"Workspace snapshot of {root} failed: {e!s}")
+
+    thread = threading.Thread(target=run, name="code-route-workspace", daemon=True)
+    with _lock:
+        _warming[root] = thread
+    thread.start()
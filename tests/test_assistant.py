@@ -0,0 +1,24 @@
+from collections import deque
+
+from code_route.assistant import _bounded_display
+
+
+def test_bounded_display_keeps_dict_order():
+    assert _bounded_display({"b": 1, "a": 2}, 100) == "{'b': 1, 'a': 2}"
+
+
+def test_bounded_display_shows_only_leading_elements():
+    text = _bounded_display(deque(range(10 ** 6)), 100)
+    assert text.startswith("deque([0, 1, 2") and text.endswith("...])")
+    assert _bounded_display(10 ** 5000, 100).startswith("<int of ")
+
+
+def test_bounded_display_handles_sets_and_other_containers():
+    assert _bounded_display({3}, 100) == "{3}"
+    assert _bounded_display(frozenset(range(20)), 100).endswith("...})")
+    assert _bounded_display(deque([{}]), 100) == "deque([{}])"
+
+
+def test_bounded_display_marks_omitted_dict_entries():
+    assert _bounded_display({n: n for n in range(20)}, 100).endswith("7: 7, ...}")
+    assert _bounded_display({"a": {"b": {"c": {"d": 1}}}}, 100) == "{'a': {'b': {'c': {...}}}}"
@@ -0,0 +1,21 @@
+import pytest
+
+from code_route.tools.filecontentreadertool import FileContentReaderTool
+
+
+@pytest.mark.parametrize("options, expected", [
+    ({"offset": 2}, "two\nthree\n"),
+    ({"line_numbers": True}, "     1\tone\n     2\ttwo\n     3\tthree"),
+    ({"byte_offset": 0, "byte_limit": 8}, "one\ntwo"),
+])
+def test_ranged_reads_normalize_crlf(tmp_path, options, expected):
+    path = tmp_path / "crlf.txt"
+    path.write_bytes(b"one\r\ntwo\r\nthree\r\n")
+    assert FileContentReaderTool()._read_file(str(path), options) == expected
+
+
+@pytest.mark.parametrize("options", [{"offset": 0}, {"offset": -3}, {"byte_offset": -1}])
+def test_ranged_reads_reject_invalid_offsets(tmp_path, options):
+    path = tmp_path / "sample.txt"
+    path.write_text("one\ntwo\n")
+    assert FileContentReaderTool()._read_file(str(path), options).startswith("Error:")
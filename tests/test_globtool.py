@@ -0,0 +1,24 @@
+import pytest
+
+from code_route.tools.globtool import GlobTool
+
+
+@pytest.fixture
+def tree(tmp_path, monkeypatch):
+    for name in (".env", "a.env", "src/a.py", "src/.cache/b.py", ".github/ci.yml"):
+        path = tmp_path / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("")
+    monkeypatch.chdir(tmp_path)
+
+
+@pytest.mark.parametrize("pattern, recursive, expected", [
+    ("*.env", False, "a.env"),
+    (".*", False, ".env"),
+    ("**/*.py", True, "src/a.py"),
+    ("*.yml", True, "No files found matching the pattern"),
+    (".github/*", False, ".github/ci.yml"),
+    ("./src/*.py", False, "./src/a.py"),
+])
+def test_hidden_names_need_an_explicit_dot(tree, pattern, recursive, expected):
+    assert GlobTool().execute(pattern=pattern, recursive=recursive) == expected
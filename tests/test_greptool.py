@@ -0,0 +1,32 @@
+import pytest
+
+from code_route.tools import greptool
+from code_route.tools.greptool import GrepTool
+
+
+@pytest.mark.parametrize("found, complete", [(3, True), (4, False)])
+def test_paginate_reports_exactly_max_results_as_complete(found, complete):
+    entries = ([f"match {number}"] for number in range(found))
+    output = GrepTool()._paginate(entries, "matches", 0, None, 3)
+    assert output.startswith("match 0\nmatch 1\nmatch 2")
+    assert ("search stopped at max_results" not in output) is complete
+
+
+def test_no_index_outside_the_workspace(tmp_path, monkeypatch):
+    from code_route.config import Config
+    from code_route.search import Matcher
+
+    workspace, elsewhere = tmp_path / "workspace", tmp_path / "elsewhere"
+    workspace.mkdir()
+    elsewhere.mkdir()
+    files = []
+    for number in range(3):
+        path = elsewhere / f"file{number}.txt"
+        path.write_text("needle\n")
+        files.append(str(path))
+    monkeypatch.chdir(workspace)
+    monkeypatch.setattr(Config, "GREP_INDEX_MIN_FILES", 1)
+    roots = []
+    monkeypatch.setattr(greptool, "get_index", lambda root: roots.append(root))
+    assert GrepTool()._narrow_with_index(str(elsewhere), files, Matcher("needle")) == files
+    assert roots == []
@@ -0,0 +1,25 @@
+import pytest
+
+from code_route.search import Matcher, search_file
+
+
+@pytest.mark.parametrize("pattern, text", [
+    ("na.ve", "naïve"),
+    (r"caf.\ x", "café x"),
+    ("^.{5}$", "naïve"),
+])
+def test_character_counting_patterns_match_non_ascii_text(tmp_path, pattern, text):
+    path = tmp_path / "sample.txt"
+    path.write_text(f"first line\n{text}\nlast line\n", encoding="utf-8")
+    result = search_file(str(path), Matcher(pattern))
+    assert result is not None
+    assert [(number, line) for number, line, _ in result.lines] == [(2, text)]
+
+
+@pytest.mark.parametrize("matches, truncated", [(2, False), (3, True)])
+def test_max_count_caps_only_files_with_more_matches(tmp_path, matches, truncated):
+    path = tmp_path / "sample.txt"
+    path.write_text("hit\nmiss\n" * matches, encoding="utf-8")
+    result = search_file(str(path), Matcher("hit"), max_count=2)
+    assert result.count == 2
+    assert result.truncated is truncated
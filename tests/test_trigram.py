@@ -0,0 +1,18 @@
+import os
+import time
+
+from code_route.trigram import RACY_SECONDS, TrigramIndex
+
+
+def test_recently_changed_files_are_not_indexed(tmp_path):
+    path = tmp_path / "sample.txt"
+    path.write_text("needle\n")
+    index = TrigramIndex(str(tmp_path))
+    assert index.update([str(path)]) == 0
+    assert index.candidates([str(path)], [b"needle"]) == ([str(path)], [str(path)])
+
+    settled = time.time() - 2 * RACY_SECONDS
+    os.utime(path, (settled, settled))
+    assert index.update([str(path)]) == 1
+    assert index.candidates([str(path)], [b"needle"]) == ([str(path)], [])
+    assert index.candidates([str(path)], [b"haystack"]) == ([], [])
@@ -0,0 +1,53 @@
+import threading
+
+from code_route import weblite
+
+
+class _StubAssistant:
+    """just enough of Assistant for a session; chat() waits until released"""
+
+    def __init__(self):
+        self.listeners = []
+        self.conversation_history = []
+        self.total_tokens_used = 0
+        self.release = threading.Event()
+
+    def add_listener(self, listener):
+        self.listeners.append(listener)
+
+    def clear_cancel(self):
+        pass
+
+    def chat(self, message):
+        self.release.wait(5)
+        for listener in self.listeners:
+            listener("text_delta", {"text": "reply"})
+        self.conversation_history += [{"role": "user", "content": message},
+                                      {"role": "assistant", "content": "reply"}]
+        return "reply"
+
+
+def test_one_turn_at_a_time_and_no_replay_after_history(monkeypatch):
+    monkeypatch.setattr(weblite, "Assistant", _StubAssistant)
+    store = weblite.SessionStore()
+    client = weblite.create_app(store).test_client()
+    client.get("/")
+    session = next(iter(store._sessions.values()))
+
+    assert client.post("/api/chat", json={"message": "one"}).status_code == 202
+    assert client.post("/api/chat", json={"message": "two"}).status_code == 409
+    session.assistant.release.set()
+    session.worker.join(5)
+
+    history = client.get("/api/history").get_json()
+    assert [m["text"] for m in history["messages"]] == ["one", "reply"]
+    assert session.events_after(history["seq"], 0) == []
+
+
+def test_idle_sessions_expire_on_get(monkeypatch):
+    monkeypatch.setattr(weblite, "Assistant", _StubAssistant)
+    store = weblite.SessionStore(ttl=60)
+    session_id, session = store.create()
+    session.last_seen -= 120
+    assert store.get("another") is None
+    assert session_id not in store._sessions